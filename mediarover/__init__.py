@@ -36,6 +36,7 @@ def run():
 	epilog = """
 Available commands are:
    schedule          Process configured sources and schedule nzb's for download
+   daemon            Run schedule at a regular interval
    episode-sort      Sort downloaded episode
    set-quality       Register quality of series episodes on disk
    write-configs     Generate default configuration and logging files
@@ -73,6 +74,8 @@ See 'python mediarover.py COMMAND --help' for more information on a specific com
 
 	if command == 'schedule':
 		scheduler(broker, args)
+	elif command == 'daemon':
+		daemon(broker, args)
 	elif command == 'episode-sort':
 		episode_sort(broker, args)
 	elif command == 'set-quality':
@@ -135,16 +138,21 @@ Examples:
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+import httplib
 import re
+import time
 from urllib2 import URLError
 
 from mediarover.error import *
-from mediarover.series import Series, build_watch_list
+from mediarover.filesystem.watcher import create_watcher
+from mediarover.series import Series, build_watch_list, refresh_watch_list, scan_series
+from mediarover.source.ledger import ItemLedger
 from mediarover.source.mytvnzb.factory import MytvnzbFactory
 from mediarover.source.newzbin.factory import NewzbinFactory
 from mediarover.source.nzbmatrix.factory import NzbmatrixFactory
 from mediarover.source.nzbs.factory import NzbsFactory
 from mediarover.source.tvnzb.factory import TvnzbFactory
+from mediarover.utils.pool import run_concurrently
 
 def scheduler(broker, args):
 
@@ -166,9 +174,107 @@ Examples:
 	parser.add_option("-c", "--config", metavar="/PATH/TO/CONFIG/DIR", help="path to application configuration directory")
 	parser.add_option("-d", "--dry-run", action="store_true", default=False, help="simulate downloading nzb's from configured sources")
 	parser.add_option("-h", "--help", action="callback", callback=print_usage, help="show this help message and exit")
+	parser.set_defaults(daemon=False)
 
 	(options, args) = parser.parse_args(args)
 
+	__configure_scheduler(broker, options)
+	logger = logging.getLogger("mediarover")
+
+	logger.info("--- STARTING ---")
+	logger.debug("using config directory: %s", broker['config_dir'])
+
+	try:
+		__scheduler(broker, options)
+	except Exception, e:
+		logger.exception(e)
+		raise
+	finally:
+		broker['metadata_data_store'].cleanup()
+
+	if options.dry_run:
+		logger.info("DONE, dry-run flag set...nothing to do!")
+	else:
+		logger.info("DONE")
+
+def daemon(broker, args):
+
+	usage = "%prog daemon [options]"
+	description = "Description: process configured sources and schedule nzb's for download at a regular interval"
+	epilog = """
+Examples:
+   Process configured sources every 15 minutes (or as set at [daemon] interval =):
+     > python mediarover.py daemon
+
+   Same as above, but process sources every 5 minutes:
+     > python mediarover.py daemon --interval 5
+
+   Same as above, but use non-default config directory:
+     > python mediarover.py daemon --interval 5 --config /path/to/config/dir
+"""
+	parser = OptionParser(usage=usage, description=description, epilog=epilog, add_help_option=False)
+
+	parser.add_option("-c", "--config", metavar="/PATH/TO/CONFIG/DIR", help="path to application configuration directory")
+	parser.add_option("-d", "--dry-run", action="store_true", default=False, help="simulate downloading nzb's from configured sources")
+	parser.add_option("-i", "--interval", metavar="MINUTES", type="int", help="number of minutes between runs")
+	parser.add_option("-h", "--help", action="callback", callback=print_usage, help="show this help message and exit")
+	parser.set_defaults(daemon=True)
+
+	(options, args) = parser.parse_args(args)
+
+	config = __configure_scheduler(broker, options)
+	logger = logging.getLogger("mediarover")
+
+	interval = options.interval or config['daemon']['interval']
+
+	# watch tv root directories so that series episode lists can be updated without
+	# polling every series directory.  Falls back to polling if inotify isn't available
+	if config['daemon']['watch_library']:
+		watcher = create_watcher(config['tv']['tv_root'])
+		if watcher is not None:
+			broker.register('library_watcher', watcher)
+
+	# the config and logging files are only read on startup.  If either one of
+	# them is modified, the daemon restarts itself
+	files = [os.path.join(broker['config_dir'], name) for name in ("mediarover.conf", "logging.conf")]
+	mtimes = [os.stat(file).st_mtime for file in files]
+
+	logger.info("--- STARTING DAEMON ---")
+	logger.debug("using config directory: %s", broker['config_dir'])
+
+	# the watch list, series episode lists and queue are kept between runs and 
+	# only refreshed where the filesystem (or queue) has changed
+	try:
+		while True:
+			start = time.time()
+			logger.info("--- STARTING ---")
+			try:
+				__scheduler(broker, options)
+			except ConfigurationError:
+				raise
+			except Exception, e:
+				logger.exception(e)
+			else:
+				logger.info("DONE")
+
+			delay = max(0, interval * 60 - (time.time() - start))
+			logger.info("next run in %d second(s)", delay)
+			time.sleep(delay)
+
+			if [os.stat(file).st_mtime for file in files] != mtimes:
+				logger.info("configuration modified, restarting...")
+				broker['metadata_data_store'].cleanup()
+				os.execv(sys.executable, [sys.executable] + sys.argv)
+	except KeyboardInterrupt:
+		logger.info("interrupted, shutting down")
+	finally:
+		if 'library_watcher' in broker:
+			broker['library_watcher'].close()
+		broker['metadata_data_store'].cleanup()
+
+def __configure_scheduler(broker, options):
+	""" read config and logging files and register scheduler dependencies with broker.  Return config object """
+
 	if options.config:
 		broker.register('config_dir', options.config)
 
@@ -187,14 +293,13 @@ Examples:
 
 	""" logging setup """
 
-	# initialize and retrieve logger for later use
+	# initialize logger
 	logging.config.fileConfig(open(os.path.join(broker['config_dir'], "logging.conf")))
-	logger = logging.getLogger("mediarover")
 
 	""" post configuration setup """
 
 	broker.register('config', config)
-	broker.register('metadata_data_store', Metadata())
+	broker.register('metadata_data_store', Metadata(journal_mode=config['metadata']['journal_mode']))
 	broker.register('episode_factory', EpisodeFactory())
 	broker.register('filesystem_factory', FilesystemFactory())
 
@@ -205,21 +310,7 @@ Examples:
 	broker.register('nzbs', NzbsFactory())
 	broker.register('nzbmatrix', NzbmatrixFactory())
 
-	logger.info("--- STARTING ---")
-	logger.debug("using config directory: %s", broker['config_dir'])
-
-	try:
-		__scheduler(broker, options)
-	except Exception, e:
-		logger.exception(e)
-		raise
-	finally:
-		broker['metadata_data_store'].cleanup()
-
-	if options.dry_run:
-		logger.info("DONE, dry-run flag set...nothing to do!")
-	else:
-		logger.info("DONE")
+	return config
 
 def __scheduler(broker, options):
 
@@ -244,9 +335,25 @@ def __scheduler(broker, options):
 	if not len(tv_root):
 		raise ConfigurationError("You must declare at least one tv_root directory!")
 
-	# build dict of watched series
-	watched_list = build_watch_list(config)
+	# time taken by each phase of the run is logged to the mediarover.timing logger
+	phase = time.time()
+
+	# build dict of watched series (reusing the cached watch list if the tv root
+	# directories haven't changed)
+	if config['tv']['cache_watch_list']:
+		watched_list = build_watch_list(config, config_dir=broker['config_dir'])
+	else:
+		watched_list = build_watch_list(config)
+
+	# when running as a daemon, keep the series (and their episode lists) found 
+	# during previous runs
+	if 'watched_series' in broker:
+		changes = None
+		if 'library_watcher' in broker:
+			changes = broker['library_watcher'].changes()
+		watched_list = refresh_watch_list(broker['watched_series'], watched_list, config['tv']['scan_threads'], changes)
 	logger.info("watching %d tv show(s)", len(watched_list))
+	phase = __phase_finished("watch list", phase)
 
 	# register series dictionary with dependency broker
 	broker.register('watched_series', watched_list)
@@ -254,9 +361,10 @@ def __scheduler(broker, options):
 	logger.debug("finished processing watched tv")
 	logger.info("begin processing sources")
 
-	# grab list of source url's from config file and build appropriate Source objects
-	sources = []
-	for name, params in config['source'].items():
+	# grab list of source url's from config file and build list of Source parameters
+	feeds = []
+	for name in config['source'].sections:
+		params = dict(config['source'][name])
 		logger.debug("found feed '%s'", name)
 
 		# first things first: if manage_quality is True, make sure the user
@@ -271,92 +379,60 @@ def __scheduler(broker, options):
 		del params['provider']
 
 		# grab source object
-		factory = broker[provider]
+		feeds.append((broker[provider], params))
 
-		logger.debug("creating source for feed %r", name)
-		try:
-			source = factory.create_source(**params)
-		except URLError, (e):
+	# retrieve all feeds concurrently and build appropriate Source objects.  Total 
+	# fetch time is bound by the slowest feed rather than the sum of all feeds
+	start = time.time()
+	results = run_concurrently(__create_source, feeds, config['source']['fetch_threads'])
+	logger.debug("retrieved %d feed(s) in %.2f seconds", len(feeds), time.time() - start)
+
+	sources = []
+	for (factory, params), (source, e, elapsed) in zip(feeds, results):
+		name = params['name']
+		if isinstance(e, URLError):
 			if hasattr(e, "code"):
 				error = "skipping source %r, remote server couldn't complete request: %d" % (name, e.code)
 			else:
 				error = "skipping source %r, error encountered while retrieving url: %r" % (name, e.reason)
 			logger.error(error)
-			continue
-		except InvalidRemoteData, (e):
+		elif isinstance(e, InvalidRemoteData):
 			logger.error("skipping source %r, unable to process remote data: %s", name, e)
-			continue
+		elif isinstance(e, InvalidURL):
+			logger.error("skipping source %r, invalid url: %s", name, e)
+		elif e is not None:
+			logger.error("skipping source %r, error encountered while retrieving url: %r", name, e)
 		else:
-			logger.info("created source %r" % name)
+			logger.info("created source %r in %.2f seconds" % (name, elapsed))
 			sources.append(source)
+	phase = __phase_finished("sources", phase)
 
 	# if we don't have any sources there isn't any reason to continue.  Print
 	# message and exit
 	if not len(sources):
 		logger.warning("No sources found!")
+
+		# feeds may be temporarily unavailable, try again during the next run
+		if options.daemon and len(feeds):
+			return
+
 		print "ERROR: Did not find any configured sources in configuration file.  Nothing to do!"
 		exit(1)
 
 	logger.info("watching %d source(s)", len(sources))
 	logger.debug("finished processing sources")
 
-	logger.info("begin queue configuration")
-
-	# build list of supported categories
-	supported_categories = set([config['tv']['category'].lower()])
-
-	# loop through list of available queues and find one that the user
-	# has configured
-	queue = None
-	for client in config['__SYSTEM__']['__available_queues__']:
-
-			logger.debug("looking for configured queue: %s", client)
-			if client in config['queue']:
-				logger.debug("using %s nntp client", client)
-
-				# attept to load the nntp client Queue object
-				module = None
-				try:
-					module = __import__("mediarover.queue.%s" % client, globals(), locals(), [client.capitalize() + "Queue"], -1)
-				except ImportError:
-					logger.error("error loading queue module %sQueue", client)
-					raise
-
-				# grab list of config options for current queue
-				params = dict(config['queue'][client])
-				logger.debug("queue source: %s", params["root"])
-
-				# grab constructor and create new queue object
-				try:
-					init = getattr(module, "%sQueue" % client.capitalize())
-				except AttributeError:
-					logger.error("error retrieving queue init method")
-					raise 
-				else:
-					queue = init(params['root'], supported_categories, params)
-					break
+	# when running as a daemon, reuse the queue created during a previous run
+	if 'queue' in broker:
+		queue = broker['queue']
+		queue.refresh()
 	else:
-		logger.warning("No queue found!")
-		print "ERROR: Did not find a configured queue in configuration file.  Unable to proceed!"
-		exit(1)
-	logger.debug("finished queue configuration")
+		queue = __create_queue(config)
+		broker.register('queue', queue)
 
-	if manage_quality:
-		logger.info("cleaning database of stale jobs")
-
-		# grab queue and list of in_progress jobs from database
-		in_queue = []
-		in_progress = set([row['title'] for row in broker['metadata_data_store'].list_in_progress()])
-		for job in queue.jobs():
-			if job.title() in in_progress:
-				in_queue.append(job.title())
-
-		# find the difference between the two.  If there are any items in the in_progress
-		# table that aren't in the queue, remove them
-		not_in_queue = in_progress.difference(set(in_queue))
-		if len(not_in_queue) > 0:
-			logger.debug("found %d stale job(s) in the database, removing..." % len(not_in_queue))
-			broker['metadata_data_store'].delete_in_progress(*not_in_queue)
+	# start retrieving the queue in the background, it isn't needed until items are checked
+	# against the jobs already in the queue
+	queue.prefetch()
 
 	"""
 		for each Source object, loop through the list of available Items and
@@ -374,30 +450,86 @@ def __scheduler(broker, options):
 	scheduled = []
 	drop_from_queue = []
 
-	# start by processing any items that have been delayed and 
+	# start by gathering any items that have been delayed and 
 	# are now eligible for processing
 	logger.info("retrieving delayed items...")
-	for item in broker['metadata_data_store'].get_actionable_delayed_items():
-		logger.debug("begin processing delayed item '%s'", item.title())
-		__process_item(broker, item, queue, scheduled, drop_from_queue)
+	candidates = [(None, item) for item in broker['metadata_data_store'].get_actionable_delayed_items()]
 
-	# now process items from any configured sources
+	# now gather items from any configured sources
+	ledger = ItemLedger(queue)
 	for source in sources:
 		logger.info("processing '%s' items", source.name())
 
+		# drop any feed records that were rejected in a previous run and whose
+		# decision still holds
+		skipped = source.skip_records(lambda record: ledger.rejected(source.name(), record) is not None)
+		if skipped:
+			logger.info("skipping %d previously rejected item(s)", skipped)
+
 		try:
 			items = source.items()
 		except (InvalidRemoteData), e:
 			logger.warning(e)
 			continue
-			
-		for item in items:
-			logger.debug("begin processing item '%s'", item.title())
 
-			# process current item
-			__process_item(broker, item, queue, scheduled, drop_from_queue)
+		candidates.extend([(source, item) for item in items])
+
+	# apply the cheap checks first.  Only series with at least one surviving item
+	# need to be scanned, the rest never touch the filesystem
+	remaining = []
+	for (source, item) in candidates:
+		logger.debug("begin processing item '%s'", item.title())
+		decision = __filter_item(broker, item, queue)
+		if decision is None:
+			remaining.append((source, item))
+		elif source is not None:
+			ledger.record(source.name(), item, decision)
+	phase = __phase_finished("filter", phase)
+
+	if len(remaining) > 0:
+		affected = [item.download().series for (source, item) in remaining]
+		logger.info("scanning affected series")
+		start = time.time()
+		scan_series(affected, config['tv']['scan_threads'])
+		logger.debug("scanned affected series in %.2f seconds", time.time() - start)
+	phase = __phase_finished("scan", phase)
+
+	# items offering the same download (ie. the same episode from several sources) compete with
+	# each other.  Only the preferred item of each download is evaluated, the others are only
+	# considered if it is rejected
+	for group in __group_candidates(remaining):
+		while len(group):
+			(source, item) = group.pop(__preferred_candidate(group))
+			decision = __process_item(broker, item, queue, scheduled, drop_from_queue)
+			if source is not None:
+				ledger.record(source.name(), item, decision)
+			if decision is None:
+				break
+
+		for (source, item) in group:
+			logger.info("skipping '%s', already scheduled for download", item.title())
+			if source is not None:
+				ledger.record(source.name(), item, 'duplicate')
 
 	logger.debug("finished processing items")
+	phase = __phase_finished("decisions", phase)
+
+	if manage_quality:
+		logger.info("cleaning database of stale jobs")
+
+		# grab queue and list of in_progress jobs from database
+		in_queue = []
+		in_progress = set([row['title'] for row in broker['metadata_data_store'].list_in_progress()])
+		for job in queue.jobs():
+			if job.title() in in_progress:
+				in_queue.append(job.title())
+
+		# find the difference between the two.  If there are any items in the in_progress
+		# table that aren't in the queue, remove them
+		not_in_queue = in_progress.difference(set(in_queue))
+		if len(not_in_queue) > 0:
+			logger.debug("found %d stale job(s) in the database, removing..." % len(not_in_queue))
+			broker['metadata_data_store'].delete_in_progress(*not_in_queue)
 
 	if not options.dry_run:
 		if len(drop_from_queue) > 0:
@@ -413,17 +545,12 @@ def __scheduler(broker, options):
 
 		# now that we've fully parsed all source items
 		# lets add the collected downloads to the queue...
-		delayed = []
+		delayed = [item for item in scheduled if item.delay() > 0]
 		if len(scheduled) > 0:
 			logger.info("scheduling items for download")
-			for item in scheduled:
-				if item.delay() > 0:
-					delayed.append(item)
-					continue
-				try:
-					queue.add_to_queue(item)
-				except (IOError, QueueInsertionError):
-					logger.warning("unable to schedule item %r for download", item.title())
+			for (item, error) in queue.add_all_to_queue([item for item in scheduled if item.delay() == 0]):
+				if error is not None:
+					logger.warning("unable to schedule item %r for download: %s", item.title(), error)
 		else:
 			logger.info("no items to schedule for download")
 
@@ -438,14 +565,90 @@ def __scheduler(broker, options):
 
 		# reduce delay count for all items in delayed_item table
 		broker['metadata_data_store'].reduce_item_delay()
+
+		# remember decisions made about current source items
+		ledger.save()
 	else:
 		if len(scheduled) > 0:
 			logger.info("the following items were identified as being eligible for download:")
 			for item in scheduled:
 				logger.info(item.title())
 
-def __process_item(broker, item, queue, scheduled, drop_from_queue):
+	__phase_finished("queue update", phase)
+
+def __phase_finished(name, start):
+	""" log time taken by given scheduler phase, started at given time.  Return current time """
+	now = time.time()
+	logging.getLogger("mediarover.timing").debug("%s phase finished in %.3f seconds", name, now - start)
+	return now
+
+def __create_queue(config):
+	""" create queue object using first configured queue client """
+	logger = logging.getLogger("mediarover")
+	logger.info("begin queue configuration")
+
+	# build list of supported categories
+	supported_categories = set([config['tv']['category'].lower()])
+
+	# loop through list of available queues and find one that the user
+	# has configured
+	queue = None
+	for client in config['__SYSTEM__']['__available_queues__']:
+
+			logger.debug("looking for configured queue: %s", client)
+			if client in config['queue']:
+				logger.debug("using %s nntp client", client)
+
+				# attept to load the nntp client Queue object
+				module = None
+				try:
+					module = __import__("mediarover.queue.%s" % client, globals(), locals(), [client.capitalize() + "Queue"], -1)
+				except ImportError:
+					logger.error("error loading queue module %sQueue", client)
+					raise
+
+				# grab list of config options for current queue
+				params = dict(config['queue'][client])
+				logger.debug("queue source: %s", params["root"])
+
+				# grab constructor and create new queue object
+				try:
+					init = getattr(module, "%sQueue" % client.capitalize())
+				except AttributeError:
+					logger.error("error retrieving queue init method")
+					raise 
+				else:
+					queue = init(params['root'], supported_categories, params)
+					break
+	else:
+		logger.warning("No queue found!")
+		print "ERROR: Did not find a configured queue in configuration file.  Unable to proceed!"
+		exit(1)
+	logger.debug("finished queue configuration")
 
+	return queue
+
+def __create_source(factory, params):
+	""" 
+		create source using given factory and parameters.  Return tuple containing the source (None on failure),
+		any retrieval error encountered, and the elapsed time in seconds
+	"""
+	logger = logging.getLogger("mediarover")
+	logger.debug("creating source for feed %r", params['name'])
+
+	start = time.time()
+	try:
+		source = factory.create_source(**params)
+	except (IOError, httplib.HTTPException, InvalidRemoteData, InvalidURL), e:
+		return (None, e, time.time() - start)
+
+	return (source, None, time.time() - start)
+
+def __filter_item(broker, item, queue):
+	""" 
+		apply the checks that don't require the series to be scanned.  Return None if item passed, 
+		otherwise a string identifying why it was rejected
+	"""
 	logger = logging.getLogger("mediarover")
 
 	# grab the episode and series object
@@ -456,12 +659,12 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 	# for its series so it can be skipped
 	if len(series.path) == 0:
 		logger.info("skipping '%s', not watching series", item.title())
-		return
+		return 'not_watched'
 
 	# check if season of current episode is being ignored...
 	if series.ignore(episode.season): 
 		logger.info("skipping '%s', ignoring season", item.title())
-		return
+		return 'ignored'
 
 	# if multiepisode job: check if user will accept, otherwise 
 	# continue to next job
@@ -471,12 +674,25 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 		except AttributeError:
 			pass
 		else:
-			return
+			return 'multipart'
 
 	# make sure current item hasn't already been downloaded before
 	if queue.processed(item):
 		logger.info("skipping '%s', already processed by queue", item.title())
-		return
+		return 'processed'
+
+	return None
+
+def __process_item(broker, item, queue, scheduled, drop_from_queue):
+	""" 
+		evaluate given item (having passed __filter_item) and schedule it for download if desirable.  Return 
+		None if item was scheduled, otherwise a string identifying why it was rejected
+	"""
+	logger = logging.getLogger("mediarover")
+
+	# grab the episode and series object
+	episode = item.download()
+	series = episode.series
 
 	# check if episode is represented on disk (single or multi). If yes, determine whether 
 	# or not it should be scheduled for download.
@@ -484,7 +700,7 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 	# episodes as well as desired quality level
 	if not series.should_episode_be_downloaded(episode):
 		logger.info("skipping %r", item.title())
-		return
+		return 'on_disk'
 
 	# check if episode is already in the queue.  If yes, determine whether or not it should
 	# replace queued item and be scheduled for download
@@ -496,48 +712,70 @@ def __process_item(broker, item, queue, scheduled, drop_from_queue):
 			drop_from_queue.append(job)
 		else:
 			logger.info("skipping '%s', in download queue", item.title())
-			return
-
-	# check if episode has already been scheduled for download.  If yes, determine whether or not it
-	# should replace the currently scheduled item.
-	# ATTENTION: this call takes into account users preferences regarding single vs multi-part 
-	# episodes as well as desired quality level
-	drop_from_scheduled = None
-	if item in scheduled:
-		old_item = scheduled[scheduled.index(item)]
-		desirable = series.should_episode_be_downloaded(episode, old_item.download())
-
-		# the current item has a delay:
-		#   a) if the old scheduled item is also delayed, consult desirability
-		#   b) otherwise, skip item
-		if item.delay():
-			if old_item.delay() and desirable:
-				drop_from_scheduled = old_item
-			else:
-				return
-
-		# the old item has a delay:
-		#   a) if the current item is also delayed, consult desirability
-		#   b) otherwise, replace old item
-		elif old_item.delay():
-			if item.delay() and series.should_episode_be_downloaded(old_item.download(), episode):
-				return
-			drop_from_scheduled = old_item
-
-		# neither item has a delay
-		elif desirable:
-			drop_from_scheduled = old_item
-		else:
-			logger.info("skipping '%s', already scheduled for download", item.title())
-			return
+			return 'in_queue'
 
 	# we made it this far, schedule the current item for download!
 	logger.info("adding '%s' to download list", item.title())
 	scheduled.append(item)
-		
-	if drop_from_scheduled is not None:
-		scheduled.remove(drop_from_scheduled)
-	
+
+def __group_candidates(candidates):
+	""" 
+		group given (source, item) pairs by the download they represent.  Return list of groups in order of
+		first appearance
+	"""
+	order = []
+	groups = {}
+	for (source, item) in candidates:
+		key = __download_key(item.download())
+		if key not in groups:
+			groups[key] = []
+			order.append(key)
+		groups[key].append((source, item))
+
+	return [groups[key] for key in order]
+
+def __preferred_candidate(candidates):
+	""" return index of the preferred (source, item) pair among given pairs offering the same download """
+	preferred = 0
+	for index in range(1, len(candidates)):
+		if __replaces(candidates[index][1], candidates[preferred][1]):
+			preferred = index
+
+	return preferred
+
+def __download_key(download):
+	""" return hashable key identifying given episode download, equal downloads share the same key """
+	series = Series.sanitize_series_name(series=download.series)
+	try:
+		parts = download.episodes
+	except AttributeError:
+		if hasattr(download, "year"):
+			return (series, 'daily', Series.episode_key(download))
+		return (series, 'single', Series.episode_key(download))
+
+	return (series, 'multi', tuple([Series.episode_key(ep) for ep in parts]))
+
+def __replaces(item, old_item):
+	""" 
+		return boolean indicating whether or not given item should replace an old item offering the same download
+		ATTENTION: this call takes into account users preferences regarding single vs multi-part episodes as well
+		as desired quality level
+	"""
+	episode = item.download()
+
+	# the current item has a delay:
+	#   a) if the old item is also delayed, consult desirability
+	#   b) otherwise, keep old item
+	if item.delay():
+		return bool(old_item.delay()) and episode.series.should_episode_be_downloaded(episode, old_item.download())
+
+	# the old item has a delay, replace it
+	elif old_item.delay():
+		return True
+
+	# neither item has a delay, consult desirability
+	return episode.series.should_episode_be_downloaded(episode, old_item.download())
+
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 import shutil
@@ -545,8 +783,8 @@ import shutil
 from tempfile import TemporaryFile
 from time import strftime
 
-from mediarover.config import build_series_filters
 from mediarover.filesystem.episode import FilesystemEpisode
+from mediarover.series import find_series
 from mediarover.utils.filesystem import clean_path
 from mediarover.utils.quality import guess_quality_level, LOW, MEDIUM, HIGH
 
@@ -642,8 +880,8 @@ Examples:
 		print_usage(parser)
 		exit(1)
 
-	broker.register('metadata_data_store', Metadata())
 	broker.register('config', config)
+	broker.register('metadata_data_store', Metadata(journal_mode=config['metadata']['journal_mode']))
 
 	# register factory objects
 	broker.register('newzbin', NewzbinFactory())
@@ -743,8 +981,6 @@ def __episode_sort(broker, options, **kwargs):
 		else:
 			raise FailedDownload("download failed")
 
-	watched_list = {}
-	skip_list = {}
 	for root in tv_root:
 
 		# make sure tv root directory exists and that we have read and 
@@ -754,79 +990,14 @@ def __episode_sort(broker, options, **kwargs):
 		if not os.access(root, os.R_OK | os.W_OK):
 			raise FilesystemError("Missing read/write access to tv root directory (%s)", (root))
 
-		logger.info("begin processing tv directory: %s", root)
-
-		# set umask for files and directories created during this session
-		os.umask(config['tv']['umask'])
-
-		# get list of shows in root tv directory
-		dir_list = os.listdir(root)
-		dir_list.sort()
-		for name in dir_list:
-
-			# skip hidden directories
-			if name.startswith("."):
-				continue
+	# set umask for files and directories created during this session
+	os.umask(config['tv']['umask'])
 
-			dir = os.path.join(root, name)
-			if os.path.isdir(dir):
-
-				sanitized_name = Series.sanitize_series_name(name=name)
-
-				# already seen this series and have determined that user wants to skip it
-				if sanitized_name in skip_list:
-					continue
-
-				# we've already seen this series.  Append new directory to list of series paths
-				elif sanitized_name in watched_list:
-					series = watched_list[sanitized_name]
-					series.path.append(dir)
-
-				# new series, create new Series object and add to the watched list
-				else:
-					series = Series(name, path=dir)
-					additions = {sanitized_name: series}
-
-					# locate and process any filters for current series.  If no user defined filters for 
-					# current series exist, build dict using default values
-					if sanitized_name in config['tv']['filter']:
-						config['tv']['filter'][sanitized_name] = build_series_filters(dir, config['tv']['quality'], config['tv']['filter'][sanitized_name])
-					else:
-						config['tv']['filter'][sanitized_name] = build_series_filters(dir, config['tv']['quality'])
-
-					# check filters to see if user wants this series skipped...
-					if config['tv']['filter'][sanitized_name]["skip"]:
-						skip_list[sanitized_name] = series
-						logger.debug("found skip filter, ignoring series: %s", series.name)
-						continue
-
-					# set season ignore list for current series
-					if len(config['tv']['filter'][sanitized_name]['ignore']):
-						logger.debug("ignoring the following seasons of %s: %s", series.name, config['tv']['filter'][sanitized_name]['ignore'])
-						series.ignores = config['tv']['filter'][sanitized_name]['ignore']
-
-					# process series aliases.  For each new alias, register series in watched_list
-					if config['tv']['filter'][sanitized_name]['alias']:
-						series.aliases = config['tv']['filter'][sanitized_name]['alias'];
-						count = 0
-						for alias in series.aliases:
-							sanitized_alias = Series.sanitize_series_name(name=alias)
-							if sanitized_alias in watched_list:
-								logger.warning("duplicate series alias found for '%s'! Duplicate aliases can/will result in incorrect downloads and improper sorting! You've been warned..." % series)
-							additions[sanitized_alias] = series
-							count += 1
-						logger.debug("%d alias(es) identified for series '%s'" % (count, series))
-
-					# finally, add additions to watched list
-					logger.debug("watching series: %s", series)
-					watched_list.update(additions)
-
-	# register series dictionary with dependency broker
+	# register series dictionary with dependency broker.  Only the series of the
+	# current job is looked up (see below), the rest of the library is never scanned
+	watched_list = {}
 	broker.register('watched_series', watched_list)
 
-	logger.info("watching %d tv show(s)", len(watched_list))
-	logger.debug("finished processing watched tv")
-
 	ignored = [ext.lower() for ext in config['tv']['ignored_extensions']]
 
 	# locate episode file in given download directory
@@ -869,6 +1040,18 @@ def __episode_sort(broker, options, **kwargs):
 	except (InvalidMultiEpisodeData, MissingParameterError), e:
 		raise InvalidJobTitle("unable to parse job title and create Episode object: %s" % e)
 
+	# locate the directories of the job series (by name or alias) and add it to the 
+	# watched list.  Then build episode object again so that it refers to the watched series
+	watched = find_series(config, Series.sanitize_series_name(series=episode.series))
+	if watched is not None:
+		watched_list[Series.sanitize_series_name(series=watched)] = watched
+		for alias in watched.aliases:
+			watched_list[Series.sanitize_series_name(name=alias)] = watched
+		episode = factory.create_episode(job)
+
+	logger.info("watching %d tv show(s)", len(watched_list))
+	logger.debug("finished processing watched tv")
+
 	# sanitize series name for later use
 	series = episode.series
 	sanitized_name = series.sanitize_series_name(series=series)
@@ -920,6 +1103,9 @@ def __episode_sort(broker, options, **kwargs):
 			if len(series.path) == 0:
 				series.path = root
 				
+		# only the season folder of the current episode needs to be scanned
+		series.scan_season(episode.season)
+
 		# build list of episode(s) (either SingleEpisode or DailyEpisode) that are desirable
 		# ie. missing or of more desirable quality than current offering
 		desirables = series.filter_undesirables(episode)
@@ -951,13 +1137,13 @@ def __episode_sort(broker, options, **kwargs):
 
 			if additional is None:
 
-				# mark series episode list stale
+				# mark series episode list stale and scan the season again
 				series.mark_episode_list_stale()
+				series.scan_season(episode.season)
 
 				# update metadata db with newly sorted episode information
 				if config['tv']['quality']['managed']:
-					for ep in desirables:
-						broker['metadata_data_store'].add_episode(ep)
+					broker['metadata_data_store'].add_episodes(desirables)
 
 				remove = []
 				files = series.find_episode_on_disk(episode)
@@ -1084,7 +1270,7 @@ Examples:
 	""" post configuration setup """
 
 	broker.register('config', config)
-	broker.register('metadata_data_store', Metadata())
+	broker.register('metadata_data_store', Metadata(journal_mode=config['metadata']['journal_mode']))
 	broker.register('episode_factory', EpisodeFactory())
 	broker.register('filesystem_factory', FilesystemFactory())
 
@@ -1115,7 +1301,10 @@ Series Options:
 
 	# build dict of watched series
 	# register series dictionary with dependency broker
-	watched_list = build_watch_list(config, process_aliases=False)
+	if config['tv']['cache_watch_list']:
+		watched_list = build_watch_list(config, process_aliases=False, config_dir=broker['config_dir'])
+	else:
+		watched_list = build_watch_list(config, process_aliases=False)
 	broker.register('watched_series', watched_list)
 
 	# build list of series to iterate over
@@ -1254,7 +1443,7 @@ Series Options:
 			# set quality for all episodes in given size list
 			for episode in avg_sizes[avg_size]['episodes']:
 				episode.quality = quality
-				broker['metadata_data_store'].add_episode(episode)
+			broker['metadata_data_store'].add_episodes(avg_sizes[avg_size]['episodes'])
 
 		# set quality for all episodes that were matched by extension
 		extension_msg = "Setting quality of '%s' for %d episode(s) with extension found in %s"
@@ -1263,21 +1452,21 @@ Series Options:
 			print extension_msg % (quality, len(low), options.low)
 			for episode in low:
 				episode.quality = quality
-				broker['metadata_data_store'].add_episode(episode)
+			broker['metadata_data_store'].add_episodes(low)
 
 		if len(medium):
 			quality = MEDIUM
 			print extension_msg % (quality, len(medium), options.medium)
 			for episode in medium:
 				episode.quality = quality
-				broker['metadata_data_store'].add_episode(episode)
+			broker['metadata_data_store'].add_episodes(medium)
 
 		if len(high):
 			quality = HIGH
 			print extension_msg % (quality, len(high), options.high)
 			for episode in high:
 				episode.quality = quality
-				broker['metadata_data_store'].add_episode(episode)
+			broker['metadata_data_store'].add_episodes(high)
 
 	print "DONE"
 		
@@ -0,0 +1,313 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import gc
+import logging
+import math
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+import time
+from cStringIO import StringIO
+from optparse import OptionParser
+
+from mediarover.benchmark.environment import create_broker, create_config_files, create_library, series_name
+from mediarover.benchmark.stub import StubServer, feed_document, sabnzbd_responder
+from mediarover.queue.sabnzbd import SabnzbdQueue
+from mediarover.series import Series
+from mediarover.source import AbstractXmlSource
+from mediarover.source.parser import parse_feed
+from mediarover.utils.quality import LOW, MEDIUM, HIGH
+from mediarover import print_usage
+from mediarover.version import __app_version__
+
+def run():
+
+	""" parse command line options """
+
+	usage = "%prog [options] [BENCHMARK ...]"
+	description = "Description: measure throughput and memory use of Media Rover hot paths using synthetic data"
+	epilog = """
+Available benchmarks are:
+%s
+
+All benchmarks are run when none are given.""" % "\n".join(["   %-20s %s" % (name, doc) for (name, doc, func) in BENCHMARKS])
+	parser = OptionParser(version=__app_version__, usage=usage, description=description, epilog=epilog, add_help_option=False)
+
+	parser.add_option("-h", "--help", action="callback", callback=print_usage, help="show this help message and exit")
+
+	parser.add_option("-s", "--size", type="int", default=5000, metavar="N", help="number of items processed by each benchmark (default: 5000)")
+	parser.add_option("-r", "--repeat", type="int", default=3, metavar="N", help="number of timed rounds, the fastest is reported (default: 3)")
+	parser.add_option("-d", "--directory", metavar="/PATH/TO/DIR", help="directory used for generated files (default: temporary directory that is removed afterwards)")
+
+	(options, args) = parser.parse_args()
+
+	available = [name for (name, doc, func) in BENCHMARKS]
+	for name in args:
+		if name not in available:
+			parser.error("unknown benchmark: %s" % name)
+	if options.size < 1 or options.repeat < 1:
+		parser.error("size and repeat must be positive")
+
+	# output of the modules being measured isn't wanted
+	logging.basicConfig(level=logging.CRITICAL)
+
+	if options.directory:
+		root = options.directory
+	else:
+		root = tempfile.mkdtemp(prefix="mediarover-benchmark-")
+
+	try:
+		results = run_benchmarks(root, options.size, options.repeat, args)
+	finally:
+		if not options.directory:
+			shutil.rmtree(root, ignore_errors=True)
+
+	print "%-20s %8s %10s %12s %10s" % ("benchmark", "ops", "best (s)", "ops/sec", "memory")
+	for (name, ops, best, memory) in results:
+		print "%-20s %8d %10.4f %12.1f %10s" % (name, ops, best, ops / max(best, 1e-9), format_memory(memory))
+
+def run_benchmarks(root, size, repeat, names=None):
+	""" 
+		create benchmark environment below given directory and run the named benchmarks (all if None or empty).  
+		Return list of (name, ops, best time, memory) tuples.  Memory is the growth of resident memory in bytes 
+		while setting up and running the first round, None if it can't be determined
+	"""
+	config_dir = os.path.join(root, "config")
+	tv_root = os.path.join(root, "tv")
+
+	# the library consists of one large series, spread over as many seasons as 
+	# can be numbered with two digits
+	seasons = min(99, int(math.ceil(size / 50.0)))
+	episodes = min(99, int(math.ceil(size / float(seasons))))
+	create_library(tv_root, [series_name(0)], seasons, episodes)
+
+	server = StubServer(sabnzbd_responder([]))
+	try:
+		create_config_files(config_dir, tv_root, server.url())
+		broker = create_broker(os.path.join(sys.path[0], "resources"), config_dir)
+
+		results = []
+		for (name, doc, func) in BENCHMARKS:
+			if names and name not in names:
+				continue
+
+			gc.collect()
+			before = resident_memory()
+			(ops, benchmark, cleanup) = func(broker, size, repeat)
+			try:
+				times = []
+				retained = None
+				for round in range(repeat):
+					start = time.time()
+					result = benchmark(round)
+					times.append(time.time() - start)
+
+					# keep the first result alive until memory has been measured
+					if round == 0:
+						retained = result
+						gc.collect()
+						after = resident_memory()
+					del result
+				del retained
+			finally:
+				if cleanup is not None:
+					cleanup()
+
+			memory = None
+			if before is not None and after is not None:
+				memory = after - before
+			results.append((name, ops, min(times), memory))
+	finally:
+		server.close()
+
+	return results
+
+def resident_memory():
+	""" return resident memory of current process in bytes, None if it can't be determined """
+	try:
+		file = open("/proc/self/statm")
+		try:
+			return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+		finally:
+			file.close()
+	except (IOError, OSError, ValueError, IndexError, AttributeError):
+		pass
+
+	# peak resident memory, reported in kilobytes on linux and bytes on mac os x
+	try:
+		import resource
+	except ImportError:
+		return None
+	usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if sys.platform == "darwin":
+		return usage
+	return usage * 1024
+
+def format_memory(memory):
+	""" return human readable representation of given number of bytes """
+	if memory is None:
+		return "-"
+	return "%.1fMB" % (memory / 1048576.0)
+
+def generate_titles(count, offset=0):
+	""" 
+		return list of count unique release titles covering single, daily and multipart episodes.  Titles 
+		generated for different offsets don't overlap
+	"""
+	titles = []
+	for i in range(offset, offset + count):
+		name = series_name(i / 20)
+		j = i % 20
+		kind = j % 4
+		if kind == 0:
+			titles.append("%s.S%02dE%02d.720p.HDTV.x264" % (name.replace(" ", "."), 1 + j % 3, 1 + j))
+		elif kind == 1:
+			titles.append("%s - %dx%02d - Episode Title" % (name, 1 + j % 3, 1 + j))
+		elif kind == 2:
+			titles.append("%s %04d.%02d.%02d HDTV XviD" % (name, 2000 + j, 1 + j % 12, 1 + j))
+		else:
+			titles.append("%s S%02dE%02d-E%02d DVDRip" % (name, 1 + j % 3, 1 + j, 2 + j))
+	return titles
+
+# benchmarks - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+#
+# every benchmark is given the dependency broker, the number of items to process
+# and the number of rounds.  It returns a tuple containing the number of operations 
+# per round, a callable running the given round and a cleanup callable (or None)
+
+def __library_series(broker):
+	""" return scanned library series """
+	series = broker['watched_series'][Series.sanitize_series_name(name=series_name(0))]
+	series.episodes
+	return series
+
+def __library_candidates(broker, series, size):
+	""" return list of size episodes of library series, mostly already on disk and of varying quality """
+	factory = broker['episode_factory']
+	seasons = len(set([episode.season for episode in series.episodes])) + 1
+	qualities = (LOW, MEDIUM, HIGH)
+
+	candidates = []
+	for i in range(size):
+		episode = factory.create_episode("%s S%02dE%02d" % (series.name, 1 + i % seasons, 1 + (i / seasons) % 99))
+		episode.quality = qualities[i % 3]
+		candidates.append(episode)
+	return candidates
+
+def __create_episode(broker, size, repeat):
+	factory = broker['episode_factory']
+
+	# parse results are cached, every round is given titles not seen before
+	rounds = [generate_titles(size, size * round) for round in range(repeat)]
+
+	def benchmark(round):
+		return [factory.create_episode(title) for title in rounds[round]]
+
+	return (size, benchmark, None)
+
+def __filter_undesirables(broker, size, repeat):
+	series = __library_series(broker)
+	candidates = __library_candidates(broker, series, size)
+
+	def benchmark(round):
+		return [series.filter_undesirables(episode) for episode in candidates]
+
+	return (size, benchmark, None)
+
+def __find_episode_on_disk(broker, size, repeat):
+	series = __library_series(broker)
+	candidates = __library_candidates(broker, series, size)
+
+	def benchmark(round):
+		return [series.find_episode_on_disk(episode) for episode in candidates]
+
+	return (size, benchmark, None)
+
+def __metadata_add(broker, size, repeat):
+	meta_ds = broker['metadata_data_store']
+	factory = broker['episode_factory']
+
+	# every add is committed on its own, limit number of (slow) writes
+	count = max(1, size / 10)
+	episodes = [factory.create_episode(title) for title in generate_titles(count, size * repeat)]
+	episodes = [episode for episode in episodes if not hasattr(episode, "episodes")]
+
+	def benchmark(round):
+		for episode in episodes:
+			meta_ds.add_episode(episode)
+
+	return (len(episodes), benchmark, None)
+
+def __metadata_get(broker, size, repeat):
+	meta_ds = broker['metadata_data_store']
+	factory = broker['episode_factory']
+
+	episodes = [factory.create_episode(title) for title in generate_titles(size, size * (repeat + 1))]
+	episodes = [episode for episode in episodes if not hasattr(episode, "episodes")]
+	meta_ds.add_episodes(episodes)
+
+	def benchmark(round):
+		return [meta_ds.get_episode(episode) for episode in episodes]
+
+	return (len(episodes), benchmark, None)
+
+def __format(broker, size, repeat):
+	files = __library_series(broker).files[:size]
+
+	def benchmark(round):
+		return [file.format() for file in files]
+
+	return (len(files), benchmark, None)
+
+def __parse_feed(broker, size, repeat):
+	document = feed_document(generate_titles(size), "http://127.0.0.1")
+
+	def benchmark(round):
+		return list(parse_feed(StringIO(document), AbstractXmlSource.item_fields))
+
+	return (size, benchmark, None)
+
+def __queue(format):
+
+	def queue(broker, size, repeat):
+		slots = []
+		for (i, title) in enumerate(generate_titles(size)):
+			slots.append({'cat': "tv", 'nzo_id': "SABnzbd_nzo_%d" % i, 'filename': title, 'msgid': "", 'status': "Queued"})
+		server = StubServer(sabnzbd_responder(slots))
+		params = {'api_key': "benchmark", 'format': format, '__check_version__': False}
+
+		# a new queue is created every round, jobs of the previous round aren't reused
+		def benchmark(round):
+			return SabnzbdQueue(server.url() + "/sabnzbd", set(["tv"]), params).jobs()
+
+		return (size, benchmark, server.close)
+
+	return queue
+
+BENCHMARKS = (
+	("create_episode", "parse release titles into episode objects", __create_episode),
+	("filter_undesirables", "check desirability of episodes against large series", __filter_undesirables),
+	("find_episode_on_disk", "look up files of episodes in large series", __find_episode_on_disk),
+	("metadata_add", "record episodes in metadata store, one transaction each", __metadata_add),
+	("metadata_get", "retrieve episode records from metadata store", __metadata_get),
+	("format", "format filenames of series episode files", __format),
+	("parse_feed", "parse items of large rss feed", __parse_feed),
+	("queue_xml", "retrieve and decode large SABnzbd xml queue", __queue('xml')),
+	("queue_json", "retrieve and decode large SABnzbd json queue", __queue('json')),
+)
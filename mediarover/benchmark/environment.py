@@ -0,0 +1,135 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import os.path
+
+from mediarover.config import read_config
+from mediarover.ds.metadata import Metadata
+from mediarover.episode.factory import EpisodeFactory
+from mediarover.filesystem.factory import FilesystemFactory
+from mediarover.series import build_watch_list
+from mediarover.source.mytvnzb.factory import MytvnzbFactory
+from mediarover.source.newzbin.factory import NewzbinFactory
+from mediarover.source.nzbmatrix.factory import NzbmatrixFactory
+from mediarover.source.nzbs.factory import NzbsFactory
+from mediarover.source.tvnzb.factory import TvnzbFactory
+from mediarover.utils.injection import initialize_broker
+from mediarover.version import __config_version__
+
+# size of generated episode files.  Files smaller than 50MB are ignored when 
+# series directories are scanned, the files are sparse and take up no space
+EPISODE_SIZE = 60 * 1024 * 1024
+
+# words used to build series names.  Names don't contain digits so they can't 
+# be mistaken for episode numbers
+WORDS = ("amber", "bishop", "castle", "delta", "ember", "falcon", "garden", "harbor", "island", "jasper", 
+	"kingdom", "lantern", "meadow", "north", "orchard", "pilot", "quarry", "river", "summit", "timber", 
+	"union", "valley", "winter", "yonder", "zephyr", "anchor", "border", "canyon", "desert", "empire", 
+	"frontier", "glacier")
+
+def series_name(index):
+	""" return unique series name for given index """
+	words = []
+	while True:
+		words.append(WORDS[index % len(WORDS)].capitalize())
+		index /= len(WORDS)
+		if index == 0:
+			break
+	if len(words) == 1:
+		words.append("Show")
+	return " ".join(words)
+
+def create_library(tv_root, names, seasons, episodes, size=EPISODE_SIZE):
+	""" 
+		populate given tv root with a directory for each of the given series names.  Every series contains the
+		given number of seasons and episodes per season.  Files that already exist are left alone
+	"""
+	for name in names:
+		for season in range(1, seasons + 1):
+			folder = os.path.join(tv_root, name, "Season %d" % season)
+			if not os.path.exists(folder):
+				os.makedirs(folder)
+			for episode in range(1, episodes + 1):
+				path = os.path.join(folder, "%s - s%02de%02d.avi" % (name, season, episode))
+				if not os.path.exists(path):
+					file = open(path, "wb")
+					try:
+						file.truncate(size)
+					finally:
+						file.close()
+
+def create_config_files(config_dir, tv_root, queue_root, sources=(), format='json'):
+	""" 
+		write minimal configuration files to given directory.  Quality management is on and every source 
+		provides medium quality episodes.  sources is a list of (name, provider, url) tuples
+	"""
+	for path in (config_dir, os.path.join(config_dir, "ds"), os.path.join(config_dir, "logs"), tv_root):
+		if not os.path.exists(path):
+			os.makedirs(path)
+
+	lines = [
+		"[tv]",
+		"tv_root = %s" % tv_root,
+		"[[quality]]",
+		"managed = True",
+		"desired = medium",
+		"[source]",
+	]
+	for (name, provider, url) in sources:
+		lines.extend(["[[%s]]" % name, "url = %s" % url, "provider = %s" % provider, "quality = medium"])
+	lines.extend([
+		"[queue]",
+		"[[sabnzbd]]",
+		"root = %s" % queue_root,
+		"api_key = benchmark",
+		"format = %s" % format,
+		"[__SYSTEM__]",
+		"__version__ = %d" % __config_version__['version'],
+	])
+
+	file = open(os.path.join(config_dir, "mediarover.conf"), "w")
+	try:
+		file.write("\n".join(lines) + "\n")
+	finally:
+		file.close()
+
+	# logging is configured by the caller
+	for name in ("logging.conf", "sabnzbd_episode_sort_logging.conf"):
+		open(os.path.join(config_dir, name), "w").close()
+
+def create_broker(resources_dir, config_dir):
+	""" 
+		register configuration, metadata store, factories and watched series with the dependency broker and 
+		return it.  Module dependencies are resolved once, only one environment can be used per process
+	"""
+	broker = initialize_broker()
+	broker.register('config_dir', config_dir)
+	broker.register('resources_dir', resources_dir)
+
+	config = read_config(resources_dir, config_dir)
+	broker.register('config', config)
+	broker.register('metadata_data_store', Metadata(journal_mode=config['metadata']['journal_mode']))
+	broker.register('episode_factory', EpisodeFactory())
+	broker.register('filesystem_factory', FilesystemFactory())
+	broker.register('newzbin', NewzbinFactory())
+	broker.register('tvnzb', TvnzbFactory())
+	broker.register('mytvnzb', MytvnzbFactory())
+	broker.register('nzbs', NzbsFactory())
+	broker.register('nzbmatrix', NzbmatrixFactory())
+	broker.register('watched_series', build_watch_list(config))
+
+	return broker
@@ -0,0 +1,482 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import os.path
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib
+import urllib2
+from cStringIO import StringIO
+from optparse import OptionParser
+
+try:
+	import cPickle as pickle
+except ImportError:
+	import pickle
+
+from mediarover import print_usage
+from mediarover.benchmark.environment import create_config_files, create_library, series_name
+from mediarover.benchmark.stub import StubServer, feed_document, queue_document
+from mediarover.episode.daily import DailyEpisode
+from mediarover.episode.multi import MultiEpisode
+from mediarover.episode.parser import get_parser
+from mediarover.episode.single import SingleEpisode
+from mediarover.series import Series
+from mediarover.source import AbstractXmlSource
+from mediarover.source.parser import parse_feed
+from mediarover.utils.configobj import ConfigObj
+from mediarover.version import __app_version__
+
+# query arguments holding credentials.  They are passed on while recording but never stored
+CREDENTIALS = ('apikey', 'ma_username', 'ma_password')
+
+# phases of a schedule run, in order.  Startup and shutdown cover the time spent outside 
+# of the scheduler, ie. loading modules and configuration, closing the metadata store
+PHASES = ("startup", "watch list", "sources", "filter", "scan", "decisions", "queue update", "shutdown")
+
+LOGGING_CONFIG = """[loggers]
+keys = root,timing
+
+[handlers]
+keys = logfile,timing
+
+[formatters]
+keys = default,timing
+
+[logger_root]
+level = INFO
+handlers = logfile
+
+[logger_timing]
+level = DEBUG
+handlers = timing
+propagate = 0
+qualname = mediarover.timing
+
+[handler_logfile]
+class = FileHandler
+level = INFO
+formatter = default
+args = (%r, 'a')
+
+[handler_timing]
+class = FileHandler
+level = DEBUG
+formatter = timing
+args = (%r, 'w')
+
+[formatter_default]
+format = %%(asctime)s %%(levelname)s - %%(message)s
+
+[formatter_timing]
+format = %%(created)f %%(message)s
+"""
+
+def run():
+
+	""" parse command line options """
+
+	usage = "%prog [--version] [--help] COMMAND [ARGS]"
+	description = "Description: time end-to-end schedule runs against local stand-ins for sources and SABnzbd"
+	epilog = """
+Available commands are:
+   record   Run schedule against configured sources and queue, recording their responses
+   run      Replay recorded (or synthetic) responses against generated tv libraries and report timings
+
+See 'python replay.py COMMAND --help' for more information on a specific command."""
+	parser = OptionParser(version=__app_version__, usage=usage, description=description, epilog=epilog, add_help_option=False)
+
+	# stop processing arguments when we find the command 
+	parser.disable_interspersed_args()
+
+	parser.add_option("-h", "--help", action="callback", callback=print_usage, help="show this help message and exit")
+
+	(options, args) = parser.parse_args()
+	if len(args):
+		command = args.pop(0)
+	else:
+		print_usage(parser)
+
+	if command == 'record':
+		record(args)
+	elif command == 'run':
+		replay(args)
+	else:
+		print "ERROR: Invalid command: %s" % command
+		parser.print_usage()
+		exit(2)
+
+def record(args):
+
+	usage = "%prog record [options]"
+	description = "Description: run schedule using the given configuration, passing all source and SABnzbd requests through a local proxy that records the responses"
+	epilog = """
+The run uses a copy of the configuration directory so the metadata store isn't 
+updated, yet downloads are scheduled for real unless --dry-run is given.  Api 
+keys and queue credentials are not recorded, feed contents (and the nzb links 
+found in them) are.
+
+Examples:
+   Record responses of a schedule run:
+     > python replay.py record --config /path/to/config/dir --output run.recording
+"""
+	parser = OptionParser(usage=usage, description=description, epilog=epilog, add_help_option=False)
+
+	parser.add_option("-c", "--config", metavar="/PATH/TO/CONFIG/DIR", default=os.path.expanduser("~/.mediarover"), help="path to application configuration directory")
+	parser.add_option("-o", "--output", metavar="FILE", help="file recorded responses are written to")
+	parser.add_option("-d", "--dry-run", action="store_true", default=False, help="don't schedule nzb's for download")
+	parser.add_option("-h", "--help", action="callback", callback=print_usage, help="show this help message and exit")
+
+	(options, args) = parser.parse_args(args)
+	if not options.output:
+		parser.error("an output file must be given")
+
+	config = ConfigObj(os.path.join(options.config, "mediarover.conf"))
+	if 'sabnzbd' not in config.get('queue', {}):
+		parser.error("no sabnzbd queue configured in %s" % options.config)
+
+	sources = []
+	upstreams = {}
+	for name in config.get('source', {}).sections:
+		sources.append((name, config['source'][name]['provider']))
+		upstreams[name] = config['source'][name]['url']
+
+	recorder = Recorder(upstreams, config['queue']['sabnzbd']['root'])
+	server = StubServer(recorder.respond)
+	work = tempfile.mkdtemp(prefix="mediarover-record-")
+	try:
+
+		# copy configuration and point sources and queue at the recording proxy
+		for name in ("ds", "logs"):
+			os.mkdir(os.path.join(work, name))
+		for name in ("logging.conf", "sabnzbd_episode_sort_logging.conf", os.path.join("ds", "metadata.db")):
+			if os.path.exists(os.path.join(options.config, name)):
+				shutil.copy2(os.path.join(options.config, name), os.path.join(work, name))
+
+		for (name, provider) in sources:
+			config['source'][name]['url'] = "%s/source/%s" % (server.url(), urllib.quote(name, ""))
+		config['queue']['sabnzbd']['root'] = "%s/sabnzbd" % server.url()
+		config.filename = os.path.join(work, "mediarover.conf")
+		config.write()
+
+		command = [sys.executable, os.path.join(sys.path[0], "mediarover.py"), "schedule", "--config", work]
+		if options.dry_run:
+			command.append("--dry-run")
+		status = subprocess.call(command)
+	finally:
+		server.close()
+		shutil.rmtree(work, ignore_errors=True)
+
+	if status != 0:
+		print "ERROR: schedule run failed, nothing recorded"
+		exit(1)
+
+	recording = {
+		'sources': sources,
+		'format': config['queue']['sabnzbd'].get('format', 'json'),
+		'responses': recorder.responses(),
+	}
+	file = open(options.output, "wb")
+	try:
+		pickle.dump(recording, file, pickle.HIGHEST_PROTOCOL)
+	finally:
+		file.close()
+
+	print "recorded %d response(s) to %s" % (sum([len(list) for list in recording['responses'].values()]), options.output)
+
+def replay(args):
+
+	usage = "%prog run [options]"
+	description = "Description: replay recorded source and SABnzbd responses from a local stub and time schedule runs against generated tv libraries of increasing size"
+	epilog = """
+Every library contains the series found in the recorded feeds, padded with 
+generated series.  Episode files are sparse and take up no disk space.  When no 
+recording is given, a feed listing episodes of the generated series is used.
+
+Examples:
+   Replay a recording against libraries of 100, 1000 and 10000 series:
+     > python replay.py run --recording run.recording
+
+   Replay synthetic responses, two runs per library (the second one warm):
+     > python replay.py run --series 100,1000 --runs 2
+"""
+	parser = OptionParser(usage=usage, description=description, epilog=epilog, add_help_option=False)
+
+	parser.add_option("-r", "--recording", metavar="FILE", help="file written by the record command")
+	parser.add_option("-s", "--series", default="100,1000,10000", metavar="N[,N...]", help="comma separated list of library sizes (default: 100,1000,10000)")
+	parser.add_option("--seasons", type="int", default=2, metavar="N", help="number of seasons of every generated series (default: 2)")
+	parser.add_option("--episodes", type="int", default=5, metavar="N", help="number of episodes per season (default: 5)")
+	parser.add_option("--items", type="int", default=500, metavar="N", help="number of items in synthetic feed (default: 500)")
+	parser.add_option("-n", "--runs", type="int", default=1, metavar="N", help="number of schedule runs per library (default: 1)")
+	parser.add_option("-d", "--directory", metavar="/PATH/TO/DIR", help="directory used for generated files (default: temporary directory that is removed afterwards)")
+	parser.add_option("-h", "--help", action="callback", callback=print_usage, help="show this help message and exit")
+
+	(options, args) = parser.parse_args(args)
+
+	try:
+		sizes = [int(size) for size in options.series.split(",")]
+	except ValueError:
+		parser.error("invalid list of library sizes: %s" % options.series)
+	if min(sizes) < 1 or options.runs < 1 or options.seasons < 1 or options.episodes < 1 or options.items < 1:
+		parser.error("sizes and counts must be positive")
+
+	if options.recording:
+		file = open(options.recording, "rb")
+		try:
+			recording = pickle.load(file)
+		finally:
+			file.close()
+		recorded = recorded_series(recording)
+	else:
+		recording = None
+		recorded = []
+
+	if options.directory:
+		root = options.directory
+	else:
+		root = tempfile.mkdtemp(prefix="mediarover-replay-")
+
+	columns = ["%8s" % "series", "%4s" % "run", "%8s" % "total"] + ["%*s" % (max(8, len(phase)), phase) for phase in PHASES]
+	print " ".join(columns)
+	try:
+		for size in sizes:
+
+			# pad recorded series with generated ones
+			names = list(recorded)
+			seen = set([Series.sanitize_series_name(name=name) for name in names])
+			i = 0
+			while len(names) < size:
+				if Series.sanitize_series_name(name=series_name(i)) not in seen:
+					names.append(series_name(i))
+				i += 1
+
+			if recording is None:
+				responses = synthetic_recording(names, options.seasons, options.episodes, options.items)
+			else:
+				responses = recording
+
+			base = os.path.join(root, str(size))
+			create_library(os.path.join(base, "tv"), names, options.seasons, options.episodes)
+
+			server = StubServer(Replayer(responses['responses']).respond)
+			try:
+				sources = [(name, provider, "%s/source/%s" % (server.url(), urllib.quote(name, ""))) for (name, provider) in responses['sources']]
+				config_dir = os.path.join(base, "config")
+				create_config_files(config_dir, os.path.join(base, "tv"), "%s/sabnzbd" % server.url(), sources, responses['format'])
+
+				for run in range(1, options.runs + 1):
+					timings = schedule(config_dir)
+					if timings is None:
+						print "ERROR: schedule run failed, see logs in %s" % os.path.join(config_dir, "logs")
+						exit(1)
+					(total, phases) = timings
+
+					columns = ["%8d" % len(names), "%4d" % run, "%8.3f" % total]
+					for phase in PHASES:
+						if phase in phases:
+							columns.append("%*.3f" % (max(8, len(phase)), phases[phase]))
+						else:
+							columns.append("%*s" % (max(8, len(phase)), "-"))
+					print " ".join(columns)
+			finally:
+				server.close()
+	finally:
+		if not options.directory:
+			shutil.rmtree(root, ignore_errors=True)
+
+def schedule(config_dir):
+	""" 
+		run schedule using configuration found in given directory.  Return tuple containing the wall-clock 
+		time and a dict of phase timings, None if the run failed
+	"""
+	logs = os.path.join(config_dir, "logs")
+	timing_log = os.path.join(logs, "timing.log")
+	file = open(os.path.join(config_dir, "logging.conf"), "w")
+	try:
+		file.write(LOGGING_CONFIG % (os.path.join(logs, "mediarover.log"), timing_log))
+	finally:
+		file.close()
+
+	output = open(os.path.join(logs, "output.log"), "a")
+	try:
+		start = time.time()
+		status = subprocess.call([sys.executable, os.path.join(sys.path[0], "mediarover.py"), "schedule", "--config", config_dir], stdout=output, stderr=subprocess.STDOUT)
+		end = time.time()
+	finally:
+		output.close()
+
+	if status != 0:
+		return None
+
+	# every phase logs the time it finished and its duration
+	phases = {}
+	first = None
+	last = None
+	file = open(timing_log)
+	try:
+		for line in file:
+			match = re.match("(\S+) (.+) phase finished in (\S+) seconds$", line.strip())
+			if match:
+				(finished, phase, elapsed) = (float(match.group(1)), match.group(2), float(match.group(3)))
+				phases[phase] = elapsed
+				if first is None:
+					first = finished - elapsed
+				last = finished
+	finally:
+		file.close()
+
+	if first is not None:
+		phases['startup'] = first - start
+		phases['shutdown'] = end - last
+
+	return (end - start, phases)
+
+def recorded_series(recording):
+	""" return list of names of the series found in recorded feeds """
+	parser = get_parser((MultiEpisode, DailyEpisode, SingleEpisode))
+
+	names = []
+	seen = set()
+	for (name, provider) in recording['sources']:
+		for (status, headers, body) in recording['responses'].get(request_key("/source/%s" % urllib.quote(name, ""), {}), []):
+			for record in parse_feed(StringIO(body), AbstractXmlSource.item_fields):
+				parsed = record.title and parser.parse(record.title)
+				if not parsed:
+					continue
+
+				# newzbin titles separate the series name and episode number with ' - '
+				series = re.sub("[\._/\\\\:]", " ", parsed[1]['series'].split(" - ")[0]).strip(" -")
+				sanitized = Series.sanitize_series_name(name=series)
+				if sanitized and sanitized not in seen:
+					seen.add(sanitized)
+					names.append(series)
+
+	return names
+
+def synthetic_recording(names, seasons, episodes, items):
+	""" 
+		return recording of a single feed listing episodes of the given series, half of them missing from disk.  
+		Every tenth item is already in the queue
+	"""
+	titles = []
+	for i in range(items):
+		name = names[(i * 7919) % len(names)]
+		titles.append("%s S%02dE%02d HDTV XviD" % (name, 1 + i % seasons, 1 + (i / seasons) % (episodes * 2)))
+
+	slots = []
+	for (i, title) in enumerate(titles[::10]):
+		slots.append({'cat': "tv", 'nzo_id': "SABnzbd_nzo_%d" % i, 'filename': title, 'msgid': "", 'status': "Queued"})
+
+	return {
+		'sources': [("synthetic", "nzbs")],
+		'format': 'json',
+		'responses': {
+			request_key("/source/synthetic", {}): [(200, {'Content-Type': "text/xml"}, feed_document(titles, "http://127.0.0.1"))],
+			request_key("/sabnzbd/api", {'mode': "version"}): [(200, {'Content-Type': "text/plain"}, "0.5.6\n")],
+			request_key("/sabnzbd/api", {'mode': "queue", 'output': "json"}): [(200, {'Content-Type': "application/json"}, queue_document(slots, 'json'))],
+		},
+	}
+
+def request_key(path, args):
+	""" return key identifying request for given path and query arguments, leaving out any credentials """
+	query = urllib.urlencode(sorted([(name, value) for (name, value) in args.items() if name not in CREDENTIALS]))
+	if query:
+		return "%s?%s" % (path, query)
+	return path
+
+class Recorder(object):
+	""" stub responder passing requests on to the real sources and queue, recording the responses """
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def respond(self, path, args):
+		""" forward request to upstream server and return its response """
+		if path.startswith("/source/") and urllib.unquote(path[len("/source/"):]) in self.__sources:
+			url = self.__sources[urllib.unquote(path[len("/source/"):])]
+		elif path.startswith("/sabnzbd/"):
+			url = "%s%s?%s" % (self.__queue_root, path[len("/sabnzbd"):], urllib.urlencode(args))
+		else:
+			return (404, {}, "not found")
+
+		try:
+			response = urllib2.urlopen(url, timeout=self.timeout)
+			try:
+				(status, headers, body) = (200, {'Content-Type': response.info().get("Content-Type", "text/plain")}, response.read())
+			finally:
+				response.close()
+		except urllib2.HTTPError, e:
+			(status, headers, body) = (e.code, {}, e.read())
+		except urllib2.URLError, e:
+			(status, headers, body) = (502, {}, str(e.reason))
+
+		self.__lock.acquire()
+		try:
+			self.__responses.setdefault(request_key(path, args), []).append((status, headers, body))
+		finally:
+			self.__lock.release()
+
+		return (status, headers, body)
+
+	def responses(self):
+		""" return dict mapping request keys to the list of responses received, in order """
+		return self.__responses
+
+	def __init__(self, sources, queue_root, timeout=60):
+		""" sources maps source names to their urls """
+		self.__sources = sources
+		self.__queue_root = queue_root.rstrip("/")
+		self.timeout = timeout
+		self.__responses = {}
+		self.__lock = threading.Lock()
+
+class Replayer(object):
+	""" 
+		stub responder answering requests with recorded responses.  Responses recorded for the same request 
+		are returned in order, the last one is repeated
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def respond(self, path, args):
+		""" return next response recorded for given request """
+		key = request_key(path, args)
+
+		self.__lock.acquire()
+		try:
+			responses = self.__responses.get(key)
+			if responses:
+				served = self.__served.get(key, 0)
+				self.__served[key] = served + 1
+				return responses[min(served, len(responses) - 1)]
+		finally:
+			self.__lock.release()
+
+		# downloads that weren't scheduled while recording are accepted as well
+		if path.endswith("/api") and args.get('mode') in ('addurl', 'addid'):
+			return (200, {'Content-Type': "text/plain"}, "ok\n")
+
+		return (404, {}, "not recorded")
+
+	def __init__(self, responses):
+		self.__responses = responses
+		self.__served = {}
+		self.__lock = threading.Lock()
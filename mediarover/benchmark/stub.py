@@ -0,0 +1,121 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import BaseHTTPServer
+import SocketServer
+import threading
+import urlparse
+from xml.sax.saxutils import escape
+
+try:
+	import json
+except ImportError:
+	try:
+		import simplejson as json
+	except ImportError:
+		json = None
+
+class StubServer(object):
+	""" 
+		local http server standing in for remote sources and queues.  Every GET request is answered by 
+		the given responder, a callable taking the request path and a dict of query arguments and 
+		returning a tuple containing the status code, a dict of response headers and the response body
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def url(self):
+		""" return base url of server, ie. http://127.0.0.1:PORT """
+		return "http://127.0.0.1:%d" % self.__server.server_address[1]
+
+	def close(self):
+		""" stop server and wait for it to exit """
+		self.__server.shutdown()
+		self.__server.server_close()
+		self.__thread.join()
+
+	def __init__(self, responder):
+
+		class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+			protocol_version = "HTTP/1.1"
+
+			# write each response in one go, small writes on a keep-alive connection are delayed by nagle
+			wbufsize = -1
+
+			def do_GET(self):
+				url = urlparse.urlsplit(self.path)
+				(status, headers, body) = responder(url.path, dict(urlparse.parse_qsl(url.query, True)))
+				self.send_response(status)
+				for (name, value) in headers.items():
+					self.send_header(name, value)
+				self.send_header("Content-Length", str(len(body)))
+				self.end_headers()
+				self.wfile.write(body)
+				self.wfile.flush()
+
+			def log_message(self, format, *args):
+				pass
+
+		self.__server = _ThreadingServer(("127.0.0.1", 0), Handler)
+		self.__thread = threading.Thread(target=self.__server.serve_forever)
+		self.__thread.setDaemon(True)
+		self.__thread.start()
+
+class _ThreadingServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+
+def feed_document(titles, url):
+	""" return rss document listing an item for each of the given titles.  Item links point below given url """
+	items = []
+	for (i, title) in enumerate(titles):
+		items.append("<item><title>%s</title><link>%s/nzb/%d</link><category>TV-XviD</category></item>" % (escape(title), escape(url), i))
+	return '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>stub</title>%s</channel></rss>' % "".join(items)
+
+def queue_document(slots, format):
+	""" 
+		return SABnzbd queue document of given format ('json' or 'xml') listing given slots.  Each slot is a 
+		dict containing cat, nzo_id, filename, msgid and status values
+	"""
+	if format == 'json':
+		return json.dumps({'queue': {'slots': slots}})
+
+	nodes = []
+	for slot in slots:
+		fields = "".join(["<%s>%s</%s>" % (name, escape(slot[name] or ""), name) for name in ('cat', 'nzo_id', 'filename', 'msgid', 'status')])
+		nodes.append("<slot>%s</slot>" % fields)
+	return '<?xml version="1.0" encoding="UTF-8" ?><queue><slots>%s</slots></queue>' % "".join(nodes)
+
+def sabnzbd_responder(slots, version="0.5.6"):
+	""" return responder answering SABnzbd api requests.  The queue lists given slots, added items are accepted and ignored """
+
+	def respond(path, args):
+		if not path.endswith("/api"):
+			return (404, {}, "not found")
+
+		mode = args.get('mode')
+		if mode == 'version':
+			return (200, {'Content-Type': "text/plain"}, "%s\n" % version)
+		elif mode == 'queue' and args.get('name') is None:
+			format = args.get('output', 'xml')
+			if format == 'json':
+				return (200, {'Content-Type': "application/json"}, queue_document(slots, format))
+			return (200, {'Content-Type': "text/xml"}, queue_document(slots, format))
+		elif mode in ('addurl', 'addid', 'queue'):
+			return (200, {'Content-Type': "text/plain"}, "ok\n")
+
+		return (200, {'Content-Type': "text/plain"}, "error: not implemented\n")
+
+	return respond
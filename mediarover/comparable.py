@@ -16,6 +16,8 @@
 class Comparable(object):
 	""" Comparable interface class """
 
+	__slots__ = ()
+
 	# abstract methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def __eq__(self, other):
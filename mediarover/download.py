@@ -18,6 +18,8 @@ from mediarover.comparable import Comparable
 class Download(Comparable):
 	""" Download interface class """
 
+	__slots__ = ()
+
 	# abstract methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def __hash__(self):
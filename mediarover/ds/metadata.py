@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from __future__ import with_statement
+from contextlib import contextmanager
 from string import Template
 from time import strftime
 
@@ -45,7 +46,13 @@ class Metadata(object):
 	def add_in_progress(self, title, type, quality):
 		""" record given nzb in progress table with type, and quality """
 		self.__dbh.execute("INSERT INTO in_progress (title, type, quality) VALUES (?,?,?)", (title, type, quality))
-		self.__dbh.commit()
+		self.__commit()
+
+	def add_in_progress_items(self, *records):
+		""" record given (title, type, quality) tuples in in_progress table using a single transaction """
+		if len(records) > 0:
+			self.__dbh.executemany("INSERT INTO in_progress (title, type, quality) VALUES (?,?,?)", records)
+			self.__commit()
 
 	def get_in_progress(self, title):
 		""" retrieve tuple from the in_progress table for a given session id.  If given id doesn't exist, return None """
@@ -57,7 +64,7 @@ class Metadata(object):
 		count = 0
 		if len(titles) > 0:
 			count = self.__dbh.execute("DELETE FROM in_progress WHERE title IN (%s)" % ",".join(["?" for i in titles]), titles).rowcount
-			self.__dbh.commit()
+			self.__commit()
 		return count
 
 	def list_in_progress(self):
@@ -66,60 +73,42 @@ class Metadata(object):
 
 	def add_episode(self, episode):
 		""" record given episode and quality in database """
-
-		# first, determine if episode series is in db
-		series = self.__fetch_series_data(episode.series)
-
-		# if series doesn't exist, register it
-		if series is None:
-			sanitized = episode.series.sanitize_series_name(series=episode.series)
-			args = (episode.series.name, sanitized)
-			series = self.__dbh.execute("INSERT INTO series (name, sanitized_name) VALUES (?,?)", args).lastrowid
-		else:
-			series = series['id']
-
-		# check if episode already exists in database
-		current = self.get_episode(episode)
-		if current is None:
-			args = [series]
-			sql = "INSERT INTO "
-			try:
-				episode.year
-			except AttributeError:
-				args.extend([episode.season, episode.episode, episode.quality])
-				sql += "single_episode (series, season, episode, quality) VALUES (?,?,?,?)"
-			else:
-				args.extend([episode.year, episode.month, episode.day, episode.quality])
-				sql += "daily_episode (series, year, month, day, quality) VALUES (?,?,?,?,?)"
-
-			# insert episode
-			self.__dbh.execute(sql, (args))
-		
-		# update existing episode
-		else:
-			args = (episode.quality, current['id'])
-			try:
-				episode.year
-			except AttributeError:
-				table = "single_episode"
-			else:
-				table = "daily_episode"
-
-			# update episode data
-			self.__dbh.execute("UPDATE %s SET quality=? WHERE id=?" % table, args)
-
-		self.__dbh.commit()
+		self.add_episodes([episode])
+
+	def add_episodes(self, episodes):
+		""" record given episodes and their quality in database using a single transaction """
+		with self.batch():
+			single = []
+			daily = []
+			for episode in episodes:
+				series = self.__series_id(episode.series, create=True)
+				try:
+					episode.year
+				except AttributeError:
+					single.append((episode.quality, series, episode.season, episode.episode))
+				else:
+					daily.append((episode.quality, series, episode.year, episode.month, episode.day))
+
+			# update any existing episodes, then insert the ones that are missing
+			if len(single):
+				self.__dbh.executemany("UPDATE single_episode SET quality=? WHERE series=? AND season=? AND episode=?", single)
+				self.__dbh.executemany("INSERT OR IGNORE INTO single_episode (quality, series, season, episode) VALUES (?,?,?,?)", single)
+			if len(daily):
+				self.__dbh.executemany("UPDATE daily_episode SET quality=? WHERE series=? AND year=? AND month=? AND day=?", daily)
+				self.__dbh.executemany("INSERT OR IGNORE INTO daily_episode (quality, series, year, month, day) VALUES (?,?,?,?,?)", daily)
 
 	def get_episode(self, episode, series=None):
 		""" retrieve database record for given episode.  Return None if not found """
 
 		# series id wasn't given, try and find it
 		if series is None:
-			series = self.__fetch_series_data(episode.series)
+			series = self.__series_id(episode.series)
+		else:
+			series = series['id']
 
 		result = None
 		if series is not None:
-			args = [series['id']]
+			args = [series]
 			try:
 				episode.year
 			except AttributeError:
@@ -133,10 +122,28 @@ class Metadata(object):
 
 		return result
 
+	def get_episode_qualities(self, series):
+		""" 
+			return dict containing the quality of every episode recorded for given series, keyed by (season, episode)
+			for series episodes and (year, month, day) for daily episodes
+		"""
+		sql = """SELECT e.season, e.episode, NULL, e.quality FROM single_episode e JOIN series s ON e.series=s.id WHERE s.sanitized_name=? 
+			UNION ALL SELECT e.year, e.month, e.day, e.quality FROM daily_episode e JOIN series s ON e.series=s.id WHERE s.sanitized_name=?"""
+
+		sanitized = series.sanitize_series_name(series=series)
+		qualities = {}
+		for r in self.__dbh.execute(sql, (sanitized, sanitized)):
+			if r[2] is None:
+				qualities[(r[0], r[1])] = r[3]
+			else:
+				qualities[(r[0], r[1], r[2])] = r[3]
+
+		return qualities
+
 	def add_delayed_item(self, item):
 		""" add given item to delayed_item table """
 		self.__dbh.execute("INSERT INTO delayed_item (title, url, type, priority, quality, delay) VALUES (?,?,?,?,?,?)", (item.title(), item.url(), item.type(), item.priority(), item.quality(), item.delay()))
-		self.__dbh.commit()
+		self.__commit()
 
 		logger = logging.getLogger("mediarover.ds.metadata")
 		logger.info("delayed scheduling '%s' for download", item.title())
@@ -144,12 +151,12 @@ class Metadata(object):
 	def delete_delayed_item(self, item):
 		""" remove given item from delayed_item table """
 		self.__dbh.execute("DELETE FROM delayed_item WHERE title=?", (item.title(),))
-		self.__dbh.commit()
+		self.__commit()
 
 	def delete_stale_delayed_items(self):
 		""" remove all stale items from delayed_item table """
 		self.__dbh.execute("DELETE FROM delayed_item WHERE delay < 1")
-		self.__dbh.commit()
+		self.__commit()
 
 	def get_actionable_delayed_items(self):
 		""" return list of items from the delayed_item table that have delay value less than 1 """
@@ -171,8 +178,109 @@ class Metadata(object):
 	def reduce_item_delay(self):
 		""" reduce delay count by one for all items in delayed_item table """
 		self.__dbh.execute("UPDATE delayed_item SET delay=delay-1 WHERE delay > 0");
-		self.__dbh.commit()
-	
+		self.__commit()
+
+	def get_indexed_directory(self, path):
+		""" retrieve directory_index record for given filesystem path.  Return None if not found """
+		return self.__dbh.execute("SELECT path, parent, mtime, indexed, filter FROM directory_index WHERE path=?", (self.__to_text(path),)).fetchone()
+
+	def get_directory_index(self):
+		""" 
+			return dict mapping every indexed directory path to a tuple containing its mtime, the time it was indexed 
+			and list of subdirectories
+		"""
+		index = {}
+		children = {}
+		for r in self.__dbh.execute("SELECT path, parent, mtime, indexed FROM directory_index ORDER BY path"):
+			path = self.__to_path(r['path'])
+			index[path] = (r['mtime'], r['indexed'], children.setdefault(path, []))
+			if r['parent'] is not None:
+				children.setdefault(self.__to_path(r['parent']), []).append(path)
+		return index
+
+	def list_indexed_subdirectories(self, path):
+		""" return list of indexed subdirectory paths found beneath given directory """
+		return [self.__to_path(r['path']) for r in self.__dbh.execute("SELECT path FROM directory_index WHERE parent=? ORDER BY path", (self.__to_text(path),))]
+
+	def list_indexed_files(self, path):
+		""" return list of file_index records (as dicts) found in given directory """
+		records = []
+		for r in self.__dbh.execute("SELECT path, mtime, size, inode, type, season, episode, end_episode, year, month, day FROM file_index WHERE directory=? ORDER BY path", (self.__to_text(path),)):
+			record = dict(zip(r.keys(), r))
+			record['path'] = self.__to_path(record['path'])
+			records.append(record)
+		return records
+
+	def index_directory(self, path, mtime, indexed, filter, subdirectories, files):
+		"""
+			record the contents of given directory, read at time indexed, in the filesystem index.  filter identifies 
+			the settings used to select the files recorded.  Any previously indexed subdirectories or files that are 
+			no longer present are removed from the index
+
+			files is a list of dicts containing the file_index fields (minus directory)
+		"""
+		text = self.__to_text(path)
+		if self.__dbh.execute("UPDATE directory_index SET mtime=?, indexed=?, filter=? WHERE path=?", (mtime, indexed, filter, text)).rowcount == 0:
+			self.__dbh.execute("INSERT INTO directory_index (path, parent, mtime, indexed, filter) VALUES (?,?,?,?,?)", (text, None, mtime, indexed, filter))
+
+		# drop any subdirectories that have disappeared since the last scan
+		for old in self.list_indexed_subdirectories(path):
+			if old not in subdirectories:
+				self.__dbh.execute("DELETE FROM file_index WHERE directory=?", (self.__to_text(old),))
+				self.__dbh.execute("DELETE FROM directory_index WHERE path=?", (self.__to_text(old),))
+
+		# register new subdirectories without an mtime so that they are scanned
+		# the next time they are encountered
+		self.__dbh.executemany("INSERT OR IGNORE INTO directory_index (path, parent, mtime) VALUES (?,?,NULL)", [(self.__to_text(dir), text) for dir in subdirectories])
+
+		# finally, replace the list of files found in current directory
+		self.__dbh.execute("DELETE FROM file_index WHERE directory=?", (text,))
+		self.__dbh.executemany("INSERT INTO file_index (path, directory, mtime, size, inode, type, season, episode, end_episode, year, month, day) VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
+			[(self.__to_text(f['path']), text, f['mtime'], f['size'], f['inode'], f['type'], f['season'], f['episode'], f['end_episode'], f['year'], f['month'], f['day']) for f in files])
+
+		self.__commit()
+
+	def get_seen_items(self, source):
+		""" return dict of seen_item records (as dicts) for given source, keyed by item url """
+		items = {}
+		for r in self.__dbh.execute("SELECT url, title, series, decision, inputs FROM seen_item WHERE source=?", (source,)):
+			items[r['url']] = dict(zip(r.keys(), r))
+		return items
+
+	def record_seen_items(self, source, items, timestamp):
+		""" 
+			add or update seen_item records for given source.  items is a list of dicts containing the 
+			seen_item fields (minus source and last_seen)
+		"""
+		self.__dbh.executemany("INSERT OR REPLACE INTO seen_item (source, url, title, series, decision, inputs, last_seen) VALUES (?,?,?,?,?,?,?)", 
+			[(source, i['url'], i['title'], i['series'], i['decision'], i['inputs'], timestamp) for i in items])
+		self.__commit()
+
+	def delete_stale_seen_items(self, timestamp):
+		""" remove all seen_item records that haven't been seen since given timestamp """
+		self.__dbh.execute("DELETE FROM seen_item WHERE last_seen < ?", (timestamp,))
+		self.__commit()
+
+	@contextmanager
+	def batch(self):
+		""" 
+			context manager grouping all writes made within it into a single transaction.  Batches may be nested, 
+			the transaction is committed when the outermost batch exits or rolled back if it raises an exception
+		"""
+		self.__batch_depth += 1
+		try:
+			yield self
+		except:
+			self.__batch_depth -= 1
+			if self.__batch_depth == 0:
+				self.__dbh.rollback()
+				self.__series_ids = {}
+			raise
+		else:
+			self.__batch_depth -= 1
+			if self.__batch_depth == 0:
+				self.__dbh.commit()
+
 	def migrate_schema(self, version=None, rollback=False):
 		""" 
 			migrate metadata schema from one version to another. If given a version number, attempt to migrate 
@@ -253,16 +361,44 @@ class Metadata(object):
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def __fetch_series_data(self, series):
-		""" query the database and return row data for the given series (if exists) """
-		details = None
+	def __commit(self):
+		""" commit current transaction unless inside a batch """
+		if self.__batch_depth == 0:
+			self.__dbh.commit()
+
+	def __series_id(self, series, create=False):
+		""" 
+			return database id of given series.  If series isn't in the database, register it when create is True, 
+			otherwise return None.  Ids are cached for the lifetime of the connection
+		"""
+		sanitized = series.sanitize_series_name(series=series)
+		if sanitized not in self.__series_ids:
+			row = self.__dbh.execute("SELECT id FROM series WHERE sanitized_name=?", (sanitized,)).fetchone()
+			if row is not None:
+				self.__series_ids[sanitized] = row['id']
+			elif create:
+				self.__series_ids[sanitized] = self.__dbh.execute("INSERT INTO series (name, sanitized_name) VALUES (?,?)", (series.name, sanitized)).lastrowid
+				self.__commit()
+			else:
+				return None
+
+		return self.__series_ids[sanitized]
 
-		args = (series.sanitize_series_name(series=series),)
-		row = self.__dbh.execute("SELECT id, name, sanitized_name FROM series WHERE sanitized_name=?", args).fetchone()
-		if row is not None:
-			details = row
+	def __to_text(self, path):
+		""" 
+			convert given filesystem path to unicode for storage.  sqlite refuses non-ascii byte strings and the 
+			filesystem encoding can't be relied upon (it is ascii under the C locale), so every byte is mapped
+			to the code point of the same value
+		"""
+		if isinstance(path, str):
+			path = path.decode("latin-1")
+		return path
 
-		return details
+	def __to_path(self, text):
+		""" convert given stored path back to a filesystem path """
+		if isinstance(text, unicode):
+			text = text.encode("latin-1")
+		return text
 
 	def _build_schema(self):
 		""" invoked the first time an instance is created, or when the database file cannot be found """
@@ -295,17 +431,32 @@ class Metadata(object):
 
 	schema_version = property(fget=_schema_version_prop, fset=_schema_version_prop, doc="database schema version")
 
-	def __init__(self, check_schema_version=True):
+	def __init__(self, check_schema_version=True, journal_mode=None):
 
 		db = os.path.join(self.config_dir, "ds", "metadata.db")
 		exists = True if os.path.exists(db) else False
 
+		self.__batch_depth = 0
+		self.__series_ids = {}
+
 		# establish connection to database
 		self.__dbh = sqlite3.connect(db)
 
 		# tell connection to return Row objects instead of tuples
 		self.__dbh.row_factory = sqlite3.Row
 
+		# ATTENTION: the journal mode is stored in the database file, so it must be set 
+		# explicitly in order to switch back to the default mode.  Switching requires 
+		# exclusive access, leave the current mode alone if the database is busy
+		if journal_mode is not None:
+			current = self.__dbh.execute("PRAGMA journal_mode").fetchone()[0]
+			if current.lower() != journal_mode.lower():
+				try:
+					self.__dbh.execute("PRAGMA journal_mode = %s" % journal_mode)
+				except sqlite3.OperationalError, e:
+					logger = logging.getLogger("mediarover.ds.metadata")
+					logger.warning("unable to change journal mode from '%s' to '%s': %s", current, journal_mode, e)
+
 		# db exists, check that schema version is current
 		if exists:
 			if check_schema_version and self.schema_version != __schema_version__:
@@ -17,6 +17,8 @@ from mediarover.download import Download
 
 class Episode(Download):
 
+	__slots__ = ()
+
 	@classmethod
 	def handle(cls, string):
 		raise NotImplementedError
@@ -19,12 +19,15 @@ import re
 
 from mediarover.error import *
 from mediarover.episode import Episode
+from mediarover.utils.quality import intern_quality
 
 class DailyEpisode(Episode):
 	""" represent a daily episode of tv """
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	__slots__ = ('_series', '_year', '_month', '_day', '_title', '_quality', '_hash')
+
 	__supported_patterns = (
 		# daily regex: <year>-<month>-<day>
 		re.compile("(?P<year>\d{4})[\.\-\/\_ ]?(?P<month>\d{2})[\.\-\/\_ ]?(?P<day>\d{2})"),
@@ -54,6 +57,19 @@ class DailyEpisode(Episode):
 				<series>.<season>[xX]<episode>
 				<series>.<year>.<day>.<month>
 		"""
+		# daily shows
+		for pattern in cls.get_supported_patterns():
+			match = pattern.search(string)
+			if match:
+				groups = match.groupdict()
+				groups['series'] = string[:match.start()]
+				return cls.extract_from_groups(groups, **kwargs)
+
+		return cls.extract_from_groups({}, **kwargs)
+
+	@classmethod
+	def extract_from_groups(cls, groups, **kwargs):
+		""" build episode values using named groups matched by one of the supported patterns (and series name) """
 		params = {
 			'series':None,
 			'year':None,
@@ -63,23 +79,15 @@ class DailyEpisode(Episode):
 			'quality':None,
 		}
 
-		# daily shows
-		for pattern in cls.get_supported_patterns():
-			match = pattern.search(string)
-			if match:
-				params['year'] = kwargs['year'] if 'year' in kwargs else match.group('year')
-				params['month'] = kwargs['month'] if 'month' in kwargs else match.group('month')
-				params['day'] = kwargs['day'] if 'day' in kwargs else match.group('day')
-				break
+		params['year'] = kwargs['year'] if 'year' in kwargs else groups.get('year')
+		params['month'] = kwargs['month'] if 'month' in kwargs else groups.get('month')
+		params['day'] = kwargs['day'] if 'day' in kwargs else groups.get('day')
 
-		# if we've got a match object, try to set series 
+		# if we've got a match, try to set series 
 		if 'series' in kwargs:
 			params['series'] = kwargs['series']
-
-		elif match:
-			start = 0 
-			end = match.start()
-			params['series'] = match.string[start:end]
+		else:
+			params['series'] = groups.get('series')
 
 		# finally, set the episode title
 		# NOTE: title will only be set if it was specifically provided, meaning
@@ -130,8 +138,9 @@ class DailyEpisode(Episode):
 		return not self == other
 
 	def __hash__(self):
-		hash = "%s %04d-%02d-%02d" % (Series.sanitize_series_name(series=self.series), self.year, self.month, self.day)
-		return hash.__hash__()
+		if self._hash is None:
+			self._hash = hash((self._series.sanitize_series_name(series=self._series), self._year, self._month, self._day))
+		return self._hash
 
 	def __repr__(self):
 		return "%s(series=%r,year=%r,month=%r,day=%r,title=%r)" % (self.__class__.__name__,self.series,self.year,self.month,self.day,self.title)
@@ -161,7 +170,7 @@ class DailyEpisode(Episode):
 
 	def _quality_prop(self, quality=None):
 		if quality is not None:
-			self._quality = quality
+			self._quality = intern_quality(quality)
 		return self._quality
 
 	# property definitions- - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -188,5 +197,6 @@ class DailyEpisode(Episode):
 		self._month = int(month)
 		self._day = int(day)
 		self._title = title
-		self._quality = quality
+		self._quality = intern_quality(quality)
+		self._hash = None
 
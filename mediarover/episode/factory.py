@@ -18,6 +18,7 @@ from mediarover.error import InvalidEpisodeString
 from mediarover.episode.single import SingleEpisode
 from mediarover.episode.daily import DailyEpisode
 from mediarover.episode.multi import MultiEpisode
+from mediarover.episode.parser import get_parser
 from mediarover.factory import EpisodeFactory as Factory
 from mediarover.series import Series
 from mediarover.utils.injection import is_instance_of, Dependency
@@ -35,18 +36,17 @@ class EpisodeFactory(Factory):
 	def create_episode(self, string, **kwargs):
 
 		# parse given string and extract episode attributes
-		if MultiEpisode.handle(string):
-			params = MultiEpisode.extract_from_string(string, **kwargs)
-		elif DailyEpisode.handle(string):
-			params = DailyEpisode.extract_from_string(string, **kwargs)
-		elif SingleEpisode.handle(string):
-			params = SingleEpisode.extract_from_string(string, **kwargs)
-		else:
+		parsed = get_parser((MultiEpisode, DailyEpisode, SingleEpisode), self.config['tv']['episode_patterns']).parse(string)
+		if parsed is None:
 			raise InvalidEpisodeString("unable to identify episode type: %r" % string)
 
+		(episode_class, groups, sanitized_series) = parsed
+		params = episode_class.extract_from_groups(groups, **kwargs)
+
 		# locate series object.  If series is unknown, create new series
 		if type(params['series']) is not Series:
-			sanitized_series = Series.sanitize_series_name(name=params['series'])
+			if 'series' in kwargs:
+				sanitized_series = Series.sanitize_series_name(name=params['series'])
 			if sanitized_series in self.watched_series:
 				params['series'] = self.watched_series[sanitized_series]
 			else:
@@ -60,10 +60,5 @@ class EpisodeFactory(Factory):
 			else:
 				params['quality'] = self.config['tv']['quality']['desired']
 
-		if 'start_episode' in params:
-			return MultiEpisode(**params)
-		elif 'year' in params:
-			return DailyEpisode(**params)
-		else:
-			return SingleEpisode(**params)
+		return episode_class(**params)
 
@@ -26,6 +26,8 @@ class MultiEpisode(Episode):
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	__slots__ = ('_episodes', '_title')
+
 	__supported_patterns = (
 		# multiepisode 1 regex, ie. s03e20s03e21, s03e20-s03e21, s03e20e21, s03e20-e21
 		re.compile("s(?P<start_season>\d{1,2})e(?P<start_episode>\d{1,3})-?(?:s?(?P<end_season>\d{1,2}))?e(?P<end_episode>\d{1,3})", re.IGNORECASE),
@@ -54,6 +56,18 @@ class MultiEpisode(Episode):
 	@classmethod
 	def extract_from_string(cls, string, **kwargs):
 		""" parse given string and attempt to extract multiepisode values """
+		for pattern in cls.get_supported_patterns():
+			match = pattern.search(string)
+			if match:
+				groups = match.groupdict()
+				groups['series'] = string[:match.start()]
+				return cls.extract_from_groups(groups, **kwargs)
+
+		return cls.extract_from_groups({}, **kwargs)
+
+	@classmethod
+	def extract_from_groups(cls, groups, **kwargs):
+		""" build multiepisode values using named groups matched by one of the supported patterns (and series name) """
 		params = {
 			'series': None,
 			'season': None,
@@ -63,39 +77,30 @@ class MultiEpisode(Episode):
 			'quality':None,
 		}
 
-		for pattern in cls.get_supported_patterns():
-			match = pattern.search(string)
-			if match:
-				group = match.groupdict()
-				if 'season' in kwargs:
-					params['start_season'] = params['end_season'] = kwargs['season']
-				else:
-					params['start_season'] = group['start_season']
-					if group.get('end_season') is None:
-						params['end_season'] = params['start_season']
-					else:
-						params['end_season'] = group['end_season']
-				params['start_episode'] = group['start_episode']
-				params['end_episode'] = group['end_episode']
-				break
-
-		if params['start_season'] == params['end_season']:
-			params['season'] = params['start_season']
-			del params['start_season']
-			del params['end_season']
+		if 'season' in kwargs:
+			start_season = end_season = kwargs['season']
+		else:
+			start_season = groups.get('start_season')
+			if groups.get('end_season') is None:
+				end_season = start_season
+			else:
+				end_season = groups['end_season']
+		params['start_episode'] = groups.get('start_episode')
+		params['end_episode'] = groups.get('end_episode')
+
+		if start_season == end_season:
+			params['season'] = start_season
 		else:
 			raise InvalidMultiEpisodeData("MultiEpisode parts must be from the same season")
 
 		if None in (params['start_episode'], params['end_episode']):
 			raise InvalidMultiEpisodeData("Unable to determine start and end of multiepisode")
 
-		# if we've got a match object, try to set series 
+		# if we've got a match, try to set series 
 		if 'series' in kwargs:
 			params['series'] = kwargs['series']
-		elif match:
-			start = 0
-			end = match.start()
-			params['series'] = match.string[start:end]
+		else:
+			params['series'] = groups.get('series')
 
 		# finally, set the episode title
 		# NOTE: title will only be set if it was specifically provided, meaning
@@ -0,0 +1,146 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import re
+
+from mediarover.episode.daily import DailyEpisode
+from mediarover.episode.multi import MultiEpisode
+from mediarover.episode.single import SingleEpisode
+from mediarover.error import ConfigurationError
+from mediarover.series import Series
+
+# matches the start of a named group or a named backreference
+GROUP_REGEX = re.compile(r"\(\?P(<|=)(\w+)")
+
+class TitleParser(object):
+	"""
+		identify and parse episode titles using a single regular expression built from the supported patterns of
+		the given episode classes.  The first pattern (in order of precedence) found anywhere in a title wins, as
+		if each pattern was searched for in turn.  Parsed titles are kept in a bounded cache of recently used titles
+	"""
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# number of recently parsed titles to remember
+	cache_size = 2048
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def parse(self, string):
+		"""
+			return (episode class, groups, sanitized series name) tuple for given title, None if the title doesn't
+			match any of the supported patterns.  Groups holds the named groups of the matching pattern, along with
+			the series name (the text preceding the match) unless the pattern defines it
+		"""
+		recent = self.__recent
+		if string in recent:
+			return recent[string]
+
+		if string in self.__older:
+			result = self.__older[string]
+		else:
+			result = self.__match(string)
+
+		# once full, recently used titles become the older generation and the previous one is dropped.  Titles
+		# used in the meantime are carried over, approximating a LRU cache of (up to) twice the size
+		if len(recent) >= self.cache_size:
+			self.__older = recent
+			self.__recent = recent = {}
+		recent[string] = result
+
+		return result
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __match(self, string):
+		""" parse given title """
+		match = self.__regex.match(string)
+		if match is None:
+			return None
+
+		# the group wrapping a pattern is the outermost group of its alternative and therefore the last one
+		# matched.  Match the original pattern where it was found to get its named groups
+		(cls, regex) = self.__alternatives[match.lastindex]
+		start = match.start(match.lastindex)
+		groups = regex.match(string, start).groupdict()
+		if groups.get('series') is None:
+			groups['series'] = string[:start]
+
+		return (cls, groups, Series.sanitize_series_name(name=groups['series']))
+
+	def __init__(self, classes, extra_patterns=()):
+		"""
+			classes: list of episode classes in order of precedence
+			extra_patterns: list of user defined patterns, tried before those of the given classes.  The episode
+			  class of each is determined by the named groups it defines
+		"""
+		patterns = []
+		for pattern in extra_patterns:
+			try:
+				regex = re.compile(pattern, re.IGNORECASE)
+			except re.error, e:
+				raise ConfigurationError("invalid episode pattern %r: %s" % (pattern, e))
+			patterns.append((self.__pattern_class(classes, regex), regex))
+
+		for cls in classes:
+			for regex in cls.get_supported_patterns():
+				patterns.append((cls, regex))
+
+		# wrap each pattern in a group inside a lookahead preceded by a lazy prefix and anchor the lot at the
+		# start of the title.  Alternatives are tried in order, each finding its leftmost match, which is what
+		# searching for each pattern separately would have done.  Group names are made unique per alternative
+		# NOTE: the built in patterns are either case insensitive or only contain digits
+		alternatives = []
+		for (i, (cls, regex)) in enumerate(patterns):
+			source = GROUP_REGEX.sub(lambda m: "(?P%sp%d_%s" % (m.group(1), i, m.group(2)), regex.pattern)
+			alternatives.append("(?=.*?(?P<p%d>%s))" % (i, source))
+		self.__regex = re.compile("^(?:%s)" % "|".join(alternatives), re.IGNORECASE | re.DOTALL)
+
+		self.__alternatives = {}
+		for (i, pattern) in enumerate(patterns):
+			self.__alternatives[self.__regex.groupindex["p%d" % i]] = pattern
+
+		self.__recent = {}
+		self.__older = {}
+
+	def __pattern_class(self, classes, regex):
+		""" determine which of the given episode classes handles titles matched by given user defined pattern """
+		groups = regex.groupindex
+		if 'start_episode' in groups and 'end_episode' in groups:
+			base = MultiEpisode
+		elif 'year' in groups and 'month' in groups and 'day' in groups:
+			base = DailyEpisode
+		elif 'season' in groups and 'episode' in groups:
+			base = SingleEpisode
+		else:
+			raise ConfigurationError("episode pattern %r must define groups season and episode, start_episode and end_episode, or year, month and day" % regex.pattern)
+
+		for cls in classes:
+			if issubclass(cls, base):
+				return cls
+
+		raise ConfigurationError("episode pattern %r not supported here" % regex.pattern)
+
+# parsers shared by all factories using the same episode classes and patterns
+_parsers = {}
+
+def get_parser(classes, extra_patterns=()):
+	""" return TitleParser for given episode classes and user defined patterns """
+	key = (tuple(classes), tuple(extra_patterns))
+	if key not in _parsers:
+		_parsers[key] = TitleParser(classes, extra_patterns)
+
+	return _parsers[key]
@@ -19,12 +19,15 @@ import re
 
 from mediarover.error import *
 from mediarover.episode import Episode
+from mediarover.utils.quality import intern_quality
 
 class SingleEpisode(Episode):
 	""" represents an episode of tv """
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	__slots__ = ('_series', '_season', '_episode', '_title', '_quality', '_hash')
+
 	__supported_patterns = (
 		# episode 1 regex, ie. s03e10
 		re.compile("s(?P<season>\d{1,2})e(?P<episode>\d{1,3})", re.IGNORECASE),
@@ -57,6 +60,19 @@ class SingleEpisode(Episode):
 				<series>.<season>[xX]<episode>
 				<series>.<year>.<day>.<month>
 		"""
+		# check if given string contains season and episode numbers
+		for pattern in cls.get_supported_patterns():
+			match = pattern.search(string)
+			if match:
+				groups = match.groupdict()
+				groups['series'] = string[:match.start()]
+				return cls.extract_from_groups(groups, **kwargs)
+
+		return cls.extract_from_groups({}, **kwargs)
+
+	@classmethod
+	def extract_from_groups(cls, groups, **kwargs):
+		""" build episode values using named groups matched by one of the supported patterns (and series name) """
 		params = {
 			'series':None,
 			'season':None,
@@ -65,24 +81,14 @@ class SingleEpisode(Episode):
 			'quality':None,
 		}
 
-		# check if given string contains season and episode numbers
-		for pattern in cls.get_supported_patterns():
-			match = pattern.search(string)
-			if match:
-				params['season'] = kwargs['season'] if 'season' in kwargs else match.group('season')
-				params['episode'] = kwargs['episode'] if 'episode' in kwargs else match.group('episode')
-				break
+		params['season'] = kwargs['season'] if 'season' in kwargs else groups.get('season')
+		params['episode'] = kwargs['episode'] if 'episode' in kwargs else groups.get('episode')
 
-		# if we've got a match object, try to set series 
+		# if we've got a match, try to set series 
 		if 'series' in kwargs:
 			params['series'] = kwargs['series']
-
-		# grab series name and see if it's in the watched list.  If not,
-		# create a new series object
-		elif match:
-			start = 0 
-			end = match.start()
-			params['series'] = match.string[start:end]
+		else:
+			params['series'] = groups.get('series')
 
 		# finally, set the episode title
 		# NOTE: title will only be set if it was specifically provided, meaning
@@ -132,8 +138,9 @@ class SingleEpisode(Episode):
 		return not self == other
 
 	def __hash__(self):
-		hash = "%s %dx%02d" % (self.series.sanitize_series_name(series=self.series), self.season, self.episode)
-		return hash.__hash__()
+		if self._hash is None:
+			self._hash = hash((self._series.sanitize_series_name(series=self._series), self._season, self._episode))
+		return self._hash
 
 	def __repr__(self):
 		return "%s(series=%r,season=%r,episode=%r,quality=%r,title=%r)" % (self.__class__.__name__,self.series,self.season,self.episode,self.quality,self.title)
@@ -157,7 +164,7 @@ class SingleEpisode(Episode):
 
 	def _quality_prop(self, quality=None):
 		if quality is not None:
-			self._quality = quality
+			self._quality = intern_quality(quality)
 		return self._quality
 
 	# property definitions- - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -184,5 +191,6 @@ class SingleEpisode(Episode):
 		self._season = int(season)
 		self._episode = int(episode)
 		self._title = title
-		self._quality = quality
+		self._quality = intern_quality(quality)
+		self._hash = None
 
@@ -28,6 +28,8 @@ class FilesystemEpisode(Comparable):
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	__slots__ = ('__path', '__episode', '__size')
+
 	config = Dependency('config', is_instance_of(ConfigObj))
 
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -263,6 +265,8 @@ class FilesystemSingleEpisode(SingleEpisode):
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	__slots__ = ()
+
 	__supported_patterns = (
 		# episode 1 regex, ie 310
 		#
@@ -293,7 +297,8 @@ from mediarover.episode.daily import DailyEpisode
 
 class FilesystemDailyEpisode(DailyEpisode):
 	""" filesystem daily episode """
-	pass
+
+	__slots__ = ()
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
@@ -304,6 +309,8 @@ class FilesystemMultiEpisode(MultiEpisode):
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	__slots__ = ()
+
 	supported_patterns = (
 		# multiepisode 1 regex, 301-302
 		re.compile("(?P<start_season>\d{1,2})(?P<start_episode>\d{2})-(?P<end_season>\d{1,2})(?P<end_episode>\d{2})"),
@@ -15,6 +15,7 @@
 
 from mediarover.config import ConfigObj
 from mediarover.error import InvalidEpisodeString
+from mediarover.episode.parser import get_parser
 from mediarover.factory import EpisodeFactory
 from mediarover.filesystem.episode import FilesystemSingleEpisode
 from mediarover.filesystem.episode import FilesystemDailyEpisode
@@ -35,18 +36,17 @@ class FilesystemFactory(EpisodeFactory):
 	def create_episode(self, string, **kwargs):
 
 		# parse given string and extract episode attributes
-		if FilesystemMultiEpisode.handle(string):
-			params = FilesystemMultiEpisode.extract_from_string(string, **kwargs)
-		elif FilesystemDailyEpisode.handle(string):
-			params = FilesystemDailyEpisode.extract_from_string(string, **kwargs)
-		elif FilesystemSingleEpisode.handle(string):
-			params = FilesystemSingleEpisode.extract_from_string(string, **kwargs)
-		else:
+		parsed = get_parser((FilesystemMultiEpisode, FilesystemDailyEpisode, FilesystemSingleEpisode), self.config['tv']['episode_patterns']).parse(string)
+		if parsed is None:
 			raise InvalidEpisodeString("unable to identify episode type: %r" % string)
 
+		(episode_class, groups, sanitized_series) = parsed
+		params = episode_class.extract_from_groups(groups, **kwargs)
+
 		# locate series object.  If series is unknown, create new series
 		if type(params['series']) is not Series:
-			sanitized_series = Series.sanitize_series_name(name=params['series'])
+			if 'series' in kwargs:
+				sanitized_series = Series.sanitize_series_name(name=params['series'])
 			if sanitized_series in self.watched_series:
 				params['series'] = self.watched_series[sanitized_series]
 			else:
@@ -60,10 +60,5 @@ class FilesystemFactory(EpisodeFactory):
 			else:
 				params['quality'] = self.config['tv']['quality']['desired']
 
-		if 'start_episode' in params:
-			return FilesystemMultiEpisode(**params)
-		elif 'year' in params:
-			return FilesystemDailyEpisode(**params)
-		else:
-			return FilesystemSingleEpisode(**params)
+		return episode_class(**params)
 
@@ -0,0 +1,190 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import errno
+import logging
+import os
+import os.path
+import struct
+import sys
+
+try:
+	import ctypes
+	import ctypes.util
+except ImportError:
+	ctypes = None
+
+from mediarover.error import FilesystemError
+
+# inotify event masks (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+IN_CLOEXEC = 0x00080000
+IN_NONBLOCK = 0x00000800
+
+EVENT_HEADER = struct.Struct("iIII")
+
+class DirectoryWatcher(object):
+	"""
+		watches directory trees for files and directories being created, deleted, moved or written to.  Uses
+		inotify and is therefore only available on Linux
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def changes(self):
+		"""
+			return set of directories whose contents changed since the last call, None if events were lost and
+			the changes can't be determined
+		"""
+		logger = logging.getLogger("mediarover.filesystem.watcher")
+
+		# a new directory couldn't be watched, changes made to it can't be detected
+		if self.__incomplete:
+			return None
+
+		changed = set()
+		overflow = False
+		while True:
+			try:
+				data = os.read(self.__fd, 65536)
+			except OSError, e:
+				if e.errno == errno.EINTR:
+					continue
+				if e.errno == errno.EAGAIN:
+					break
+				raise
+
+			offset = 0
+			while offset < len(data):
+				(wd, mask, cookie, length) = EVENT_HEADER.unpack_from(data, offset)
+				offset += EVENT_HEADER.size
+				name = data[offset:offset + length].rstrip("\0")
+				offset += length
+
+				if mask & IN_Q_OVERFLOW:
+					overflow = True
+					continue
+
+				dirpath = self.__watches.get(wd)
+				if dirpath is None:
+					continue
+
+				if mask & IN_IGNORED:
+					del self.__watches[wd]
+					continue
+
+				changed.add(dirpath)
+
+				# watch new directories as well.  Entries may have been created in them before the
+				# watch was in place, so they are reported as changed too
+				if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+					try:
+						changed.update(self.__add_tree(os.path.join(dirpath, name)))
+					except FilesystemError, e:
+						logger.warning("%s, polling directories for changes instead", e)
+						self.__incomplete = True
+						return None
+
+		if overflow:
+			logger.warning("filesystem event queue overflowed, changes unknown")
+			return None
+
+		return changed
+
+	def close(self):
+		""" stop watching and release inotify instance """
+		if self.__fd is not None:
+			os.close(self.__fd)
+			self.__fd = None
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __add_tree(self, root):
+		""" watch given directory and all of its subdirectories.  Return list of directories now being watched """
+		added = []
+		pending = [root]
+		while len(pending):
+			dirpath = pending.pop()
+			wd = self.__libc.inotify_add_watch(self.__fd, dirpath, self.__mask)
+			if wd < 0:
+				error = ctypes.get_errno()
+
+				# directory was removed before it could be watched
+				if error in (errno.ENOENT, errno.ENOTDIR):
+					continue
+				raise FilesystemError("unable to watch directory %r: %s" % (dirpath, os.strerror(error)))
+
+			self.__watches[wd] = dirpath
+			added.append(dirpath)
+
+			try:
+				names = os.listdir(dirpath)
+			except OSError:
+				continue
+			for name in names:
+				path = os.path.join(dirpath, name)
+				if os.path.isdir(path) and not os.path.islink(path):
+					pending.append(path)
+
+		return added
+
+	def __init__(self, paths):
+		""" start watching given directory trees.  Raises FilesystemError if inotify isn't available """
+
+		if ctypes is None or not sys.platform.startswith("linux"):
+			raise FilesystemError("inotify not supported on this platform")
+
+		try:
+			self.__libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+			self.__libc.inotify_init1
+		except (OSError, AttributeError):
+			raise FilesystemError("inotify not supported by system C library")
+
+		self.__fd = self.__libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		if self.__fd < 0:
+			self.__fd = None
+			raise FilesystemError("unable to initialize inotify: %s" % os.strerror(ctypes.get_errno()))
+
+		self.__mask = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_CLOSE_WRITE | IN_ONLYDIR
+		self.__watches = {}
+		self.__incomplete = False
+		try:
+			for path in paths:
+				self.__add_tree(path)
+		except FilesystemError:
+			self.close()
+			raise
+
+def create_watcher(paths):
+	""" return DirectoryWatcher for given directory trees, None if inotify isn't available """
+	logger = logging.getLogger("mediarover.filesystem.watcher")
+
+	try:
+		watcher = DirectoryWatcher(paths)
+	except FilesystemError, e:
+		logger.info("%s, polling directories for changes instead", e)
+		return None
+
+	logger.debug("watching tv root directories for changes")
+	return watcher
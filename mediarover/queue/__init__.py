@@ -30,6 +30,21 @@ class Queue(object):
 		""" add given item object to queue """
 		raise NotImplementedError
 
+	def add_all_to_queue(self, items):
+		""" 
+			add given list of item objects to queue.  Return list of (item, error) tuples in the same order 
+			as the given items, where error is None if the item was successfully queued
+		"""
+		report = []
+		for item in items:
+			try:
+				self.add_to_queue(item)
+			except (IOError, QueueInsertionError), e:
+				report.append((item, e))
+			else:
+				report.append((item, None))
+		return report
+
 	def remove_from_queue(self, job):
 		""" remove given job from queue """
 		raise NotImplementedError
@@ -46,6 +61,14 @@ class Queue(object):
 		""" check if given item has already been processed by queue """
 		raise NotImplementedError
 
+	def prefetch(self):
+		""" begin retrieving queue in the background.  Queues that don't support it retrieve it on demand """
+		pass
+
+	def refresh(self):
+		""" discard any queue data retrieved so far, it will be retrieved again when next needed """
+		pass
+
 	# property methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def _root_prop(self, url = None):
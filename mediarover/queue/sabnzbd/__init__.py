@@ -15,17 +15,32 @@
 
 import logging
 import os
+import random
 import re
+import sys
 import time
 import urllib
 import xml.dom.minidom
+from bisect import bisect_left
+from xml.parsers.expat import ExpatError
+
+try:
+	import json
+except ImportError:
+	try:
+		import simplejson as json
+	except ImportError:
+		json = None
 
 from mediarover.config import ConfigObj
 from mediarover.ds.metadata import Metadata
 from mediarover.error import *
 from mediarover.queue import Queue
 from mediarover.queue.sabnzbd.job import SabnzbdJob
+from mediarover.series import Series
+from mediarover.source.fetch import open_url
 from mediarover.utils.injection import Dependency, is_instance_of
+from mediarover.utils.pool import BackgroundCall, run_concurrently
 
 class SabnzbdQueue(Queue):
 	""" Sabnzbd queue class """
@@ -34,83 +49,91 @@ class SabnzbdQueue(Queue):
 	meta_ds = Dependency("metadata_data_store", is_instance_of(Metadata))
 	config = Dependency("config", is_instance_of(ConfigObj))
 
+	# polling schedule used while SABnzbd fetches newly scheduled nzbs: initial delay, 
+	# maximum delay and total wait (in seconds)
+	fetch_delay = 0.5
+	fetch_max_delay = 8
+	fetch_wait = 60
+
+	fetch_regex = re.compile("fetch")
+
+	# maximum number of concurrent add requests and their timeout (in seconds)
+	submit_threads = 4
+	submit_timeout = 60
+
 	# overriden methods  - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def jobs(self):
 		""" return list of Job items """
-		logger = logging.getLogger("mediarover.queue.sabnzbd")
 
-		# if jobs list hasn't been constructed yet, parse document tree
+		# if jobs list hasn't been constructed yet, retrieve queue slots
 		# and build list of current jobs
 		try:
 			self.__jobs
 		except AttributeError:
-			try:
-				self.__document
-			except AttributeError:
-				self.__get_document()
+			# wait for any retrieval started by prefetch() to finish
+			if self.__retrieval is not None:
+				(retrieval, self.__retrieval) = (self.__retrieval, None)
+				slots = retrieval.result()
+			else:
+				slots = self.__get_slots()
+
+			# jobs retrieved previously don't need to be parsed again
+			parsed = self.__parsed
+			self.__parsed = {}
 
 			self.__jobs = []
-			for rawJob in self.__document.getElementsByTagName("slot"):
-				cat = rawJob.getElementsByTagName("cat")[0].childNodes[0].data.lower()
-				if cat in self._supported_categories:
-					self.__jobs.append(SabnzbdJob(rawJob))
+			self.__job_index = {}
+			for slot in slots:
+				if slot['cat'] and slot['cat'].lower() in self._supported_categories:
+					job = parsed.get(slot['nzo_id'])
+					if job is None or job.title() != slot['filename']:
+						job = SabnzbdJob(slot)
+					self.__parsed[job.id()] = job
+					self.__jobs.append(job)
+					for key in self.__download_keys(job.download()):
+						self.__job_index.setdefault(key, []).append(job)
 
 		# return job list to caller
 		return self.__jobs
 	
-	def add_to_queue(self, item):
-		"""
-			add given item object to queue
+	def prefetch(self):
+		""" begin retrieving queue in the background.  jobs() blocks until retrieval has finished """
+		try:
+			self.__jobs
+		except AttributeError:
+			if self.__retrieval is None:
+				self.__retrieval = BackgroundCall(self.__get_slots)
 
-			two possible ways to get nzb:
-			  a) if newzbin item, grab report ID and pass to SABnzbd
-			  b) otherwise, grab url where nzb can be found and pass to SABnzbd
-		"""
-		logger = logging.getLogger("mediarover.queue.sabnzbd")
+	def refresh(self):
+		""" discard current queue contents, they will be retrieved again when next needed """
+		self.__clear()
 
-		priority = {
-			'low': -1,
-			'normal': 0,
-			'high': 1,
-			'force': 2,
-		}
+	def add_to_queue(self, item):
+		""" add given item object to queue """
+		(item, error) = self.add_all_to_queue([item])[0]
+		if error is not None:
+			raise error
 
-		args = {
-			'cat': self.config[item.type()]['category'],
-			'priority': priority[item.priority().lower()],
-		}
+	def add_all_to_queue(self, items):
+		"""
+			add given list of item objects to queue.  Requests are sent over pooled keep-alive connections, 
+			at most submit_threads at a time.  Return list of (item, error) tuples in the same order as the
+			given items, where error is None if the item was successfully queued
+		"""
+		report = run_concurrently(self.__submit, [(item,) for item in items], self.submit_threads)
 
-		if hasattr(item, "id"):
-			args['mode'] = 'addid'
-			args['name'] = item.id
-		else:
-			args['mode'] = 'addurl'
-			args['name'] = item.url()
-			
-		if 'username' and 'password' in self._params:
-			if self._params['username'] is not None and self._params['password'] is not None:
-				args['ma_username'] = self._params['username']
-				args['ma_password'] = self._params['password']
+		queued = [item for (item, error) in report if error is None]
+		if len(queued):
 
-		if 'api_key' in self._params:
-			args['apikey'] = self._params['api_key']
+			# record all queued items in a single transaction
+			if self.config['tv']['quality']['managed']:
+				self.meta_ds.add_in_progress_items(*[(item.title(), item.type(), item.quality()) for item in queued])
 
-		# generate web service url and make call
-		url = "%s/api?%s" % (self.root, urllib.urlencode(args))
-		logger.debug("add to queue request: %s", url)
-		handle = urllib.urlopen(url)
+			# SABnzbd doesn't identify the new jobs, retrieve the queue again when next needed
+			self.__clear()
 
-		# check response for status of request
-		response = handle.readline()
-		if response == "ok\n":
-			if self.config['tv']['quality']['managed']:
-				self.meta_ds.add_in_progress(item.title(), item.type(), item.quality())
-			logger.info("item '%s' successfully queued for download", item.title())
-		elif response.startswith("error"):
-			raise QueueInsertionError("unable to queue item '%s' for download: %s", args=(item.title(), response))
-		else:
-			raise QueueInsertionError("unexpected response received from queue while attempting to schedule item '%s' for download: %s", args=(item.title(), response))
+		return report
 
 	def remove_from_queue(self, job):
 		""" remove item representing given download from queue """
@@ -141,6 +164,15 @@ class SabnzbdQueue(Queue):
 			if self.config['tv']['quality']['managed']:
 				self.meta_ds.delete_in_progress(job.title())
 			logger.info("job '%s' successfully removed from queue", job.title())
+
+			# drop job from the cached job list and index
+			try:
+				self.__jobs.remove(job)
+			except (AttributeError, ValueError):
+				pass
+			else:
+				for key in self.__download_keys(job.download()):
+					self.__job_index[key].remove(job)
 		elif response.startswith("error"):
 			raise QueueDeletionError("unable to remove job %r from queue: %s", args=(job.title(), response))
 		else:
@@ -157,13 +189,14 @@ class SabnzbdQueue(Queue):
 	def get_job_by_download(self, download):
 		""" return job for given download if found in queue.  Return None if not found """
 
-		job = None
-		for j in self.jobs():
-			if j.download() == download:
-				job = j
-				break
+		# make sure the job index has been built
+		self.jobs()
 
-		return job
+		for job in self.__job_index.get(self.__download_keys(download)[0], []):
+			if job.download() == download:
+				return job
+
+		return None
 
 	def processed(self, item):
 		""" return boolean indicating whether or not the given source item has already been processed by queue """
@@ -174,22 +207,118 @@ class SabnzbdQueue(Queue):
 
 			# build name of nzb as it would appear on disk
 			file = item.title()
+			if isinstance(file, unicode):
+				file = file.encode(sys.getfilesystemencoding() or "utf-8", "replace")
 			logger.debug("looking for '%s' in SABnzbd backup directory...", file)
 
-			for nzb in os.listdir(backup_dir):
-				if nzb.startswith(file):
-					return True
+			# all nzbs starting with the item title are grouped together in the sorted 
+			# listing, beginning at the insertion point of the title
+			nzbs = self.__backup_index(backup_dir)
+			i = bisect_left(nzbs, file)
+			if i < len(nzbs) and nzbs[i].startswith(file):
+				return True
 
 		return False
 
 	# private methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def __get_document(self):
+	def __backup_index(self, backup_dir):
+		""" return sorted listing of given backup directory.  The listing is only rebuilt when the directory changes """
+		mtime = os.stat(backup_dir).st_mtime
+		if self.__backup is None or self.__backup[0] != mtime:
+			logger = logging.getLogger("mediarover.queue.sabnzbd")
+			logger.debug("indexing SABnzbd backup directory '%s'", backup_dir)
+
+			nzbs = os.listdir(backup_dir)
+			nzbs.sort()
+			self.__backup = (mtime, nzbs)
+
+		return self.__backup[1]
+
+	def __submit(self, item):
+		"""
+			send request to add given item to queue.  Return tuple containing item and the error encountered
+			(None if successful)
+
+			two possible ways to get nzb:
+			  a) if newzbin item, grab report ID and pass to SABnzbd
+			  b) otherwise, grab url where nzb can be found and pass to SABnzbd
+		"""
+		logger = logging.getLogger("mediarover.queue.sabnzbd")
+
+		priority = {
+			'low': -1,
+			'normal': 0,
+			'high': 1,
+			'force': 2,
+		}
+
+		args = {
+			'cat': self.config[item.type()]['category'],
+			'priority': priority[item.priority().lower()],
+		}
+
+		if hasattr(item, "id"):
+			args['mode'] = 'addid'
+			args['name'] = item.id
+		else:
+			args['mode'] = 'addurl'
+			args['name'] = item.url()
+			
+		if 'username' and 'password' in self._params:
+			if self._params['username'] is not None and self._params['password'] is not None:
+				args['ma_username'] = self._params['username']
+				args['ma_password'] = self._params['password']
+
+		if 'api_key' in self._params:
+			args['apikey'] = self._params['api_key']
+
+		# generate web service url and make call
+		url = "%s/api?%s" % (self.root, urllib.urlencode(args))
+		logger.debug("add to queue request: %s", url)
+		try:
+			handle = open_url(url, self.submit_timeout)
+			try:
+				response = handle.read().split("\n", 1)[0]
+			finally:
+				handle.close()
+		except IOError, e:
+			return (item, e)
+
+		# check response for status of request
+		if response == "ok":
+			logger.info("item '%s' successfully queued for download", item.title())
+			return (item, None)
+		elif response.startswith("error"):
+			error = QueueInsertionError("unable to queue item '%s' for download: %s" % (item.title(), response))
+		else:
+			error = QueueInsertionError("unexpected response received from queue while attempting to schedule item '%s' for download: %s" % (item.title(), response))
+
+		return (item, error)
+
+	def __download_keys(self, download):
+		""" 
+			return list of keys identifying given download in the job index, ie. sanitized series name followed
+			by the episode key.  Multipart downloads are identified by the key of each of their parts
+		"""
+		series = Series.sanitize_series_name(series=download.series)
+		if hasattr(download, "episodes"):
+			return [(series,) + Series.episode_key(episode) for episode in download.episodes]
+		else:
+			return [(series,) + Series.episode_key(download)]
+
+	def __get_slots(self):
+		""" retrieve queue and return list of slot records, ie. dicts containing cat, nzo_id, filename, msgid and status values """
 		logger = logging.getLogger('mediarover.queue.sabnzbd')
 
+		format = self._params.get('format', 'json')
+		if format == 'json' and json is None:
+			logger.warning("json module not available, retrieving queue as xml")
+			format = 'xml'
+
 		args = {
 			'mode': 'queue',
-			'output': 'xml',
+			'output': format,
 		}
 
 		if 'username' and 'password' in self._params:
@@ -208,31 +337,129 @@ class SabnzbdQueue(Queue):
 		url = "%s/api?%s" % (self.root, urllib.urlencode(args))
 		logger.debug("retrieving queue from '%s'", url)
 
-		regex = re.compile("fetch")
-		data = None
-
 		# ATTENTION: it usually takes a few seconds for SABnzbd to download an nzb
 		# when queued for download.  However, the nzb shows up immediately in 
 		# the downloaded queue.  This screws up all queue related checks because the 
-		# nzb name isn't yet known (by SABnzbd).  Therefore we loop and give SABnzb 
-		# time to download the nzb and fully populate the queue.
-		for i in range(12):
+		# nzb name isn't yet known (by SABnzbd).  Therefore we poll the queue (with an
+		# exponentially increasing, jittered delay) until the slots that were fetching 
+		# when first retrieved have been fully populated
+		waiting = None
+		delay = self.fetch_delay
+		waited = 0
+		while True:
 			response = urllib.urlopen(url)
-			data = response.read()
-			if regex.search(data):
-				logger.debug("queue still processing new scheduled downloads, waiting...")
-				time.sleep(5)
+			slots = self.__decode(format, response.read())
+
+			fetching = set([slot['nzo_id'] for slot in slots if self.__is_fetching(slot)])
+			if waiting is None:
+				waiting = fetching
 			else:
+				waiting = waiting.intersection(fetching)
+
+			if len(waiting) == 0:
+				break
+			elif waited >= self.fetch_wait:
+				logger.warning("giving up waiting for queue to finish processing newly scheduled downloads - duplicate downloads possible!")
 				break
+
+			logger.debug("queue still processing %d new scheduled download(s), waiting...", len(waiting))
+			pause = min(delay * random.uniform(0.75, 1.25), self.fetch_wait - waited)
+			time.sleep(pause)
+			waited += pause
+			delay = min(delay * 2, self.fetch_max_delay)
+
+		return slots
+
+	def __decode(self, format, data):
+		""" decode queue data of given format and return list of slot records """
+		if format == 'json':
+			return self.__decode_json(data)
 		else:
-			logger.warning("giving up waiting for queue to finish processing newly scheduled downloads - duplicate downloads possible!")
+			return self.__decode_xml(data)
+
+	def __is_fetching(self, slot):
+		""" return boolean indicating whether or not SABnzbd is still fetching the nzb of given slot """
+		if slot['filename'] and self.fetch_regex.search(slot['filename']):
+			return True
+		if slot['status'] and slot['status'].lower().startswith("fetch"):
+			return True
+		return False
+
+	def __decode_json(self, data):
+		""" decode json queue data and return list of slot records """
+		try:
+			document = json.loads(data)
+		except ValueError, e:
+			raise InvalidRemoteData("unable to parse queue: %s" % e)
 
-		self.__document = xml.dom.minidom.parseString(data)
+		if not isinstance(document, dict):
+			raise InvalidRemoteData("unexpected queue data: %r" % data[:100])
 
 		# make sure we didn't get any errors back instead of the queue data
-		errors = self.__document.getElementsByTagName('error')
-		if errors:
-			raise QueueRetrievalError("unable to retrieve queue: %s" % errors[0].childNodes[0].nodeValue)
+		if 'error' in document:
+			raise QueueRetrievalError("unable to retrieve queue: %s" % document['error'])
+
+		queue = document.get('queue')
+		if not isinstance(queue, dict) or not isinstance(queue.get('slots'), list):
+			raise InvalidRemoteData("queue data is missing the list of slots")
+
+		slots = []
+		for slot in queue['slots']:
+			if not isinstance(slot, dict):
+				raise InvalidRemoteData("unexpected queue slot: %r" % (slot,))
+			for name in ('cat', 'nzo_id', 'filename'):
+				if name not in slot:
+					raise InvalidRemoteData("queue slot is missing a %s value" % name)
+
+			slots.append({
+				'cat': slot['cat'],
+				'nzo_id': slot['nzo_id'],
+				'filename': slot['filename'],
+				'msgid': slot.get('msgid') or None,
+				'status': slot.get('status'),
+			})
+
+		return slots
+
+	def __decode_xml(self, data):
+		""" decode xml queue data and return list of slot records """
+		try:
+			document = xml.dom.minidom.parseString(data)
+		except ExpatError, e:
+			raise InvalidRemoteData("unable to parse queue: %s" % e)
+
+		try:
+			# make sure we didn't get any errors back instead of the queue data
+			errors = document.getElementsByTagName('error')
+			if errors:
+				raise QueueRetrievalError("unable to retrieve queue: %s" % errors[0].childNodes[0].nodeValue)
+
+			def text(node, name, required=True):
+				""" return text of given child element, None if it is empty or optional and missing """
+				elements = node.getElementsByTagName(name)
+				if not elements:
+					if required:
+						raise InvalidRemoteData("queue slot is missing a %s element" % name)
+					return None
+
+				children = elements[0].childNodes
+				if children:
+					return children[0].data
+				return None
+
+			slots = []
+			for node in document.getElementsByTagName("slot"):
+				slots.append({
+					'cat': text(node, "cat"),
+					'nzo_id': text(node, "nzo_id"),
+					'filename': text(node, "filename"),
+					'msgid': text(node, "msgid", False),
+					'status': text(node, "status", False),
+				})
+		finally:
+			document.unlink()
+
+		return slots
 
 	def __clear(self):
 
@@ -241,11 +468,11 @@ class SabnzbdQueue(Queue):
 		try: del self.__jobs
 		except AttributeError: pass
 
-		try:
-			self.__document.unlink()
-			del self.__document
-		except AttributeError:
-			pass
+		try: del self.__job_index
+		except AttributeError: pass
+
+		# ignore any retrieval that is still in progress
+		self.__retrieval = None
 
 	def __version_check(self):
 		""" verify that the running version of SABnzbd is at least 0.5.0 """
@@ -264,6 +491,10 @@ class SabnzbdQueue(Queue):
 		
 		super(SabnzbdQueue, self).__init__(root, supported_categories, params)
 
+		self.__backup = None
+		self.__retrieval = None
+		self.__parsed = {}
+
 		# try to determine sabnzbd version
 		if self._params['__check_version__']:
 			self.__version_check()
@@ -52,7 +52,7 @@ class SabnzbdJob(Job):
 	def __parseJob(self):
 		""" parse job data and build appropriate download object """
 
-		if self.__job.getElementsByTagName("msgid")[0].hasChildNodes():
+		if self.__job['msgid']:
 			factory = self.newzbin_factory
 		else:
 			factory = self.episode_factory
@@ -60,7 +60,7 @@ class SabnzbdJob(Job):
 		try:
 			download = factory.create_episode(self.title())
 		except (InvalidMultiEpisodeData, MissingParameterError):
-			raise InvalidItemTitle("unable to parse job title and create Episode object: %s" % title)
+			raise InvalidItemTitle("unable to parse job title and create Episode object: %s" % self.title())
 		except InvalidEpisodeString:
 			raise InvalidItemTitle("unsupported job title format: %r" % self.title())
 
@@ -72,14 +72,14 @@ class SabnzbdJob(Job):
 		return download
 
 	def __init__(self, job):
+		""" init method expects a queue slot record (dict containing cat, nzo_id, filename and msgid values) """
 
 		self.__job = job
 
-		self.__category = self.__job.getElementsByTagName("cat")[0].childNodes[0].data
+		self.__category = self.__job['cat']
 		if self.__category == 'None':
 			self.__category = None
 
-		self.__id = self.__job.getElementsByTagName("nzo_id")[0].childNodes[0].data
-		self.__title = self.__job.getElementsByTagName("filename")[0].childNodes[0].data
+		self.__id = self.__job['nzo_id']
+		self.__title = self.__job['filename']
 		self.__download = self.__parseJob()
-
@@ -13,19 +13,36 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+from __future__ import with_statement
+
 import logging
 import os
 import os.path
 import re
+import time
+from stat import S_ISDIR, S_ISLNK
+
+try:
+	from hashlib import md5
+except ImportError:
+	from md5 import new as md5
 
 from mediarover.config import ConfigObj
 from mediarover.ds.metadata import Metadata
 from mediarover.error import FilesystemError, InvalidData, InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError, TooManyParametersError
 from mediarover.factory import EpisodeFactory
-from mediarover.filesystem.episode import FilesystemEpisode
+from mediarover.filesystem.episode import FilesystemEpisode, FilesystemSingleEpisode, FilesystemDailyEpisode, FilesystemMultiEpisode
 from mediarover.utils.injection import is_instance_of, Dependency
 from mediarover.utils.quality import guess_quality_level, LOW, MEDIUM, HIGH
 
+# changes made to a directory within the same mtime tick as it was read for the filesystem index go 
+# unnoticed.  Timestamps can be as coarse as 2 seconds, the index of a directory modified less than 
+# this many seconds before it was read isn't trusted
+RACY_INTERVAL = 2
+
+# files smaller than this (in bytes) may still be growing and aren't treated as episodes
+MINIMUM_FILE_SIZE = 52428800
+
 class Series(object):
 	""" represents a tv series """
 
@@ -46,27 +63,21 @@ class Series(object):
 
 		self.__check_episode_lists()
 
-		# episode is daily
-		if hasattr(episode, "year"):
-			for i in range(len(self.__daily_files)):
-				file = self.__daily_files[i]
-				if episode == file.episode:
-					list.append(file)
-
-		else:
-			if not hasattr(episode, "episodes"):
-				for i in range(len(self.__single_files)):
-					file = self.__single_files[i]
-					if episode == file.episode:
-						list.append(file)
-
+		# multipart files are indexed under each of their parts.  Look up the files 
+		# containing the first part and check for an exact match
+		if hasattr(episode, "episodes"):
 			if include_multipart:
-				for i in range(len(self.__multipart_files)):
-					file = self.__multipart_files[i]
-					if episode == file.episode:
+				for file in self.__file_index.get(self.episode_key(episode.episodes[0]), []):
+					if hasattr(file.episode, "episodes") and episode == file.episode:
 						list.append(file)
-					elif episode in file.episode.episodes:
+
+		else:
+			for file in self.__file_index.get(self.episode_key(episode), []):
+				if hasattr(file.episode, "episodes"):
+					if include_multipart and episode in file.episode.episodes:
 						list.append(file)
+				elif episode == file.episode:
+					list.append(file)
 
 		return list
 
@@ -89,11 +100,17 @@ class Series(object):
 		logger = logging.getLogger("mediarover.series")
 
 		# get list of episodes that will serve as the test sample.  If a sample
-		# wasn't provided, grab the series episode list
+		# wasn't provided, use the series episode index
 		if len(args) > 0:
-			sample = list(args)
+			sample = {}
+			for ep in args:
+				# NOTE: a multipart episode never equals one of the individual
+				# parts being compared, so it has no place in the sample
+				if not hasattr(ep, "episodes"):
+					sample.setdefault(self.episode_key(ep), ep)
 		else:
-			sample = self.episodes
+			self.__check_episode_lists()
+			sample = self.__episode_index
 
 		# prepare a list of episodes for comparison
 		try:
@@ -109,8 +126,9 @@ class Series(object):
 		for ep in parts:
 			
 			# found, must compare quality before we can determine desirability
-			if ep in sample:
-				found.append((ep, sample[sample.index(ep)]))
+			current = sample.get(self.episode_key(ep))
+			if current is not None and ep == current:
+				found.append((ep, current))
 
 			# not found == desirable
 			else:
@@ -168,26 +186,11 @@ class Series(object):
 		return desirable
 
 	def locate_season_folder(self, season):
-		path = None
-
-		metadata_regex = re.compile("\(.+?\)$")
-		number_regex = re.compile("[^\d]")
-		for root in self.path:
-			for dir in os.listdir(root):
-				if os.path.isdir(os.path.join(root, dir)):
-
-					# strip any metadata that may be appended to the end of 
-					# the season folder as it can interfer with season identification
-					clean_dir = metadata_regex.sub("", dir)
-
-					number = number_regex.sub("", clean_dir)
-					if len(number) and int(season) == int(number):
-						path = os.path.join(root, dir)
-						break
-			if path is not None:
-				break
+		folders = self.__season_folders(season)
+		if len(folders) > 0:
+			return folders[0]
 		
-		return path
+		return None
 
 	def ignore(self, season):
 		""" return boolean indicating whether or not the given season number should be ignored """
@@ -216,6 +219,89 @@ class Series(object):
 
 		return params
 
+	def scan(self, listings = None):
+		""" 
+			scan series directories and build episode lists.  listings optionally maps directory paths to 
+			(mtime, entries) tuples read ahead of time, see scan_series()
+		"""
+		self.__listings = listings
+		try:
+			self.__find_series_episodes()
+		finally:
+			self.__listings = None
+
+	def scan_season(self, season):
+		""" 
+			scan only the folders of given season and build episode lists.  Until marked stale, the episode lists 
+			won't contain episodes from other seasons.  If the series doesn't use season folders, a full scan 
+			is done instead
+		"""
+		folders = self.__season_folders(season)
+		if len(folders) > 0:
+			self.__find_series_episodes(folders)
+		else:
+			self.scan()
+
+	def disk_version(self):
+		""" 
+			return string identifying the current on disk state of series.  It is derived from the modification 
+			times of the series directories (and their indexed subdirectories) so that no directory listing or 
+			episode parsing is required
+		"""
+		if self.__disk_version is None:
+			state = []
+			pending = self.path[::-1]
+			while pending:
+				dirpath = pending.pop()
+				try:
+					mtime = os.stat(dirpath).st_mtime
+				except OSError:
+					mtime = None
+				state.append((dirpath, mtime))
+				pending.extend(self.meta_ds.list_indexed_subdirectories(dirpath)[::-1])
+
+			self.__disk_version = md5(repr(state)).hexdigest()
+			if self.__disk_state is None:
+				self.__disk_state = state
+
+		return self.__disk_version
+
+	def scanned(self):
+		""" return boolean indicating whether or not the series episode lists have been built """
+		return self.__episodes is not None
+
+	def modified(self):
+		""" 
+			return list of series directories that have been modified (or removed) since the episode lists (or 
+			disk version) were last built
+		"""
+		modified = []
+		if self.__disk_state is not None:
+			for (dirpath, mtime) in self.__disk_state:
+				try:
+					if os.stat(dirpath).st_mtime != mtime:
+						modified.append(dirpath)
+						continue
+				except OSError:
+					modified.append(dirpath)
+					continue
+
+				# small files growing past the minimum size don't modify their directory
+				if dirpath in self.__directories and _partial_files_changed(self.__directories[dirpath][2]):
+					modified.append(dirpath)
+
+		return modified
+
+	def update(self, dirpaths):
+		""" 
+			bring episode lists up to date after the given directories were modified.  Only those directories 
+			are read again, records of all other directories are reused
+		"""
+		if self.__episodes is None:
+			self.mark_episode_list_stale()
+		else:
+			self.__find_series_episodes(changed=set(dirpaths))
+
 	def mark_episode_list_stale(self):
 		logger = logging.getLogger("mediarover.series")
 		logger.debug("clearing series file lists!")
@@ -223,22 +309,30 @@ class Series(object):
 		self.__single_files = None
 		self.__daily_files = None
 		self.__multipart_files = None
+		self.__episode_index = None
+		self.__file_index = None
+		self.__disk_version = None
+		self.__disk_state = None
+		self.__directories = {}
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def __find_series_episodes(self):
-		""" return list of episode objects for current series """
+	def __find_series_episodes(self, paths = None, changed = None):
+		""" 
+			build episode lists using files found in given directories (default: series path).  If changed is 
+			given, only those directories are indexed again and the records of all others are reused
+		"""
 		logger = logging.getLogger("mediarover.series")
 		logger.info("scanning filesystem for episodes belonging to '%s'..." % self)
 
-		# duplicate episodes are appended with the date and time that 
-		# they were detected.
-		dup_regex = re.compile("\.\d{12}$")
+		if paths is None:
+			paths = self.path
 
 		compiled = []
 		daily = []
 		single = []
 		multipart = []
+		episode_index = {}
 
 		sanitized_name = self.sanitize_series_name(series=self)
 		if sanitized_name in self.config['tv']['filter']:
@@ -246,85 +340,239 @@ class Series(object):
 		else:
 			desired = self.config['tv']['quality']['desired']
 
-		for root in self.path:
-			for dirpath, dirnames, filenames in os.walk(root):
-				# skip any directory that start with a '.'
-				if os.path.basename(dirpath).startswith('.'):
-					continue
+		# quality levels recorded in the metadata store, loaded once the first
+		# episode is found
+		qualities = None
+
+		# walk series directories and consult the filesystem index for any
+		# directories that haven't changed since the last scan.  Remember the
+		# state of each directory so that later modifications can be detected
+		state = []
+		directories = {}
+		pending = paths[::-1]
+		while len(pending):
+			dirpath = pending.pop()
+			if changed is not None and dirpath not in changed and dirpath in self.__directories:
+				directories[dirpath] = self.__directories[dirpath]
+			else:
+				directories[dirpath] = self.__index_directory(dirpath, changed is not None)
+			(mtime, subdirectories, records) = directories[dirpath]
+			state.append((dirpath, mtime))
+			pending.extend(subdirectories[::-1])
 
-				# process files and identify episodes
-				for filename in filenames:
-					# skip any files that start with a '.'
-					if filename.startswith('.'):
-						continue
+			for entry in records:
 
-					(name, ext) = os.path.splitext(filename)
+				# filename couldn't be parsed when the file was indexed, or the
+				# file is too small to be considered
+				if entry['type'] is None or entry['type'] == 'partial':
+					continue
 
-					# skip duplicates when building list of episodes
-					if dup_regex.search(name):
-						continue
+				file = FilesystemEpisode(entry['path'], self.__create_episode(entry, desired), entry['size'])
+				episode = file.episode
+				list = []
 
-					ext = ext.lstrip(".")
-					if ext not in self.config['tv']['ignored_extensions']:
+				# multipart
+				if hasattr(episode, "episodes"):
+					multipart.append(file)
 
-						path = os.path.join(dirpath, filename)
-						size = os.path.getsize(path)
+					# now look at individual parts and determine
+					# if they should be added to compiled episode list
+					list = []
+					for ep in episode.episodes:
+						if self.episode_key(ep) not in episode_index:
+							list.append(ep)
+				else:
+					list.append(episode)
+					if hasattr(episode, "year"):
+						daily.append(file)
+					else:
+						single.append(file)
+			
+				# add to compiled list and episode index
+				compiled.extend(list)
+				for ep in list:
+					episode_index.setdefault(self.episode_key(ep), ep)
+
+				# see if we can come up with a more accurate quality level 
+				# for current file
+				if len(list) > 0 and self.config['tv']['quality']['managed']:
+					if qualities is None:
+						qualities = self.meta_ds.get_episode_qualities(self)
+
+					quality = qualities.get(self.episode_key(list[0]))
+					if quality is None:
+						if self.config['tv']['quality']['guess']:
+							episode.quality = guess_quality_level(self.config, file.extension, episode.quality)
+						else:
+							logger.warning("quality level of '%s' unknown, defaulting to desired level of '%s'" % (episode, desired))
+					else:
+						episode.quality = quality
 
-						# skip this file if it is less than 50 MB
-						if size < 52428800:
-							continue
+				logger.debug("created %r" % file)
 
-						try:
-							file = FilesystemEpisode(
-								path,
-								self.factory.create_episode(name, series=self), 
-								size
-							)
-						except (InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError), e:
-							logger.warning("skipping file, encountered error while parsing filename: %s (%s)" % (e, path))
-							pass
-						else:
-							episode = file.episode
-							list = []
-
-							# multipart
-							if hasattr(episode, "episodes"):
-								multipart.append(file)
-
-								# now look at individual parts and determine
-								# if they should be added to compiled episode list
-								list = []
-								for ep in episode.episodes:
-									if ep not in compiled:
-										list.append(ep)
-							else:
-								list.append(episode)
-								if hasattr(episode, "year"):
-									daily.append(file)
-								else:
-									single.append(file)
-						
-							# add to compiled list
-							compiled.extend(list)
-
-							# see if we can come up with a more accurate quality level 
-							# for current file
-							if len(list) > 0 and self.config['tv']['quality']['managed']:
-								record = self.meta_ds.get_episode(list[0])
-								if record is None:
-									if self.config['tv']['quality']['guess']:
-										episode.quality = guess_quality_level(self.config, file.extension, episode.quality)
-									else:
-										logger.warning("quality level of '%s' unknown, defaulting to desired level of '%s'" % (episode, desired))
-								else:
-									episode.quality = record['quality']
-
-							logger.debug("created %r" % file)
+		# index files by the key of every episode they contain. Multipart
+		# files are registered under each of their parts
+		file_index = {}
+		for file in single + daily:
+			file_index.setdefault(self.episode_key(file.episode), []).append(file)
+		for file in multipart:
+			for ep in file.episode.episodes:
+				file_index.setdefault(self.episode_key(ep), []).append(file)
 
 		self.__episodes = compiled
 		self.__daily_files = daily
 		self.__single_files = single
 		self.__multipart_files = multipart
+		self.__episode_index = episode_index
+		self.__file_index = file_index
+
+		# the scan may have indexed directories not previously accounted for
+		self.__disk_version = None
+		self.__disk_state = state
+		self.__directories = directories
+
+	def __index_directory(self, dirpath, force = False):
+		""" 
+			return tuple containing directory mtime, list of subdirectories and list of episode file records found in given directory.  
+			If the directory hasn't been modified since it was last indexed (and force is False), the records are read 
+			from the metadata data store and only files too small to be considered (see MINIMUM_FILE_SIZE) are checked
+			for growth.  The mtime is None if the directory may have changed without its mtime being updated
+		"""
+		logger = logging.getLogger("mediarover.series")
+
+		# duplicate episodes are appended with the date and time that 
+		# they were detected.
+		dup_regex = re.compile("\.\d{12}$")
+
+		# use directory listing read ahead of time by scan_series (if available)
+		listing = None
+		if self.__listings is not None:
+			listing = self.__listings.pop(dirpath, None)
+
+		# directories that can't be read (ie. missing permissions or removed since they were 
+		# found) are treated as empty, without being indexed
+		try:
+			if listing is None:
+				mtime = os.stat(dirpath).st_mtime
+				entries = None
+			else:
+				(mtime, listed, entries) = listing
+
+			# the index is only reused if files were filtered using the current settings
+			filter = _index_filter(self.config)
+			indexed = self.meta_ds.get_indexed_directory(dirpath)
+			if indexed is not None and indexed['filter'] == filter and _index_current(mtime, indexed['mtime'], indexed['indexed']) and not force:
+				records = self.meta_ds.list_indexed_files(dirpath)
+				if not _partial_files_changed(records):
+					return (mtime, self.meta_ds.list_indexed_subdirectories(dirpath), records)
+
+			# note the time before reading the directory, changes made from then on 
+			# may not update its mtime
+			if entries is None:
+				listed = time.time()
+				mtime = os.stat(dirpath).st_mtime
+				entries = _read_directory(dirpath, False)
+		except OSError, e:
+			logger.warning("unable to read directory '%s', skipping: %s", dirpath, e)
+			return (None, [], [])
+
+		logger.debug("indexing directory '%s'", dirpath)
+
+		# build dict of previously indexed files so that unchanged 
+		# files don't need to be parsed again
+		previous = {}
+		if indexed is not None:
+			for record in self.meta_ds.list_indexed_files(dirpath):
+				previous[record['path']] = record
+
+		subdirectories = []
+		records = []
+		for (filename, path, stat) in entries:
+			if S_ISDIR(stat.st_mode):
+				subdirectories.append(path)
+				continue
+
+			(name, ext) = os.path.splitext(filename)
+
+			# skip duplicates when building list of episodes
+			if dup_regex.search(name):
+				continue
+
+			ext = ext.lstrip(".")
+			if ext in self.config['tv']['ignored_extensions']:
+				continue
+
+			# skip this file if it is less than 50 MB.  It may still be growing, record it so
+			# that it can be checked for growth without reading the directory again
+			if stat.st_size < MINIMUM_FILE_SIZE:
+				records.append(_file_record(path, stat, 'partial'))
+				continue
+
+			old = previous.get(path)
+			if old is not None and old['type'] != 'partial' and old['mtime'] == stat.st_mtime and old['size'] == stat.st_size and old['inode'] == stat.st_ino:
+				records.append(old)
+				continue
+
+			record = _file_record(path, stat)
+			try:
+				episode = self.factory.create_episode(name, series=self)
+			except (InvalidEpisodeString, InvalidMultiEpisodeData, MissingParameterError), e:
+				logger.warning("skipping file, encountered error while parsing filename: %s (%s)" % (e, path))
+			else:
+				if hasattr(episode, "episodes"):
+					record['type'] = 'multi'
+					record['season'] = episode.season
+					record['episode'] = episode.episodes[0].episode
+					record['end_episode'] = episode.episodes[-1].episode
+				elif hasattr(episode, "year"):
+					record['type'] = 'daily'
+					record['year'] = episode.year
+					record['month'] = episode.month
+					record['day'] = episode.day
+				else:
+					record['type'] = 'single'
+					record['season'] = episode.season
+					record['episode'] = episode.episode
+
+			records.append(record)
+
+		self.meta_ds.index_directory(dirpath, mtime, listed, filter, subdirectories, records)
+
+		if mtime is not None and not _index_current(mtime, mtime, listed):
+			mtime = None
+
+		return (mtime, subdirectories, records)
+
+	def __season_folders(self, season):
+		""" return list of folders (one per series path at most) holding episodes of given season """
+		folders = []
+
+		metadata_regex = re.compile("\(.+?\)$")
+		number_regex = re.compile("[^\d]")
+		for root in self.path:
+			for dir in os.listdir(root):
+				if os.path.isdir(os.path.join(root, dir)):
+
+					# strip any metadata that may be appended to the end of 
+					# the season folder as it can interfer with season identification
+					clean_dir = metadata_regex.sub("", dir)
+
+					number = number_regex.sub("", clean_dir)
+					if len(number) and int(season) == int(number):
+						folders.append(os.path.join(root, dir))
+						break
+		
+		return folders
+
+	def __create_episode(self, record, quality):
+		""" build filesystem episode object using given file index record """
+
+		if record['type'] == 'multi':
+			return FilesystemMultiEpisode(series=self, season=record['season'], start_episode=record['episode'], end_episode=record['end_episode'], quality=quality)
+		elif record['type'] == 'daily':
+			return FilesystemDailyEpisode(series=self, year=record['year'], month=record['month'], day=record['day'], quality=quality)
+		else:
+			return FilesystemSingleEpisode(series=self, season=record['season'], episode=record['episode'], quality=quality)
 
 	def __check_episode_lists(self):
 		if self.__episodes is None:
@@ -339,6 +587,17 @@ class Series(object):
 		return "%s" % self.name
 
 	# class methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	@classmethod
+	def episode_key(cls, episode):
+		""" 
+			return hashable key identifying given single or daily episode within its series, 
+			ie. (season, episode) or (year, month, day)
+		"""
+		if hasattr(episode, "year"):
+			return (episode.year, episode.month, episode.day)
+		else:
+			return (episode.season, episode.episode)
 	
 	@classmethod
 	def sanitize_series_name(cls, **kwargs):
@@ -359,6 +618,10 @@ class Series(object):
 			raise TooManyParametersError("only one of series or name can be provided when calling sanitize_series_name")
 
 		if 'series' in kwargs:
+
+			# series objects sanitize their name once
+			if isinstance(kwargs['series'], Series):
+				return kwargs['series'].__sanitized_name
 			name = kwargs['series'].name
 		elif 'name' in kwargs:
 			name = kwargs['name']
@@ -429,6 +692,7 @@ class Series(object):
 
 		# instance variables
 		self.__name = name
+		self.__sanitized_name = self.sanitize_series_name(name=name)
 		self.aliases = aliases
 		self.path = path
 
@@ -437,92 +701,446 @@ class Series(object):
 		self.__single_files = None
 		self.__daily_files = None
 		self.__multipart_files = None
+		self.__episode_index = None
+		self.__file_index = None
+		self.__disk_version = None
+		self.__disk_state = None
+		self.__directories = {}
+		self.__listings = None
 
 		# sanitize ignores list
 		self.__ignores = set([int(re.sub("[^\d]", "", str(i))) for i in ignores if i])
 
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+import tempfile
+
+try:
+	import cPickle as pickle
+except ImportError:
+	import pickle
+
 from mediarover.config import build_series_filters
+from mediarover.utils.pool import run_concurrently
+
+def scan_series(series_list, threads):
+	""" 
+		build the episode lists of given series ahead of time.  Series directories are read by a pool of worker 
+		threads while parsing and indexing happen in the calling thread (the metadata store can't be shared
+		between threads).  Series that have already been scanned are skipped
+	"""
+	logger = logging.getLogger("mediarover.series")
+
+	# aliases map several names to the same series
+	unique = []
+	seen = set()
+	for series in series_list:
+		if id(series) not in seen and not series.scanned():
+			seen.add(id(series))
+			unique.append(series)
+
+	index = Series.meta_ds.get_directory_index()
+	listings = run_concurrently(_read_series_directories, [(series.path, index) for series in unique], threads)
+
+	# record all changes to the filesystem index in a single transaction
+	with Series.meta_ds.batch():
+		for series, listing in zip(unique, listings):
+			series.scan(listing)
+
+	logger.debug("scanned %d series", len(unique))
+
+def _read_directory(dirpath, follow_links = True):
+	""" 
+		return sorted list of (name, path, stat) tuples for the entries of given directory, skipping hidden entries
+		and entries that can't be stat'ed (ie. dangling links).  Links are described by the stat of their target.
+		If follow_links is False, links to directories are skipped so that walking the subdirectories found never 
+		leaves the tree (or loops)
+	"""
+	entries = []
+	names = os.listdir(dirpath)
+	names.sort()
+	for name in names:
+		if name.startswith("."):
+			continue
+
+		path = os.path.join(dirpath, name)
+		try:
+			stat = os.lstat(path)
+			if S_ISLNK(stat.st_mode):
+				stat = os.stat(path)
+				if not follow_links and S_ISDIR(stat.st_mode):
+					continue
+		except OSError:
+			continue
+
+		entries.append((name, path, stat))
 
-def build_watch_list(config, process_aliases=True):
-	""" use given config object and build a dictionary of watched series """
+	return entries
+
+def _index_current(mtime, indexed_mtime, indexed):
+	""" 
+		return boolean indicating whether or not the index of a directory with given mtime is current.  indexed_mtime
+		and indexed are the mtime recorded in the index and the time the directory was read.  Directories modified
+		shortly before being read (see RACY_INTERVAL) may have changed since, without their mtime changing
+	"""
+	if indexed_mtime is None or indexed is None or indexed_mtime != mtime:
+		return False
+	return indexed - mtime >= RACY_INTERVAL
+
+def _index_filter(config):
+	""" return string identifying the settings used to filter the files of indexed directories """
+	return "%d:%s" % (MINIMUM_FILE_SIZE, ",".join(sorted(config['tv']['ignored_extensions'])))
+
+def _file_record(path, stat, type = None):
+	""" return new file_index record (as a dict) for file at given path """
+	return {
+		'path': path,
+		'mtime': stat.st_mtime,
+		'size': stat.st_size,
+		'inode': stat.st_ino,
+		'type': type,
+		'season': None,
+		'episode': None,
+		'end_episode': None,
+		'year': None,
+		'month': None,
+		'day': None,
+	}
+
+def _partial_files_changed(records):
+	""" 
+		return boolean indicating whether or not any of the files too small to be considered (from given file_index 
+		records) have been modified or removed since they were indexed
+	"""
+	for record in records:
+		if record['type'] == 'partial':
+			try:
+				stat = os.stat(record['path'])
+			except OSError:
+				return True
+			if stat.st_mtime != record['mtime'] or stat.st_size != record['size']:
+				return True
+
+	return False
+
+def _read_series_directories(paths, index):
+	""" 
+		read series directories and return dict mapping each directory path to a (mtime, time read, entries) tuple.  
+		index maps indexed directories to (mtime, time indexed, subdirectories) tuples, directories that haven't 
+		changed since they were indexed aren't listed and have entries set to None.  Directories that can't be read 
+		are left out
+	"""
+	listings = {}
+	pending = list(paths)
+	while len(pending):
+		dirpath = pending.pop()
+		try:
+			listed = time.time()
+			mtime = os.stat(dirpath).st_mtime
+			indexed = index.get(dirpath)
+			if indexed is not None and _index_current(mtime, indexed[0], indexed[1]):
+				listings[dirpath] = (mtime, listed, None)
+				pending.extend(indexed[2])
+			else:
+				entries = _read_directory(dirpath, False)
+				listings[dirpath] = (mtime, listed, entries)
+				pending.extend([path for (name, path, stat) in entries if S_ISDIR(stat.st_mode)])
+		except OSError:
+			pass
+
+	return listings
+
+def build_watch_list(config, process_aliases=True, config_dir=None):
+	""" 
+		use given config object and build a dictionary of watched series.  If config_dir is given, the series 
+		directories and filters found are cached and reused until one of the tv root or series directories, 
+		or the config file, is modified
+	"""
 	logger = logging.getLogger("mediarover.series")
 
-	watched_list = {}
-	skip_list = {}
+	# first things first, check that tv root directories exist and that we
+	# have read access to them
 	for root in config['tv']['tv_root']:
-
-		# first things first, check that tv root directory exists and that we
-		# have read access to it
 		if not os.access(root, os.F_OK):
 			raise FilesystemError("TV root rootectory (%s) does not exist!", root)
 		if not os.access(root, os.R_OK):
 			raise FilesystemError("Missing read access to tv root directory (%s)", root)
 
-		logger.info("begin processing tv directory: %s", root)
+	records = None
+	if config_dir is not None:
+		cache = os.path.join(config_dir, "ds", "watch_list")
+		records = _load_watched_series(cache, config, os.path.join(config_dir, "mediarover.conf"))
+		if records is None:
+			records = _find_watched_series(config)
+			_store_watched_series(cache, config, os.path.join(config_dir, "mediarover.conf"), records)
+		else:
+			logger.debug("tv root directories unchanged, using cached watch list")
+	else:
+		records = _find_watched_series(config)
+
+	watched_list = {}
+	for (sanitized_name, name, dirs, filters) in records:
+
+		# we've already seen this series (ie. by alias).  Append directories to list of series paths
+		if sanitized_name in watched_list:
+			watched_list[sanitized_name].path.extend(dirs)
+			continue
+
+		config['tv']['filter'][sanitized_name] = filters
+
+		# check filters to see if user wants this series skipped...
+		if filters["skip"]:
+			logger.debug("found skip filter, ignoring series: %s", name)
+			continue
+
+		series = Series(name, path=dirs)
+		additions = dict({sanitized_name: series})
+
+		# set season ignore list for current series
+		if len(filters['ignore']):
+			logger.debug("ignoring the following seasons of %s: %s", series.name, filters['ignore'])
+			series.ignores = filters['ignore']
+
+		# process series aliases.  For each new alias, register series in watched_list
+		if process_aliases and len(filters['alias']) > 0:
+			series.aliases = filters['alias']
+			count = 0
+			for alias in series.aliases:
+				sanitized_alias = Series.sanitize_series_name(name=alias)
+				if sanitized_alias in watched_list:
+					logger.warning("duplicate series alias found for '%s'! Duplicate aliases can/will result in incorrect downloads and improper sorting! You've been warned..." % series)
+				additions[sanitized_alias] = series
+				count += 1
+			logger.debug("%d alias(es) identified for series '%s'" % (count, series))
+
+		# finally, add additions to watched list
+		logger.debug("watching series: %s", series)
+		watched_list.update(additions)
 	
-		# grab list of shows
-		dir_list = os.listdir(root)
-		dir_list.sort()
-		for name in dir_list:
+	return watched_list
 
-			# skip hidden directories
-			if name.startswith("."):
-				continue
+def refresh_watch_list(watched_list, new_list, threads, changes=None):
+	""" 
+		replace contents of watched_list with those of new_list, keeping the Series objects (and their episode 
+		lists) of series whose name, paths, ignores and aliases haven't changed.  The episode lists of kept series 
+		are updated if any of their directories have been modified.  changes is the set of directories modified 
+		since the previous refresh (see DirectoryWatcher), if None the series directories are polled instead.  
+		Return watched_list
+	"""
+	logger = logging.getLogger("mediarover.series")
 
-			dir = os.path.join(root, name)
-			if os.path.isdir(dir):
+	kept = {}
+	for key, series in new_list.items():
+		old = watched_list.get(key)
+		if old is not None and (old.name, old.path, old.ignores, old.aliases) == (series.name, series.path, series.ignores, series.aliases):
+			new_list[key] = old
+			kept[id(old)] = old
+
+	# aliases map several names to the same series
+	kept = kept.values()
+	if changes is None:
+		modified = run_concurrently(Series.modified, [(series,) for series in kept], threads)
+	else:
+		modified = _assign_directories(kept, changes)
+
+	with Series.meta_ds.batch():
+		for series, dirs in zip(kept, modified):
+			if len(dirs) > 0:
+				logger.debug("%d directories of series '%s' modified, updating episode list", len(dirs), series)
+				series.update(dirs)
+
+	watched_list.clear()
+	watched_list.update(new_list)
+
+	return watched_list
+
+def _assign_directories(series_list, dirs):
+	""" return list containing the directories (from given dirs) belonging to each of the given series """
+	owners = {}
+	for index, series in enumerate(series_list):
+		for path in series.path:
+			owners[path] = index
+
+	assigned = [[] for series in series_list]
+	for dir in dirs:
+
+		# walk up the tree until reaching a series directory
+		parent = dir
+		while parent not in owners:
+			(parent, child) = os.path.split(parent)
+			if not child:
+				break
+		else:
+			assigned[owners[parent]].append(dir)
+
+	return assigned
+
+def _find_watched_series(config):
+	""" 
+		scan tv root directories and return list of (sanitized name, name, directories, filters) tuples, one 
+		per series in the order they were found
+	"""
+	logger = logging.getLogger("mediarover.series")
+
+	# read tv root directories concurrently
+	listings = run_concurrently(_read_directory, [(root,) for root in config['tv']['tv_root']], config['tv']['scan_threads'])
+
+	records = []
+	found = {}
+	for root, entries in zip(config['tv']['tv_root'], listings):
+
+		logger.info("begin processing tv directory: %s", root)
+	
+		# grab list of shows (hidden directories already skipped)
+		for (name, dir, stat) in entries:
+			if S_ISDIR(stat.st_mode):
 				
 				sanitized_name = Series.sanitize_series_name(name=name)
 
-				# already seen this series and have determined that user wants to skip it
-				if sanitized_name in skip_list:
-					continue
-
 				# we've already seen this series.  Append new directory to list of series paths
-				elif sanitized_name in watched_list:
-					series = watched_list[sanitized_name]
-					series.path.append(dir)
+				if sanitized_name in found:
+					found[sanitized_name][2].append(dir)
 
-				# new series, create new Series object and add to the watched list
+				# new series, locate and process any filters.  If no user defined filters for 
+				# current series exist, build dict using default values
 				else:
-					series = Series(name, path=dir)
-					additions = dict({sanitized_name: series})
-
-					# locate and process any filters for current series.  If no user defined filters for 
-					# current series exist, build dict using default values
 					if sanitized_name in config['tv']['filter']:
-						config['tv']['filter'][sanitized_name] = build_series_filters(dir, config['tv']['quality'], config['tv']['filter'][sanitized_name])
+						filters = build_series_filters(dir, config['tv']['quality'], config['tv']['filter'][sanitized_name])
 					else:
-						config['tv']['filter'][sanitized_name] = build_series_filters(dir, config['tv']['quality'])
+						filters = build_series_filters(dir, config['tv']['quality'])
+
+					found[sanitized_name] = (sanitized_name, name, [dir], _copy_filters(filters))
+					records.append(found[sanitized_name])
+
+	return records
+
+def _copy_filters(filters):
+	""" return copy of given series filters built using plain python types """
+	return {
+		'skip': bool(filters['skip']),
+		'ignore': list(filters['ignore']),
+		'alias': list(filters['alias']),
+		'quality': {
+			'acceptable': filters['quality']['acceptable'],
+			'desired': filters['quality']['desired'],
+		},
+	}
+
+def _watched_series_state(config, config_file, records):
+	""" 
+		return list of (path, mtime) tuples for the config file, tv root and series directories and any series 
+		ignore files.  Adding or removing a series directory or ignore file modifies its parent directory
+	"""
+	paths = [config_file]
+	paths.extend(config['tv']['tv_root'])
+	for (sanitized_name, name, dirs, filters) in records:
+		for dir in dirs:
+			paths.append(dir)
+			paths.append(os.path.join(dir, ".ignore"))
+
+	state = []
+	for path in paths:
+		try:
+			state.append((path, os.stat(path).st_mtime))
+		except OSError:
+			pass
 
-					# check filters to see if user wants this series skipped...
-					if config['tv']['filter'][sanitized_name]["skip"]:
-						skip_list[sanitized_name] = series
-						logger.debug("found skip filter, ignoring series: %s", series.name)
-						continue
+	return state
 
-					# set season ignore list for current series
-					if len(config['tv']['filter'][sanitized_name]['ignore']):
-						logger.debug("ignoring the following seasons of %s: %s", series.name, config['tv']['filter'][sanitized_name]['ignore'])
-						series.ignores = config['tv']['filter'][sanitized_name]['ignore']
-
-					# process series aliases.  For each new alias, register series in watched_list
-					if process_aliases and len(config['tv']['filter'][sanitized_name]['alias']) > 0:
-						series.aliases = config['tv']['filter'][sanitized_name]['alias']
-						count = 0
-						for alias in series.aliases:
-							sanitized_alias = Series.sanitize_series_name(name=alias)
-							if sanitized_alias in watched_list:
-								logger.warning("duplicate series alias found for '%s'! Duplicate aliases can/will result in incorrect downloads and improper sorting! You've been warned..." % series)
-							additions[sanitized_alias] = series
-							count += 1
-						logger.debug("%d alias(es) identified for series '%s'" % (count, series))
-
-					# finally, add additions to watched list
-					logger.debug("watching series: %s", series)
-					watched_list.update(additions)
-	
-	return watched_list
+def _load_watched_series(cache, config, config_file):
+	""" return list of series records stored in given cache file, None if missing or out of date """
+	try:
+		f = open(cache, "rb")
+		try:
+			(roots, state, records) = pickle.load(f)
+		finally:
+			f.close()
+	except (IOError, EOFError, ValueError, pickle.PickleError):
+		return None
+
+	if roots != list(config['tv']['tv_root']):
+		return None
+
+	# check that none of the directories or files the cache was built from have changed
+	for (path, mtime) in state:
+		try:
+			if os.stat(path).st_mtime != mtime:
+				return None
+		except OSError:
+			return None
+
+	return records
 
+def _store_watched_series(cache, config, config_file, records):
+	""" write given series records to cache file along with the current state of their directories """
+	logger = logging.getLogger("mediarover.series")
+
+	state = _watched_series_state(config, config_file, records)
+	try:
+		(fd, tmp) = tempfile.mkstemp(dir=os.path.dirname(cache), suffix=".tmp")
+		f = os.fdopen(fd, "wb")
+		try:
+			pickle.dump((list(config['tv']['tv_root']), state, records), f, pickle.HIGHEST_PROTOCOL)
+		finally:
+			f.close()
+		os.rename(tmp, cache)
+	except (IOError, OSError, pickle.PickleError), e:
+		logger.warning("unable to cache watch list: %s", e)
+
+def find_series(config, sanitized_name):
+	""" 
+		return Series object identified by given sanitized series name or alias, or None if it isn't being watched.  
+		Unlike build_watch_list(), only the directories belonging to the requested series are examined
+	"""
+	logger = logging.getLogger("mediarover.series")
+
+	# given name may be an alias, determine which series it refers to
+	target = sanitized_name
+	if target not in config['tv']['filter']:
+		for name, filters in config['tv']['filter'].items():
+			if target in [Series.sanitize_series_name(name=alias) for alias in filters['alias']]:
+				target = name
+				break
+
+	# locate series directories.  A series can be spread out over several tv roots
+	name = None
+	dirs = []
+	for root in config['tv']['tv_root']:
+		for entry in sorted(os.listdir(root)):
+			if entry.startswith(".") or Series.sanitize_series_name(name=entry) != target:
+				continue
+
+			dir = os.path.join(root, entry)
+			if os.path.isdir(dir):
+				if name is None:
+					name = entry
+				dirs.append(dir)
+
+	if name is None:
+		logger.debug("no directory found for series '%s'", sanitized_name)
+		return None
+
+	series = Series(name, path=dirs)
+
+	# locate and process any filters for series.  If no user defined filters exist, 
+	# build dict using default values
+	if target in config['tv']['filter']:
+		config['tv']['filter'][target] = build_series_filters(dirs[0], config['tv']['quality'], config['tv']['filter'][target])
+	else:
+		config['tv']['filter'][target] = build_series_filters(dirs[0], config['tv']['quality'])
+
+	# check filters to see if user wants this series skipped...
+	if config['tv']['filter'][target]["skip"]:
+		logger.debug("found skip filter, ignoring series: %s", series.name)
+		return None
+
+	# set season ignore list and aliases for series
+	if len(config['tv']['filter'][target]['ignore']):
+		logger.debug("ignoring the following seasons of %s: %s", series.name, config['tv']['filter'][target]['ignore'])
+		series.ignores = config['tv']['filter'][target]['ignore']
+	if len(config['tv']['filter'][target]['alias']) > 0:
+		series.aliases = config['tv']['filter'][target]['alias']
+
+	logger.debug("watching series: %s", series)
+
+	return series
@@ -43,19 +43,36 @@ class Source:
 		""" return list of zero or more mediarover.source.item objects """
 		raise NotImplementedError
 
+	def skip_records(self, predicate):
+		""" 
+			drop feed records for which given predicate returns True and return number of records dropped.  
+			Must be called before items()
+		"""
+		raise NotImplementedError
+
 # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 import logging
+import os.path
 import re
-import socket
-import urllib2
-import xml.dom.minidom
 from xml.parsers.expat import ExpatError
 
-from mediarover.error import InvalidRemoteData
+from mediarover.error import InvalidRemoteData, InvalidURL
+from mediarover.source.cache import FeedCache
+from mediarover.source.fetch import open_url
+from mediarover.source.parser import parse_feed
+from mediarover.utils.injection import is_instance_of, Dependency
 
 class AbstractXmlSource(Source):
 	""" NZB abstract source class """
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# map of feed item element names to FeedItem attributes
+	item_fields = {'title': 'title', 'link': 'url', 'category': 'category'}
+
+	# declare module dependencies
+	config_dir = Dependency('config_dir', is_instance_of(str))
 	
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 	def name(self):
@@ -79,29 +96,69 @@ class AbstractXmlSource(Source):
 	def delay(self):
 		return self._delay
 
+	def skip_records(self, predicate):
+		records = [record for record in self._feed_items if not predicate(record)]
+		skipped = len(self._feed_items) - len(records)
+		self._feed_items = records
+		return skipped
+
 	# private methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
-	def _get_document(self):
+	def _get_feed_items(self):
+		""" retrieve source url and return list of FeedItem records found in response, parsed as it is read """
 		logger = logging.getLogger("mediarover.source")
 
-		# update socket timeout to reflect source value
-		current_timeout = socket.getdefaulttimeout()
-		socket.setdefaulttimeout(self.timeout())
+		# make request conditional on the validators of the cached copy (if any).  The 
+		# source timeout is applied to the underlying connection only
+		headers = {}
+		cached = self._cache.lookup(self.url())
+		if cached is not None:
+			if cached['etag']:
+				headers['If-None-Match'] = cached['etag']
+			if cached['last_modified']:
+				headers['If-Modified-Since'] = cached['last_modified']
 
 		# attempt to retrieve data at source url
-		url = urllib2.urlopen(self.url())
-			
-		# parse xml response data and build DOM
-		# trap any expat errors
+		response = open_url(self.url(), self.timeout(), headers)
 		try:
-			document = xml.dom.minidom.parse(url)
-		except ExpatError, (e):
-			raise InvalidRemoteData(e)
-
-		# reset socket timeout value to default
-		socket.setdefaulttimeout(current_timeout)
-
-		return document
+			if response.status == 304:
+				logger.debug("source %r not modified since last retrieval, using cached copy", self.name())
+				response.read()
+				self._modified = False
+				stream = self._cache.open(self.url())
+			else:
+				etag = response.getheader("etag")
+				last_modified = response.getheader("last-modified")
+				if etag or last_modified:
+					stream = self._cache.writer(self.url(), response, etag, last_modified)
+				else:
+					self._cache.discard(self.url())
+					stream = response
+
+			# parse xml response data as it arrives and collect item records, trap any expat errors
+			# NOTE: only the (small) FeedItem records are kept, never the raw response or a document
+			# tree.  They aren't handed to their consumers one at a time because sources are created 
+			# on worker threads, while skip_records() and items() are only called from the main thread
+			# once every feed has been retrieved.  Reading the response in full here keeps retrieval 
+			# concurrent and releases the connection before the source is returned
+			try:
+				records = list(parse_feed(stream, self.item_fields))
+			except ExpatError, (e):
+				if not self._modified:
+					self._cache.discard(self.url())
+				raise InvalidRemoteData(e)
+			else:
+				if stream is not response and self._modified:
+					stream.commit()
+			finally:
+				if stream is not response:
+					stream.close()
+		finally:
+			response.close()
+
+		logger.debug("found %d item(s) in source %r", len(records), self.name())
+
+		return records
 
 	def __init__(self, name, url, type, priority, timeout, quality, delay):
 		""" validate given url and verify that it is a valid url (syntactically) """
@@ -120,6 +177,9 @@ class AbstractXmlSource(Source):
 		else:
 			self._url = url
 
-		# call the given url and retrieve remote document
-		self._document = self._get_document()
+		self._cache = FeedCache(os.path.join(self.config_dir, "ds", "feeds"))
+		self._modified = True
+
+		# call the given url and retrieve remote items
+		self._feed_items = self._get_feed_items()
 
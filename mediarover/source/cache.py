@@ -0,0 +1,163 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import logging
+import os
+import os.path
+import tempfile
+
+try:
+	from hashlib import md5
+except ImportError:
+	from md5 import new as md5
+
+class FeedCache(object):
+	""" 
+		on disk cache of source feed responses.  For each source url the response body is stored along
+		with its ETag and Last-Modified validators, so the next retrieval can be made conditional
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def lookup(self, url):
+		""" return dict containing cached validators for given url, None if url isn't cached """
+		meta = self.__path(url, "meta")
+		if not os.path.exists(meta) or not os.path.exists(self.__path(url, "xml")):
+			return None
+
+		try:
+			f = open(meta, "r")
+			try:
+				lines = f.read().split("\n")
+			finally:
+				f.close()
+		except IOError:
+			return None
+
+		lines.extend([""] * 2)
+		return {
+			'etag': lines[0] or None,
+			'last_modified': lines[1] or None,
+		}
+
+	def open(self, url):
+		""" return file object for cached response body of given url """
+		return open(self.__path(url, "xml"), "rb")
+
+	def writer(self, url, stream, etag, last_modified):
+		""" 
+			return file-like object that reads from given stream and copies all data to the cache.  The 
+			cached copy only replaces the previous one once the stream has been committed
+		"""
+		logger = logging.getLogger("mediarover.source.cache")
+		try:
+			if not os.path.isdir(self.__root):
+				os.makedirs(self.__root)
+			(fd, tmp) = tempfile.mkstemp(dir=self.__root, suffix=".tmp")
+		except (IOError, OSError), e:
+			logger.warning("unable to cache response for %r: %s", url, e)
+			return CacheWriter(self, url, stream, None, None, etag, last_modified)
+
+		return CacheWriter(self, url, stream, os.fdopen(fd, "wb"), tmp, etag, last_modified)
+
+	def store(self, url, tmp, etag, last_modified):
+		""" replace cached response body of given url with the contents of tmp file and record validators """
+		logger = logging.getLogger("mediarover.source.cache")
+		body = self.__path(url, "xml")
+		try:
+			if os.path.exists(body):
+				os.remove(body)
+			os.rename(tmp, body)
+		except OSError, e:
+			logger.warning("unable to cache response for %r: %s", url, e)
+			self.discard(url)
+		else:
+			self.__write_meta(url, etag, last_modified)
+
+	def discard(self, url):
+		""" remove cached response for given url """
+		for ext in ("meta", "xml"):
+			try:
+				os.remove(self.__path(url, ext))
+			except OSError:
+				pass
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __path(self, url, ext):
+		return os.path.join(self.__root, "%s.%s" % (md5(url).hexdigest(), ext))
+
+	def __write_meta(self, url, etag, last_modified):
+		logger = logging.getLogger("mediarover.source.cache")
+		try:
+			f = open(self.__path(url, "meta"), "w")
+			try:
+				f.write("%s\n%s\n" % (etag or "", last_modified or ""))
+			finally:
+				f.close()
+		except IOError, e:
+			logger.warning("unable to record cache details for %r: %s", url, e)
+
+	def __init__(self, root):
+		self.__root = root
+
+class CacheWriter(object):
+	""" file-like wrapper that copies everything read from a response stream into the feed cache """
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def read(self, amt = None):
+		if amt is None:
+			data = self.__stream.read()
+		else:
+			data = self.__stream.read(amt)
+
+		if self.__file is not None:
+			try:
+				self.__file.write(data)
+			except IOError:
+				self.abort()
+		return data
+
+	def commit(self):
+		""" store copied data in the cache """
+		if self.__file is not None:
+			self.__file.close()
+			self.__file = None
+			self.__cache.store(self.__url, self.__tmp, self.__etag, self.__last_modified)
+
+	def close(self):
+		""" discard copied data if it hasn't been committed """
+		self.abort()
+
+	def abort(self):
+		""" discard copied data """
+		if self.__file is not None:
+			self.__file.close()
+			self.__file = None
+			try:
+				os.remove(self.__tmp)
+			except OSError:
+				pass
+
+	def __init__(self, cache, url, stream, file, tmp, etag, last_modified):
+		self.__cache = cache
+		self.__url = url
+		self.__stream = stream
+		self.__file = file
+		self.__tmp = tmp
+		self.__etag = etag
+		self.__last_modified = last_modified
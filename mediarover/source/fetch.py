@@ -0,0 +1,247 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import base64
+import httplib
+import logging
+import socket
+import threading
+import urllib
+import urllib2
+import urlparse
+
+from mediarover.error import InvalidURL
+
+class ConnectionPool(object):
+	""" 
+		thread safe pool of persistent (keep-alive) http connections, grouped by host.  Every request
+		is given its own socket timeout so the process wide default is never touched.  Proxies are
+		taken from the environment, the same as urllib2
+	"""
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	max_redirects = 5
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def open(self, url, timeout, headers = None):
+		""" 
+			issue GET request for given url and return a file-like Response object.  Raise urllib2.HTTPError 
+			if the server returns an error status, or urllib2.URLError if the url couldn't be retrieved
+		"""
+		logger = logging.getLogger("mediarover.source.fetch")
+
+		for i in range(self.max_redirects + 1):
+			response = self.__request(url, timeout, headers or {})
+			if response.status in (301, 302, 303, 307) and response.getheader("location"):
+				location = urlparse.urljoin(url, response.getheader("location"))
+				response.read()
+				response.close()
+				logger.debug("following redirect from '%s' to '%s'", url, location)
+				url = location
+				continue
+
+			if response.status >= 400 and response.status != 304:
+				response.read()
+				response.close()
+				raise urllib2.HTTPError(url, response.status, response.reason, response.headers, None)
+
+			return response
+
+		raise urllib2.URLError("too many redirects while retrieving %s" % url)
+
+	def release(self, key, connection):
+		""" return given connection to the pool so that it can be reused """
+		self.__lock.acquire()
+		try:
+			self.__idle.setdefault(key, []).append(connection)
+		finally:
+			self.__lock.release()
+
+	def close(self):
+		""" close all idle connections """
+		self.__lock.acquire()
+		try:
+			for connections in self.__idle.values():
+				for connection in connections:
+					connection.close()
+			self.__idle = {}
+		finally:
+			self.__lock.release()
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __request(self, url, timeout, headers):
+
+		(scheme, netloc, path, params, query, fragment) = urlparse.urlparse(url)
+		scheme = scheme.lower()
+		if scheme not in ("http", "https") or not netloc:
+			raise InvalidURL("unsupported url: %s" % url)
+
+		request_headers = {'User-Agent': self.user_agent}
+
+		# credentials given in the url are sent using basic authentication
+		(userinfo, host) = urllib.splituser(netloc)
+		if userinfo is not None:
+			request_headers['Authorization'] = _basic_auth(userinfo)
+		request_headers.update(headers)
+
+		selector = urlparse.urlunparse(("", "", path or "/", params, query, ""))
+		proxy = self.__find_proxy(scheme, host)
+		if proxy is None:
+			address = host
+			tunnel_headers = None
+		else:
+			(address, proxy_userinfo) = proxy
+			tunnel_headers = {}
+			if proxy_userinfo is not None:
+				tunnel_headers['Proxy-Authorization'] = _basic_auth(proxy_userinfo)
+
+			# plain http requests are handed to the proxy using the absolute uri, https 
+			# requests are tunneled through it
+			if scheme == "http":
+				selector = urlparse.urlunparse((scheme, host, path or "/", params, query, ""))
+				request_headers.update(tunnel_headers)
+
+		key = (scheme, host.lower(), address.lower())
+
+		# try an idle connection first.  The server may have closed it since it was last
+		# used, in which case fall back to a fresh connection
+		connection = self.__acquire(key)
+		reused = connection is not None
+		while True:
+			try:
+				if connection is None:
+					if scheme == "https":
+						connection = httplib.HTTPSConnection(address, timeout=timeout)
+						if tunnel_headers is not None:
+							connection.set_tunnel(host, headers=tunnel_headers)
+					else:
+						connection = httplib.HTTPConnection(address, timeout=timeout)
+
+				connection.timeout = timeout
+				if connection.sock is not None:
+					connection.sock.settimeout(timeout)
+
+				connection.request("GET", selector, headers=request_headers)
+				response = connection.getresponse()
+			except (httplib.HTTPException, socket.error), e:
+				if connection is not None:
+					connection.close()
+				if reused:
+					reused = False
+					connection = None
+					continue
+				raise urllib2.URLError(e)
+			else:
+				return Response(self, key, connection, response)
+
+	def __find_proxy(self, scheme, host):
+		""" return (address, userinfo) tuple of proxy to use for given scheme and host, or None to connect directly """
+		proxy = self.__proxies.get(scheme)
+		if proxy is None or urllib.proxy_bypass(host):
+			return None
+
+		if "://" not in proxy:
+			proxy = "http://" + proxy
+		(userinfo, address) = urllib.splituser(urlparse.urlparse(proxy)[1])
+		return (address, userinfo)
+
+	def __acquire(self, key):
+		self.__lock.acquire()
+		try:
+			connections = self.__idle.get(key)
+			if connections:
+				return connections.pop()
+			return None
+		finally:
+			self.__lock.release()
+
+	def __init__(self, user_agent = "Python-urllib/%s" % urllib2.__version__):
+		self.user_agent = user_agent
+		self.__proxies = urllib.getproxies()
+		self.__idle = {}
+		self.__lock = threading.Lock()
+
+class Response(object):
+	""" file-like wrapper around an httplib response that hands its connection back to the pool once consumed """
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def read(self, amt = None):
+		try:
+			if amt is None:
+				data = self.__response.read()
+			else:
+				data = self.__response.read(amt)
+		except (httplib.HTTPException, socket.error), e:
+			self.__connection.close()
+			self.__connection = None
+			raise urllib2.URLError(e)
+
+		if amt is None or data == "":
+			self.close()
+		return data
+
+	def getheader(self, name, default = None):
+		return self.__response.getheader(name, default)
+
+	def close(self):
+		""" release underlying connection.  Connections are only reused if the response was fully read """
+		if self.__connection is not None:
+			if self.__response.isclosed() and not self.__response.will_close:
+				self.__pool.release(self.__key, self.__connection)
+			else:
+				self.__connection.close()
+			self.__connection = None
+
+	# property methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def _status_prop(self):
+		return self.__response.status
+
+	def _reason_prop(self):
+		return self.__response.reason
+
+	def _headers_prop(self):
+		return self.__response.msg
+
+	# property definitions- - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	status = property(fget=_status_prop, doc="http status code")
+	reason = property(fget=_reason_prop, doc="http status message")
+	headers = property(fget=_headers_prop, doc="response headers")
+
+	def __init__(self, pool, key, connection, response):
+		self.__pool = pool
+		self.__key = key
+		self.__connection = connection
+		self.__response = response
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+def _basic_auth(userinfo):
+	""" return basic authorization header value for given (url quoted) user:password string """
+	(user, password) = urllib.splitpasswd(userinfo)
+	credentials = "%s:%s" % (urllib.unquote(user), urllib.unquote(password or ""))
+	return "Basic %s" % base64.b64encode(credentials)
+
+# connection pool shared by all sources
+pool = ConnectionPool()
+
+def open_url(url, timeout, headers = None):
+	""" retrieve given url using the shared connection pool.  See ConnectionPool.open() """
+	return pool.open(url, timeout, headers)
@@ -0,0 +1,154 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+import time
+
+try:
+	from hashlib import md5
+except ImportError:
+	from md5 import new as md5
+
+from mediarover.config import ConfigObj
+from mediarover.ds.metadata import Metadata
+from mediarover.utils.injection import is_instance_of, Dependency
+
+class ItemLedger(object):
+	""" 
+		persistent record of the decisions made about source items in previous runs.  Each entry stores 
+		a fingerprint of the inputs its decision depended on.  As long as those inputs haven't changed,
+		a rejected item can be rejected again without being parsed or evaluated
+	"""
+
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# declare module dependencies
+	config = Dependency('config', is_instance_of(ConfigObj))
+	meta_ds = Dependency('metadata_data_store', is_instance_of(Metadata))
+	watched_series = Dependency('watched_series', is_instance_of(dict))
+
+	# map of reusable rejection decisions to the inputs they depend on
+	decisions = {
+		'not_watched': ('watch_list',),
+		'ignored': ('config',),
+		'multipart': ('config',),
+		'processed': (),
+		'on_disk': ('config', 'series', 'quality'),
+		'in_queue': ('config', 'series', 'queue'),
+	}
+
+	# number of days an item is remembered after it was last seen
+	retention = 14
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def rejected(self, source, record):
+		""" 
+			return previous decision if given feed record (mediarover.source.parser.FeedItem) was rejected 
+			and none of the inputs that decision depended on have changed, None otherwise
+		"""
+		entry = self.__entries(source).get(record.url)
+		if entry is None or entry['title'] != record.title or entry['decision'] not in self.decisions:
+			return None
+
+		if entry['inputs'] != self.__inputs(entry['decision'], entry['series']):
+			return None
+
+		logger = logging.getLogger("mediarover.source.ledger")
+		logger.debug("skipping %r, previously rejected (%s)", record.title, entry['decision'])
+
+		# refresh entry so that it isn't pruned
+		self.__seen.setdefault(source, {})[record.url] = entry
+
+		return entry['decision']
+
+	def record(self, source, item, decision):
+		""" record decision made about given source item """
+		series = Series.sanitize_series_name(series=item.download().series)
+		entry = {
+			'url': item.url(),
+			'title': item.title(),
+			'series': series,
+			'decision': decision or 'scheduled',
+			'inputs': self.__inputs(decision, series),
+		}
+		self.__entries(source)[item.url()] = entry
+		self.__seen.setdefault(source, {})[item.url()] = entry
+
+	def save(self):
+		""" write recorded decisions to the metadata store and prune items that haven't been seen recently """
+		now = time.time()
+		for source, entries in self.__seen.items():
+			self.meta_ds.record_seen_items(source, entries.values(), now)
+		self.meta_ds.delete_stale_seen_items(now - self.retention * 86400)
+		self.__seen = {}
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __entries(self, source):
+		if source not in self.__items:
+			self.__items[source] = self.meta_ds.get_seen_items(source)
+		return self.__items[source]
+
+	def __inputs(self, decision, series):
+		""" return fingerprint of the inputs given decision depends on """
+		values = []
+		for input in self.decisions.get(decision, ()):
+			if input == 'series':
+				if series in self.watched_series:
+					values.append(self.watched_series[series].disk_version())
+				else:
+					values.append("")
+			elif input == 'quality':
+				values.append(self.__quality_fingerprint(series))
+			else:
+				values.append(self.__fingerprint(input))
+
+		return md5("\n".join(values)).hexdigest()
+
+	def __fingerprint(self, input):
+		""" return fingerprint of given run wide input.  Values are calculated once per run """
+		if input not in self.__fingerprints:
+			if input == 'config':
+				state = (self.config['tv'].dict(), self.config['source'].dict())
+			elif input == 'watch_list':
+				state = sorted(self.watched_series.keys())
+			elif input == 'queue':
+				state = sorted([job.title() for job in self.__queue.jobs()])
+			self.__fingerprints[input] = md5(repr(state)).hexdigest()
+
+		return self.__fingerprints[input]
+
+	def __quality_fingerprint(self, series):
+		""" return fingerprint of the episode qualities stored for given (sanitized) series.  Values are calculated once per run """
+		key = ('quality', series)
+		if key not in self.__fingerprints:
+			if series in self.watched_series:
+				state = sorted(self.meta_ds.get_episode_qualities(self.watched_series[series]).items())
+			else:
+				state = []
+			self.__fingerprints[key] = md5(repr(state)).hexdigest()
+
+		return self.__fingerprints[key]
+
+	def __init__(self, queue):
+		self.__queue = queue
+		self.__items = {}
+		self.__seen = {}
+		self.__fingerprints = {}
+
+# - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+from mediarover.series import Series
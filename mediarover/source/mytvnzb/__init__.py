@@ -28,16 +28,16 @@ class MytvnzbSource(AbstractXmlSource):
 		""" return list of Item objects """
 		logger = logging.getLogger("mediarover.source.mytvnzb")
 
-		# if item list hasn't been constructed yet, parse document tree 
+		# if item list hasn't been constructed yet, process feed records
 		# and build list of available items.
 		try:
 			self.__items
 		except AttributeError:
 			self.__items = []
-			for rawItem in self._document.getElementsByTagName("item"):
-				title = rawItem.getElementsByTagName("title")[0].childNodes[0].data
+			for record in self._feed_items:
+				title = record.title
 				try:
-					item = TvnzbItem(rawItem, self.type(), self.priority(), self.quality(), self.delay())
+					item = TvnzbItem(record, self.type(), self.priority(), self.quality(), self.delay())
 				except InvalidItemTitle:
 					logger.debug("skipping %r, unknown format" % title)
 				except UnsupportedCategory:
@@ -22,23 +22,28 @@ from mediarover.source.newzbin.item import NewzbinItem
 class NewzbinSource(AbstractXmlSource):
 	""" newzbin source class """
 
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	# map of feed item element names to FeedItem attributes
+	item_fields = {'title': 'title', 'report:nzb': 'url', 'report:id': 'id', 'report:category': 'category'}
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	def items(self):
 		""" return list of Item objects """
 		logger = logging.getLogger("mediarover.source.newzbin")
 		
-		# if item list hasn't been constructed yet, parse document tree
+		# if item list hasn't been constructed yet, process feed records
 		# and build list of available items.
 		try:
 			self.__items
 		except AttributeError:
 			self.__items = []
-			for rawItem in self._document.getElementsByTagName("item"):
-				if self.type().upper() == rawItem.getElementsByTagName("report:category")[0].childNodes[0].data.upper():
-					title = rawItem.getElementsByTagName("title")[0].childNodes[0].data
+			for record in self._feed_items:
+				if record.category is None or self.type().upper() == record.category.upper():
+					title = record.title
 					try:
-						item = NewzbinItem(rawItem, self.type(), self.priority(), self.quality(), self.delay())
+						item = NewzbinItem(record, self.type(), self.priority(), self.quality(), self.delay())
 					except InvalidItemTitle:
 						logger.debug("skipping %r, unknown format" % title)
 					except UnsupportedCategory:
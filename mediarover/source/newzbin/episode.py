@@ -20,6 +20,10 @@ from mediarover.episode.multi import MultiEpisode
 class NewzbinSingleEpisode(SingleEpisode):
 	""" newzbin single episode """
 
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	__slots__ = ()
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -43,6 +47,10 @@ class NewzbinSingleEpisode(SingleEpisode):
 class NewzbinMultiEpisode(MultiEpisode):
 	""" newzbin multiepisode """
 
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	__slots__ = ()
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -64,6 +72,10 @@ class NewzbinMultiEpisode(MultiEpisode):
 class NewzbinDailyEpisode(DailyEpisode):
 	""" newzbin daily episode """
 
+	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	__slots__ = ()
+
 	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
 	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
@@ -14,6 +14,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from mediarover.config import ConfigObj
+from mediarover.episode.parser import get_parser
 from mediarover.error import *
 from mediarover.factory import EpisodeFactory, SourceFactory
 from mediarover.series import Series
@@ -37,15 +38,17 @@ class NewzbinFactory(EpisodeFactory, SourceFactory):
 
 	def create_episode(self, string, **kwargs):
 		
+		# grab the series name and episode title (if provided), the episode details are found between them
+		(kwargs['series'], sep, other) = string.partition(" - ")
+		(other, sep, kwargs['title']) = other.partition(" - ")
+
 		# parse given string and extract episode attributes
-		if NewzbinMultiEpisode.handle(string):
-			params = NewzbinMultiEpisode.extract_from_string(string, **kwargs)
-		elif NewzbinSingleEpisode.handle(string):
-			params = NewzbinSingleEpisode.extract_from_string(string, **kwargs)
-		elif NewzbinDailyEpisode.handle(string):
-			params = NewzbinDailyEpisode.extract_from_string(string, **kwargs)
-		else:
+		parsed = get_parser((NewzbinMultiEpisode, NewzbinSingleEpisode, NewzbinDailyEpisode), self.config['tv']['episode_patterns']).parse(other)
+		if parsed is None:
 			raise InvalidEpisodeString("unable to identify episode type: %r" % string)
+
+		(episode_class, groups, sanitized_series) = parsed
+		params = episode_class.extract_from_groups(groups, **kwargs)
 	
 		# locate series object.  If series is unknown, create new series
 		sanitized_series = Series.sanitize_series_name(name=params['series'])
@@ -60,10 +63,5 @@ class NewzbinFactory(EpisodeFactory, SourceFactory):
 			else:
 				params['quality'] = self.config['tv']['quality']['desired']
 
-		if 'start_episode' in params:
-			return NewzbinMultiEpisode(**params)
-		elif 'year' in params:
-			return NewzbinDailyEpisode(**params)
-		else:
-			return NewzbinSingleEpisode(**params)
+		return episode_class(**params)
 
@@ -78,9 +78,8 @@ class NewzbinItem(AbstractItem):
 
 	def _report_category(self):
 		""" report category from source item """
-		categories = self.__item.getElementsByTagName("report:category")
-		if categories:
-			return categories[0].childNodes[0].data
+		if self.__item.category:
+			return self.__item.category
 		else:
 			raise InvalidRemoteData("report does not have a category")
 
@@ -94,7 +93,7 @@ class NewzbinItem(AbstractItem):
 	id = property(fget=_id_prop, doc="newzbin report id")
 
 	def __init__(self, item, type, priority, quality, delay):
-		""" init method expects a DOM Element object (xml.dom.Element) """
+		""" init method expects a feed item record (mediarover.source.parser.FeedItem) """
 
 		self.__item = item
 		self.__type = type
@@ -102,21 +101,18 @@ class NewzbinItem(AbstractItem):
 		self.__quality = quality
 		self.__delay = delay
 
-		ids = self.__item.getElementsByTagName("report:id")
-		if ids:
-			self.__id = ids[0].childNodes[0].data
+		if self.__item.id:
+			self.__id = self.__item.id
 		else:
 			raise InvalidRemoteData("report does not have an id")
 
-		titles = self.__item.getElementsByTagName("title")
-		if titles:
-			self.__title = titles[0].childNodes[0].data
+		if self.__item.title:
+			self.__title = self.__item.title
 		else:
 			raise InvalidRemoteData("report does not have a title")
 
-		links = self.__item.getElementsByTagName("report:nzb")
-		if links:
-			self.__url = links[0].childNodes[0].data
+		if self.__item.url:
+			self.__url = self.__item.url
 		else:
 			raise InvalidRemoteData("report does not have a url")
 
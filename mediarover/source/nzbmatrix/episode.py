@@ -23,6 +23,8 @@ class NzbmatrixDailyEpisode(DailyEpisode):
 
 	# class variables- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
 
+	__slots__ = ()
+
 	__supported_patterns = (
 		# daily regex: <year> <month> <day>
 		re.compile("(?P<year>\d{4})\s+(?P<month>\d{2})\s+(?P<day>\d{2})"),
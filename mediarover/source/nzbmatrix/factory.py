@@ -17,6 +17,7 @@ from mediarover.config import ConfigObj
 from mediarover.error import *
 from mediarover.factory import EpisodeFactory, SourceFactory
 from mediarover.episode.multi import MultiEpisode
+from mediarover.episode.parser import get_parser
 from mediarover.episode.single import SingleEpisode
 from mediarover.series import Series
 from mediarover.source.nzbmatrix import NzbmatrixSource
@@ -39,21 +40,23 @@ class NzbmatrixFactory(EpisodeFactory, SourceFactory):
 	def create_episode(self, string, **kwargs):
 
 		# parse given string and extract episode attributes
-		if MultiEpisode.handle(string):
-			params = MultiEpisode.extract_from_string(string, **kwargs)
-		elif SingleEpisode.handle(string):
-			params = SingleEpisode.extract_from_string(string, **kwargs)
-		elif NzbmatrixDailyEpisode.handle(string):
-			params = NzbmatrixDailyEpisode.extract_from_string(string, **kwargs)
-		else:
+		parsed = get_parser((MultiEpisode, SingleEpisode, NzbmatrixDailyEpisode), self.config['tv']['episode_patterns']).parse(string)
+		if parsed is None:
 			raise InvalidEpisodeString("unable to identify episode type: %r" % string)
 
+		(episode_class, groups, sanitized_series) = parsed
+		params = episode_class.extract_from_groups(groups, **kwargs)
+
 		# locate series object.  If series is unknown, create new series
-		sanitized_series = Series.sanitize_series_name(name=params['series'])
-		if sanitized_series in self.watched_series:
-			params['series'] = self.watched_series[sanitized_series]
+		if type(params['series']) is not Series:
+			if 'series' in kwargs:
+				sanitized_series = Series.sanitize_series_name(name=params['series'])
+			if sanitized_series in self.watched_series:
+				params['series'] = self.watched_series[sanitized_series]
+			else:
+				params['series'] = Series(params['series'])
 		else:
-			params['series'] = Series(params['series'])
+			sanitized_series = Series.sanitize_series_name(series=params['series'])
 
 		if 'quality' not in kwargs:
 			if sanitized_series in self.config['tv']['filter']:
@@ -61,10 +64,5 @@ class NzbmatrixFactory(EpisodeFactory, SourceFactory):
 			else:
 				params['quality'] = self.config['tv']['quality']['desired']
 
-		if 'start_episode' in params:
-			return MultiEpisode(**params)
-		elif 'year' in params:
-			return NzbmatrixDailyEpisode(**params)
-		else:
-			return SingleEpisode(**params)
+		return episode_class(**params)
 
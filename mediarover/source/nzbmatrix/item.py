@@ -78,14 +78,13 @@ class NzbmatrixItem(AbstractItem):
 
 	def _report_category(self):
 		""" report category id from source item """
-		categories = self.__item.getElementsByTagName("category")
-		if categories:
-			return re.match("(\w+):", categories[0].childNodes[0].data).group(1)
+		if self.__item.category:
+			return re.match("(\w+):", self.__item.category).group(1)
 		else:
 			raise InvalidRemoteData("report does not have a category")
 
 	def __init__(self, item, type, priority, quality, delay):
-		""" init method expects a DOM Element object (xml.dom.Element) """
+		""" init method expects a feed item record (mediarover.source.parser.FeedItem) """
 
 		self.__item = item
 		self.__type = type
@@ -93,15 +92,13 @@ class NzbmatrixItem(AbstractItem):
 		self.__quality = quality
 		self.__delay = delay
 
-		titles = self.__item.getElementsByTagName("title")
-		if titles:
-			self.__title = titles[0].childNodes[0].data
+		if self.__item.title:
+			self.__title = self.__item.title
 		else:
 			raise InvalidRemoteData("report does not have a title")
 
-		links = self.__item.getElementsByTagName("link")
-		if links:
-			self.__url = links[0].childNodes[0].data
+		if self.__item.url:
+			self.__url = self.__item.url
 		else:
 			raise InvalidRemoteData("report does not have a url")
 
@@ -0,0 +1,87 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from collections import deque
+from xml.parsers import expat
+
+class FeedItem(object):
+	""" lightweight record representing a single item found in a source feed """
+
+	__slots__ = ('title', 'url', 'id', 'category')
+
+	def __repr__(self):
+		return "%s(title=%r,url=%r,id=%r,category=%r)" % (self.__class__.__name__, self.title, self.url, self.id, self.category)
+
+	def __init__(self, title = None, url = None, id = None, category = None):
+		self.title = title
+		self.url = url
+		self.id = id
+		self.category = category
+
+def parse_feed(stream, fields, chunk_size = 16384):
+	"""
+		incrementally parse rss data read from given file-like stream and yield a FeedItem for every 
+		<item> element found.  Items are yielded as soon as their closing tag has been read so that 
+		neither the raw response nor a document tree is ever held in memory.
+
+		fields is a dict mapping item child element names (ie. 'link' or 'report:nzb') to FeedItem 
+		attributes.  Only the first occurrence of each element is recorded.  Raise 
+		xml.parsers.expat.ExpatError if the data is not well formed
+	"""
+	parsed = deque()
+	state = {'item': None, 'field': None, 'depth': 0, 'text': []}
+
+	def start_element(name, attrs):
+		state['depth'] += 1
+		if state['item'] is None:
+			if name == "item":
+				state['item'] = FeedItem()
+				state['item_depth'] = state['depth']
+		elif state['depth'] == state['item_depth'] + 1 and name in fields:
+			if getattr(state['item'], fields[name]) is None:
+				state['field'] = fields[name]
+				state['text'] = []
+
+	def end_element(name):
+		item = state['item']
+		if item is not None:
+			if state['depth'] == state['item_depth']:
+				parsed.append(item)
+				state['item'] = None
+			elif state['field'] is not None and state['depth'] == state['item_depth'] + 1:
+				setattr(item, state['field'], "".join(state['text']).strip())
+				state['field'] = None
+		state['depth'] -= 1
+
+	def character_data(data):
+		if state['field'] is not None:
+			state['text'].append(data)
+
+	parser = expat.ParserCreate()
+	parser.buffer_text = True
+	parser.StartElementHandler = start_element
+	parser.EndElementHandler = end_element
+	parser.CharacterDataHandler = character_data
+
+	while True:
+		data = stream.read(chunk_size)
+		parser.Parse(data, data == "")
+
+		while len(parsed):
+			yield parsed.popleft()
+
+		if data == "":
+			break
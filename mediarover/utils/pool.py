@@ -0,0 +1,104 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import threading
+from Queue import Queue, Empty
+
+def run_concurrently(func, args_list, threads):
+	""" 
+		call given function once for each tuple of arguments in args_list using at most the given 
+		number of worker threads.  Return list of results in the same order as args_list
+
+		if any call raises an exception, the first one encountered is re-raised in the calling
+		thread once all workers have finished
+	"""
+	results = [None] * len(args_list)
+	errors = []
+
+	# nothing to gain from spinning up threads for a single call
+	threads = max(1, min(int(threads), len(args_list)))
+	if threads == 1:
+		for i, args in enumerate(args_list):
+			results[i] = func(*args)
+		return results
+
+	pending = Queue()
+	for i, args in enumerate(args_list):
+		pending.put((i, args))
+
+	def worker():
+		while True:
+			try:
+				(i, args) = pending.get_nowait()
+			except Empty:
+				break
+			try:
+				results[i] = func(*args)
+			except Exception:
+				errors.append(sys.exc_info())
+
+	workers = []
+	for i in range(threads):
+		thread = threading.Thread(target=worker)
+		thread.setDaemon(True)
+		thread.start()
+		workers.append(thread)
+
+	for thread in workers:
+		thread.join()
+
+	if len(errors):
+		raise errors[0][0], errors[0][1], errors[0][2]
+
+	return results
+
+class BackgroundCall(object):
+	""" 
+		call given function with arguments in a separate thread.  The result is made available
+		through result(), which blocks until the call has finished
+	"""
+
+	# public methods - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def result(self):
+		""" 
+			wait for call to finish and return its result.  If the call raised an exception, it
+			is re-raised in the calling thread
+		"""
+		self.__thread.join()
+		if self.__error is not None:
+			raise self.__error[0], self.__error[1], self.__error[2]
+		return self.__result
+
+	def done(self):
+		""" return boolean indicating whether or not the call has finished """
+		return not self.__thread.isAlive()
+
+	# private methods- - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
+
+	def __run(self, func, args, kwargs):
+		try:
+			self.__result = func(*args, **kwargs)
+		except Exception:
+			self.__error = sys.exc_info()
+
+	def __init__(self, func, *args, **kwargs):
+		self.__result = None
+		self.__error = None
+
+		self.__thread = threading.Thread(target=self.__run, args=(func, args, kwargs))
+		self.__thread.setDaemon(True)
+		self.__thread.start()
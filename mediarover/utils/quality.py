@@ -19,6 +19,14 @@ LOW = 'low'
 MEDIUM = 'medium'
 HIGH = 'high'
 
+# shared copy of each quality level.  Levels are read from the config file and the 
+# metadata store, storing the shared copy saves a string per episode
+_levels = dict([(level, level) for level in (LOW, MEDIUM, HIGH)])
+
+def intern_quality(quality):
+	""" return shared copy of given quality level """
+	return _levels.get(quality, quality)
+
 def guess_quality_level(config, ext, default):
 	quality = default
 	if config['tv']['quality']['guess']:
@@ -15,4 +15,4 @@
 
 __app_version__ = "0.5.3"
 __config_version__ = {'version': 5, 'min': 5}
-__schema_version__ = 1
+__schema_version__ = 5
@@ -8,6 +8,13 @@
 [logging]
 	generate_sorting_log = boolean(default=True)
 
+[metadata]
+	journal_mode = option('delete', 'wal', default='delete')
+
+[daemon]
+	interval = integer(min=1, default=15)
+	watch_library = boolean(default=True)
+
 [tv]
 	tv_root = path_list()
 	umask = integer(default=022)
@@ -15,6 +22,9 @@
 	priority = option('normal', 'high', 'low', 'force', default='normal')
 	ignored_extensions = list(default=list("nfo","txt","sfv","srt","nzb","idx","log","par","par2","exe","bat","com","tbn","jpg","png","gif","info","db","srr"))
 	allow_multipart = boolean(default=True)
+	scan_threads = integer(min=1, default=4)
+	cache_watch_list = boolean(default=True)
+	episode_patterns = string_list(default=list())
 
 	[[quality]]
 		managed = boolean(default=False)
@@ -44,6 +54,7 @@
 		daily_episode = string(default='$(series)s - $(daily-)s$(smart_title)s')
 
 [source]
+	fetch_threads = integer(min=1, default=4)
 	[[__many__]]
 		url = url()
 		provider = option('newzbin','tvnzb','mytvnzb','nzbs','nzbmatrix')
@@ -59,6 +70,7 @@
 		password = string(default=None)
 		api_key = string(default=None)
 		backup_dir = path(default="")
+		format = option('json', 'xml', default='json')
 		__check_version__ = boolean(default=True)
 
 [__SYSTEM__]
@@ -3,6 +3,9 @@ DROP TABLE IF EXISTS single_episode;
 DROP TABLE IF EXISTS daily_episode;
 DROP TABLE IF EXISTS in_progress;
 DROP TABLE IF EXISTS delayed_item;
+DROP TABLE IF EXISTS directory_index;
+DROP TABLE IF EXISTS file_index;
+DROP TABLE IF EXISTS seen_item;
 
 CREATE TABLE IF NOT EXISTS series
 (
@@ -52,5 +55,46 @@ CREATE TABLE IF NOT EXISTS delayed_item
 	delay INTEGER NOT NULL
 );
 
+CREATE TABLE IF NOT EXISTS directory_index
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	parent TEXT,
+	mtime REAL,
+	indexed REAL,
+	filter TEXT
+);
+
+CREATE INDEX IF NOT EXISTS directory_index_parent ON directory_index (parent);
+
+CREATE TABLE IF NOT EXISTS file_index
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	directory TEXT NOT NULL,
+	mtime REAL NOT NULL,
+	size INTEGER NOT NULL,
+	inode INTEGER NOT NULL,
+	type TEXT,
+	season INTEGER,
+	episode INTEGER,
+	end_episode INTEGER,
+	year INTEGER,
+	month INTEGER,
+	day INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS file_index_directory ON file_index (directory);
+
+CREATE TABLE IF NOT EXISTS seen_item
+(
+	source TEXT NOT NULL,
+	url TEXT NOT NULL,
+	title TEXT NOT NULL,
+	series TEXT,
+	decision TEXT NOT NULL,
+	inputs TEXT NOT NULL,
+	last_seen REAL NOT NULL,
+	PRIMARY KEY (source, url)
+);
+
 PRAGMA user_version = ${schema_version};
 
@@ -0,0 +1,47 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+def upgrade(dbh):
+	dbh.execute('''
+CREATE TABLE IF NOT EXISTS directory_index
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	parent TEXT,
+	mtime REAL
+)
+	''')
+	dbh.execute('CREATE INDEX IF NOT EXISTS directory_index_parent ON directory_index (parent)')
+	dbh.execute('''
+CREATE TABLE IF NOT EXISTS file_index
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	directory TEXT NOT NULL,
+	mtime REAL NOT NULL,
+	size INTEGER NOT NULL,
+	inode INTEGER NOT NULL,
+	type TEXT,
+	season INTEGER,
+	episode INTEGER,
+	end_episode INTEGER,
+	year INTEGER,
+	month INTEGER,
+	day INTEGER
+)
+	''')
+	dbh.execute('CREATE INDEX IF NOT EXISTS file_index_directory ON file_index (directory)')
+
+def revert(dbh):
+	dbh.execute('DROP TABLE IF EXISTS file_index')
+	dbh.execute('DROP TABLE IF EXISTS directory_index')
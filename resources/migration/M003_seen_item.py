@@ -0,0 +1,32 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+def upgrade(dbh):
+	dbh.execute('''
+CREATE TABLE IF NOT EXISTS seen_item
+(
+	source TEXT NOT NULL,
+	url TEXT NOT NULL,
+	title TEXT NOT NULL,
+	series TEXT,
+	decision TEXT NOT NULL,
+	inputs TEXT NOT NULL,
+	last_seen REAL NOT NULL,
+	PRIMARY KEY (source, url)
+)
+	''')
+
+def revert(dbh):
+	dbh.execute('DROP TABLE IF EXISTS seen_item')
@@ -0,0 +1,32 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+def upgrade(dbh):
+	dbh.execute('ALTER TABLE directory_index ADD COLUMN indexed REAL')
+
+def revert(dbh):
+	dbh.execute('ALTER TABLE directory_index RENAME TO directory_index_old')
+	dbh.execute('''
+CREATE TABLE directory_index
+(
+	path TEXT PRIMARY KEY NOT NULL,
+	parent TEXT,
+	mtime REAL
+)
+	''')
+	dbh.execute('INSERT INTO directory_index (path, parent, mtime) SELECT path, parent, mtime FROM directory_index_old')
+	dbh.execute('DROP TABLE directory_index_old')
+	dbh.execute('CREATE INDEX IF NOT EXISTS directory_index_parent ON directory_index (parent)')
@@ -0,0 +1,121 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import BaseHTTPServer
+import atexit
+import os
+import os.path
+import shutil
+import SocketServer
+import tempfile
+import threading
+
+from mediarover.config import read_config
+from mediarover.ds.metadata import Metadata
+from mediarover.episode.factory import EpisodeFactory
+from mediarover.filesystem.factory import FilesystemFactory
+from mediarover.source.newzbin.factory import NewzbinFactory
+from mediarover.utils.injection import initialize_broker
+
+RESOURCES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+
+CONFIG = """[tv]
+tv_root = %(tv)s
+[[quality]]
+managed = True
+desired = medium
+[source]
+[queue]
+[[sabnzbd]]
+root = http://localhost:8080/sabnzbd
+[__SYSTEM__]
+__version__ = 5
+"""
+
+# environment shared by all tests, see environment()
+_environment = None
+
+def environment():
+	""" 
+		register the dependencies needed by the tests and return dict containing the broker and the config, tv and 
+		scratch directories.  Dependencies are resolved once per process, so all tests share a single environment
+	"""
+	global _environment
+	if _environment is None:
+		root = tempfile.mkdtemp(prefix="mediarover-tests-")
+		atexit.register(shutil.rmtree, root, True)
+
+		config_dir = os.path.join(root, "config")
+		tv = os.path.join(root, "tv")
+		for path in (os.path.join(config_dir, "ds"), os.path.join(config_dir, "logs"), tv):
+			os.makedirs(path)
+
+		f = open(os.path.join(config_dir, "mediarover.conf"), "w")
+		try:
+			f.write(CONFIG % {'tv': tv})
+		finally:
+			f.close()
+		for name in ("logging.conf", "sabnzbd_episode_sort_logging.conf"):
+			open(os.path.join(config_dir, name), "w").close()
+
+		broker = initialize_broker()
+		broker.register('config_dir', config_dir)
+		broker.register('resources_dir', RESOURCES)
+		broker.register('config', read_config(RESOURCES, config_dir))
+		broker.register('metadata_data_store', Metadata())
+		broker.register('episode_factory', EpisodeFactory())
+		broker.register('filesystem_factory', FilesystemFactory())
+		broker.register('newzbin', NewzbinFactory())
+		broker.register('watched_series', {})
+
+		_environment = {
+			'broker': broker,
+			'config_dir': config_dir,
+			'tv': tv,
+			'root': root,
+		}
+
+	return _environment
+
+def create_metadata(config_dir):
+	""" return new Metadata store kept in given directory, rather than the shared config directory """
+	environment()
+	os.makedirs(os.path.join(config_dir, "ds"))
+
+	class ScratchMetadata(Metadata):
+		pass
+	ScratchMetadata.config_dir = config_dir
+
+	return ScratchMetadata()
+
+class ThreadingHTTPServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+	daemon_threads = True
+
+	def handle_error(self, request, client_address):
+		""" clients are free to drop their connections """
+		pass
+
+def start_server(handler):
+	""" serve requests with given BaseHTTPRequestHandler class in the background and return the server """
+	server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+	thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+	thread.setDaemon(True)
+	thread.start()
+	return server
+
+def url(server, path):
+	""" return url of given path on given server """
+	return "http://%s:%d%s" % (server.server_address[0], server.server_address[1], path)
@@ -0,0 +1,85 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import StringIO
+import tempfile
+import unittest
+
+from mediarover.source.cache import FeedCache
+
+URL = "http://feeds.example.com/rss?page=1"
+
+class FeedCacheTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.mkdtemp()
+		self.cache = FeedCache(os.path.join(self.dir, "feeds"))
+
+	def tearDown(self):
+		shutil.rmtree(self.dir)
+
+	def store(self, body, etag = None, last_modified = None):
+		writer = self.cache.writer(URL, StringIO.StringIO(body), etag, last_modified)
+		while writer.read(4):
+			pass
+		writer.commit()
+
+	def cached(self):
+		f = self.cache.open(URL)
+		try:
+			return f.read()
+		finally:
+			f.close()
+
+	def test_store(self):
+		self.assertEqual(self.cache.lookup(URL), None)
+
+		self.store("<rss>first</rss>", '"abc"', "Mon, 18 Oct 2010 10:00:00 GMT")
+		self.assertEqual(self.cache.lookup(URL), {'etag': '"abc"', 'last_modified': "Mon, 18 Oct 2010 10:00:00 GMT"})
+		self.assertEqual(self.cached(), "<rss>first</rss>")
+
+		# a new response replaces the old one, validators that weren't given are cleared
+		self.store("<rss>second</rss>", '"def"')
+		self.assertEqual(self.cache.lookup(URL), {'etag': '"def"', 'last_modified': None})
+		self.assertEqual(self.cached(), "<rss>second</rss>")
+
+	def test_uncommitted_responses_are_discarded(self):
+		self.store("<rss>first</rss>", '"abc"')
+
+		writer = self.cache.writer(URL, StringIO.StringIO("<rss>partial"), '"def"', None)
+		writer.read(5)
+		writer.close()
+
+		self.assertEqual(self.cache.lookup(URL)['etag'], '"abc"')
+		self.assertEqual(self.cached(), "<rss>first</rss>")
+		self.assertEqual([name for name in os.listdir(os.path.join(self.dir, "feeds")) if name.endswith(".tmp")], [])
+
+	def test_discard(self):
+		self.store("<rss/>", '"abc"')
+		writer = self.cache.writer(URL + "2", StringIO.StringIO("<rss/>"), '"def"', None)
+		writer.read()
+		writer.commit()
+
+		self.cache.discard(URL)
+		self.assertEqual(self.cache.lookup(URL), None)
+
+		# other urls are left alone
+		self.assertEqual(self.cache.lookup(URL + "2")['etag'], '"def"')
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,50 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from mediarover.episode.daily import DailyEpisode
+from mediarover.episode.multi import MultiEpisode
+from mediarover.episode.single import SingleEpisode
+from mediarover.filesystem.episode import FilesystemEpisode, FilesystemSingleEpisode, FilesystemDailyEpisode, FilesystemMultiEpisode
+from mediarover.series import Series
+
+import support
+
+class SlotsTestCase(unittest.TestCase):
+	""" episode and filesystem episode objects don't carry a per instance __dict__ """
+
+	def setUp(self):
+		support.environment()
+		self.series = Series("Some Show")
+
+	def assertSlotted(self, object):
+		self.assertFalse(hasattr(object, "__dict__"), type(object).__name__)
+		self.assertRaises(AttributeError, setattr, object, "unknown", None)
+
+	def test_episodes(self):
+		for cls in (SingleEpisode, FilesystemSingleEpisode):
+			self.assertSlotted(cls(series=self.series, season=1, episode=2, quality="high"))
+		for cls in (DailyEpisode, FilesystemDailyEpisode):
+			self.assertSlotted(cls(series=self.series, year=2010, month=3, day=4, quality="high"))
+		for cls in (MultiEpisode, FilesystemMultiEpisode):
+			self.assertSlotted(cls(series=self.series, season=1, start_episode=2, end_episode=3, quality="high"))
+
+	def test_filesystem_episode(self):
+		episode = FilesystemSingleEpisode(series=self.series, season=1, episode=2, quality="high")
+		self.assertSlotted(FilesystemEpisode("/tv/Some Show/Some Show - s01e02.avi", episode, 1000))
+
+if __name__ == "__main__":
+	unittest.main()
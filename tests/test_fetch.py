@@ -0,0 +1,128 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import BaseHTTPServer
+import os
+import unittest
+import urllib2
+import urlparse
+
+from mediarover.error import InvalidURL
+from mediarover.source.fetch import ConnectionPool
+
+import support
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+	""" serves /feed, redirects /moved to /feed and returns 404 for everything else """
+
+	protocol_version = "HTTP/1.1"
+
+	# (path, client port, headers) of every request received
+	requests = []
+
+	def do_GET(self):
+		self.requests.append((self.path, self.client_address[1], self.headers))
+		path = urlparse.urlparse(self.path)[2]
+		if path == "/moved":
+			self.respond(302, "", [("Location", "/feed")])
+		elif path == "/feed":
+			self.respond(200, "<rss/>")
+		else:
+			self.respond(404, "not found")
+
+	def respond(self, status, body, headers = ()):
+		self.send_response(status)
+		for (name, value) in headers:
+			self.send_header(name, value)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+class ConnectionPoolTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.server = support.start_server(Handler)
+		del Handler.requests[:]
+		self.pool = ConnectionPool()
+
+	def tearDown(self):
+		self.pool.close()
+		self.server.shutdown()
+		self.server.server_close()
+
+	def test_connections_are_reused(self):
+		for i in range(3):
+			response = self.pool.open(support.url(self.server, "/feed"), 5)
+			self.assertEqual(response.status, 200)
+			self.assertEqual(response.read(), "<rss/>")
+
+		self.assertEqual(len(set([port for (path, port, headers) in Handler.requests])), 1)
+
+	def test_partially_read_responses_are_not_reused(self):
+		response = self.pool.open(support.url(self.server, "/feed"), 5)
+		response.read(2)
+		response.close()
+		self.assertEqual(self.pool.open(support.url(self.server, "/feed"), 5).read(), "<rss/>")
+
+		self.assertEqual(len(set([port for (path, port, headers) in Handler.requests])), 2)
+
+	def test_redirect(self):
+		response = self.pool.open(support.url(self.server, "/moved"), 5)
+		self.assertEqual(response.read(), "<rss/>")
+		self.assertEqual([path for (path, port, headers) in Handler.requests], ["/moved", "/feed"])
+
+	def test_errors(self):
+		try:
+			self.pool.open(support.url(self.server, "/missing"), 5)
+		except urllib2.HTTPError, e:
+			self.assertEqual(e.code, 404)
+		else:
+			self.fail("HTTPError not raised")
+
+		self.assertRaises(urllib2.URLError, self.pool.open, "http://127.0.0.1:port/feed", 5)
+		self.assertRaises(InvalidURL, self.pool.open, "ftp://127.0.0.1/feed", 5)
+
+	def test_credentials(self):
+		url = support.url(self.server, "/feed").replace("://", "://user:p%40ss@")
+		self.assertEqual(self.pool.open(url, 5).read(), "<rss/>")
+		self.assertEqual(Handler.requests[0][2]['Authorization'], "Basic dXNlcjpwQHNz")
+
+	def test_proxy(self):
+		saved = dict(os.environ)
+		try:
+			for name in ("no_proxy", "NO_PROXY", "HTTP_PROXY"):
+				os.environ.pop(name, None)
+			os.environ['http_proxy'] = support.url(self.server, "").replace("://", "://user:secret@")
+			pool = ConnectionPool()
+		finally:
+			os.environ.clear()
+			os.environ.update(saved)
+
+		try:
+			self.assertEqual(pool.open("http://feeds.example.com/feed?page=1", 5).read(), "<rss/>")
+		finally:
+			pool.close()
+
+		(path, port, headers) = Handler.requests[0]
+		self.assertEqual(path, "http://feeds.example.com/feed?page=1")
+		self.assertEqual(headers['Host'], "feeds.example.com")
+		self.assertEqual(headers['Proxy-Authorization'], "Basic dXNlcjpzZWNyZXQ=")
+
+if __name__ == "__main__":
+	unittest.main()
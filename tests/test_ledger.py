@@ -0,0 +1,164 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mediarover.episode.single import SingleEpisode
+from mediarover.series import Series
+from mediarover.source.ledger import ItemLedger
+from mediarover.source.parser import FeedItem
+
+import support
+
+class Item(object):
+	""" minimal source item """
+
+	def url(self):
+		return self.__url
+
+	def title(self):
+		return self.__title
+
+	def download(self):
+		return self.__download
+
+	def __init__(self, url, title, download):
+		self.__url = url
+		self.__title = title
+		self.__download = download
+
+class Job(object):
+	""" minimal queue job """
+
+	def title(self):
+		return self.__title
+
+	def __init__(self, title):
+		self.__title = title
+
+class Queue(object):
+	""" minimal queue """
+
+	def jobs(self):
+		return self.queued
+
+	def __init__(self, queued = None):
+		self.queued = queued or []
+
+class ItemLedgerTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.env = support.environment()
+		self.dir = tempfile.mkdtemp()
+		self.meta_ds = support.create_metadata(self.dir)
+		self.series_dir = os.path.join(self.dir, "Lost")
+		os.mkdir(self.series_dir)
+		self.queue = Queue()
+		self.watched_series = {}
+
+	def tearDown(self):
+		self.meta_ds.cleanup()
+		shutil.rmtree(self.dir)
+
+	def ledger(self):
+		""" return ledger as created at the start of a run """
+		ledger = ItemLedger(self.queue)
+		ledger.config = self.env['broker']['config']
+		ledger.meta_ds = self.meta_ds
+		ledger.watched_series = self.watched_series
+		return ledger
+
+	def watch(self):
+		""" (re)build the watched series, as done at the start of a run """
+		self.watched_series.clear()
+		self.watched_series['lost'] = Series("Lost", path=[self.series_dir])
+
+	def reject(self, decision, title = "Lost.S01E02.HDTV", url = "http://example.com/1"):
+		""" record given decision about an item in one run and return a ledger for the next run """
+		ledger = self.ledger()
+		ledger.record("source", Item(url, title, SingleEpisode(Series("Lost"), 1, 2, "medium")), decision)
+		ledger.save()
+		return self.ledger()
+
+	def test_rejection_reused(self):
+		ledger = self.reject('not_watched')
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), 'not_watched')
+
+		# other sources, urls and titles are unknown
+		self.assertEqual(ledger.rejected("other", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), None)
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/2")), None)
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.720p", "http://example.com/1")), None)
+
+	def test_scheduled_items_are_evaluated(self):
+		ledger = self.reject(None)
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), None)
+
+	def test_watch_list_change(self):
+		ledger = self.reject('not_watched')
+		self.watch()
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), None)
+
+	def test_queue_change(self):
+		self.watch()
+		ledger = self.reject('in_queue')
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), 'in_queue')
+
+		self.queue.queued.append(Job("Lost.S01E03.HDTV"))
+		ledger = self.ledger()
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), None)
+
+	def test_series_change(self):
+		self.watch()
+		ledger = self.reject('on_disk')
+		self.watch()
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), 'on_disk')
+
+		mtime = os.stat(self.series_dir).st_mtime
+		os.utime(self.series_dir, (mtime + 10, mtime + 10))
+		self.watch()
+		ledger = self.ledger()
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), None)
+
+	def test_quality_change(self):
+		self.watch()
+		self.meta_ds.add_episode(SingleEpisode(self.watched_series['lost'], 1, 2, "low"))
+		ledger = self.reject('on_disk')
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), 'on_disk')
+
+		# ie. set-quality
+		self.meta_ds.add_episode(SingleEpisode(self.watched_series['lost'], 1, 2, "high"))
+		ledger = self.ledger()
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), None)
+
+	def test_stale_items_are_pruned(self):
+		self.reject('not_watched', url="http://example.com/1")
+		self.reject('not_watched', url="http://example.com/2")
+
+		# only the second item is seen in the next run
+		ledger = self.ledger()
+		ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/2"))
+		ledger.retention = 0
+		ledger.save()
+
+		ledger = self.ledger()
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/1")), None)
+		self.assertEqual(ledger.rejected("source", FeedItem("Lost.S01E02.HDTV", "http://example.com/2")), 'not_watched')
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,112 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+from __future__ import with_statement
+
+import os.path
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from mediarover.episode.daily import DailyEpisode
+from mediarover.episode.single import SingleEpisode
+from mediarover.series import Series
+
+import support
+
+class BatchTestCase(unittest.TestCase):
+	""" writes made inside Metadata.batch() are committed (or rolled back) together """
+
+	def setUp(self):
+		self.dir = tempfile.mkdtemp()
+		self.meta_ds = support.create_metadata(self.dir)
+		self.db = os.path.join(self.dir, "ds", "metadata.db")
+
+	def tearDown(self):
+		self.meta_ds.cleanup()
+		shutil.rmtree(self.dir)
+
+	def committed(self):
+		""" return titles of in_progress records visible from a separate connection """
+		dbh = sqlite3.connect(self.db)
+		try:
+			return sorted([row[0] for row in dbh.execute("SELECT title FROM in_progress")])
+		finally:
+			dbh.close()
+
+	def test_nested_batch_commits_once(self):
+		with self.meta_ds.batch():
+			self.meta_ds.add_in_progress("first", "tv", "low")
+			with self.meta_ds.batch():
+				self.meta_ds.add_in_progress("second", "tv", "low")
+			self.assertEqual(self.committed(), [])
+
+			self.meta_ds.add_in_progress("third", "tv", "low")
+			self.assertEqual(self.committed(), [])
+
+		self.assertEqual(self.committed(), ["first", "second", "third"])
+
+	def test_exception_rolls_back(self):
+		self.meta_ds.add_in_progress("before", "tv", "low")
+
+		def fail():
+			with self.meta_ds.batch():
+				self.meta_ds.add_in_progress("first", "tv", "low")
+				with self.meta_ds.batch():
+					self.meta_ds.add_episodes([SingleEpisode(Series("Lost"), 1, 2, "low")])
+					raise ValueError("oops")
+		self.assertRaises(ValueError, fail)
+
+		self.assertEqual(self.committed(), ["before"])
+		self.assertEqual(self.meta_ds.get_episode(SingleEpisode(Series("Lost"), 1, 2, "low")), None)
+
+		# series ids cached during the failed batch must not be reused
+		self.meta_ds.add_episode(SingleEpisode(Series("Lost"), 1, 2, "low"))
+		self.assertEqual(self.meta_ds.get_episode(SingleEpisode(Series("Lost"), 1, 2, "low"))['quality'], "low")
+
+	def test_writes_outside_batch_commit_immediately(self):
+		self.meta_ds.add_in_progress("first", "tv", "low")
+		self.assertEqual(self.committed(), ["first"])
+
+class AddEpisodesTestCase(unittest.TestCase):
+
+	def setUp(self):
+		self.dir = tempfile.mkdtemp()
+		self.meta_ds = support.create_metadata(self.dir)
+
+	def tearDown(self):
+		self.meta_ds.cleanup()
+		shutil.rmtree(self.dir)
+
+	def test_existing_rows_are_kept(self):
+		series = Series("Lost")
+		single = SingleEpisode(series, 1, 2, "low")
+		daily = DailyEpisode(series, 2010, 3, 4, "low")
+		self.meta_ds.add_episodes([single, daily])
+		single_id = self.meta_ds.get_episode(single)['id']
+		daily_id = self.meta_ds.get_episode(daily)['id']
+
+		# adding the same episodes again updates their quality in place
+		self.meta_ds.add_episodes([SingleEpisode(series, 1, 2, "high"), DailyEpisode(series, 2010, 3, 4, "high"), SingleEpisode(series, 1, 3, "medium")])
+		self.assertEqual(tuple(self.meta_ds.get_episode(single)), (single_id, "high"))
+		self.assertEqual(tuple(self.meta_ds.get_episode(daily)), (daily_id, "high"))
+		self.assertEqual(self.meta_ds.get_episode(SingleEpisode(series, 1, 3, "low"))['quality'], "medium")
+
+		self.assertEqual(self.meta_ds.get_episode_qualities(series), {(1, 2): "high", (1, 3): "medium", (2010, 3, 4): "high"})
+
+if __name__ == "__main__":
+	unittest.main()
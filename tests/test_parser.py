@@ -0,0 +1,146 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from mediarover.episode.daily import DailyEpisode
+from mediarover.episode.multi import MultiEpisode
+from mediarover.episode.parser import TitleParser
+from mediarover.episode.single import SingleEpisode
+from mediarover.error import *
+from mediarover.filesystem.episode import FilesystemSingleEpisode, FilesystemMultiEpisode, FilesystemDailyEpisode
+from mediarover.series import Series
+from mediarover.source.newzbin.episode import NewzbinSingleEpisode, NewzbinMultiEpisode, NewzbinDailyEpisode
+from mediarover.source.newzbin.factory import NewzbinFactory
+
+EPISODE_CLASSES = (MultiEpisode, DailyEpisode, SingleEpisode)
+FILESYSTEM_CLASSES = (FilesystemMultiEpisode, FilesystemDailyEpisode, FilesystemSingleEpisode)
+NEWZBIN_CLASSES = (NewzbinMultiEpisode, NewzbinSingleEpisode, NewzbinDailyEpisode)
+
+# (episode classes, title, expected class, expected values)
+TITLES = (
+	# single episodes
+	(EPISODE_CLASSES, "Lost.S01E02.720p.HDTV", SingleEpisode, {'series': "lost", 'season': "01", 'episode': "02"}),
+	(EPISODE_CLASSES, "Lost 1x02 - Pilot", SingleEpisode, {'series': "lost", 'season': "1", 'episode': "02"}),
+	(EPISODE_CLASSES, "24.S03E04", SingleEpisode, {'series': "24", 'season': "03", 'episode': "04"}),
+	(FILESYSTEM_CLASSES, "Lost - 102 - Pilot.avi", FilesystemSingleEpisode, {'series': "lost", 'season': "1", 'episode': "02"}),
+	(FILESYSTEM_CLASSES, "Show.720p.S01E02.mkv", FilesystemSingleEpisode, {'series': "show720p", 'season': "01", 'episode': "02"}),
+
+	# multipart episodes
+	(EPISODE_CLASSES, "Lost.s01e02e03.HDTV", MultiEpisode, {'series': "lost", 'season': "01", 'start_episode': "02", 'end_episode': "03"}),
+	(EPISODE_CLASSES, "Lost.S01E02-03.HDTV", MultiEpisode, {'series': "lost", 'season': "01", 'start_episode': "02", 'end_episode': "03"}),
+	(EPISODE_CLASSES, "Lost 1x02-1x03", MultiEpisode, {'series': "lost", 'season': "1", 'start_episode': "02", 'end_episode': "03"}),
+	(FILESYSTEM_CLASSES, "Lost - 1x02-1x03.avi", FilesystemMultiEpisode, {'series': "lost", 'season': "1", 'start_episode': "02", 'end_episode': "03"}),
+
+	# daily episodes
+	(EPISODE_CLASSES, "The.Daily.Show.2010.03.04.HDTV", DailyEpisode, {'series': "thedailyshow", 'year': "2010", 'month': "03", 'day': "04"}),
+	(EPISODE_CLASSES, "Colbert Report 2010-03-04", DailyEpisode, {'series': "colbertreport", 'year': "2010", 'month': "03", 'day': "04"}),
+	(FILESYSTEM_CLASSES, "The Daily Show - 2010_03_04.avi", FilesystemDailyEpisode, {'series': "thedailyshow", 'year': "2010", 'month': "03", 'day': "04"}),
+
+	# not an episode
+	(EPISODE_CLASSES, "nothing here", None, None),
+)
+
+# (newzbin report title, expected class, expected values)
+NEWZBIN_TITLES = (
+	("Lost - 1x02 - Pilot", NewzbinSingleEpisode, {'series': "lost", 'season': 1, 'episode': 2, 'title': "Pilot"}),
+	("24 - 3x04", NewzbinSingleEpisode, {'series': "24", 'season': 3, 'episode': 4, 'title': ""}),
+	("Lost - 1x02-1x03 - Pilot", NewzbinMultiEpisode, {'series': "lost", 'season': 1, 'title': "Pilot"}),
+	("The Daily Show - 2010-03-04 - Some Guest", NewzbinDailyEpisode, {'series': "thedailyshow", 'year': 2010, 'month': 3, 'day': 4, 'title': "Some Guest"}),
+)
+
+def baseline_parse(classes, string):
+	""" classify and parse given title the way episode factories did before TitleParser, one pattern at a time """
+	for cls in classes:
+		if cls.handle(string):
+			return (cls, cls.extract_from_string(string))
+
+	return None
+
+class TitleParserTestCase(unittest.TestCase):
+	""" TitleParser must agree with the patterns of the episode classes searched one at a time """
+
+	def test_agrees_with_baseline(self):
+		for (classes, title, expected_class, expected) in TITLES:
+			parsed = TitleParser(classes).parse(title)
+			baseline = baseline_parse(classes, title)
+			if expected_class is None:
+				self.assertEqual(parsed, None, title)
+				self.assertEqual(baseline, None, title)
+				continue
+
+			(cls, groups, sanitized_series) = parsed
+			params = cls.extract_from_groups(groups)
+			self.assertEqual(cls, expected_class, title)
+			self.assertEqual((cls, params), baseline, title)
+			self.assertEqual(sanitized_series, Series.sanitize_series_name(name=baseline[1]['series']), title)
+
+			values = dict(params, series=sanitized_series)
+			for (key, value) in expected.items():
+				self.assertEqual(values[key], value, "%s: %s" % (title, key))
+
+	def test_cached_results(self):
+		parser = TitleParser(EPISODE_CLASSES)
+		parser.cache_size = 2
+		for title in ("Lost.S01E02", "Lost.S01E03", "Lost.S01E04", "Lost.S01E02"):
+			self.assertEqual(parser.parse(title)[1]['episode'], title[-2:])
+
+		self.assertTrue(parser.parse("Lost.S01E02") is parser.parse("Lost.S01E02"))
+
+	def test_extra_patterns(self):
+		parser = TitleParser(EPISODE_CLASSES, ["\.(?P<season>\d{1,2})\.(?P<episode>\d{2})\."])
+		(cls, groups, sanitized_series) = parser.parse("Some.Show.3.04.hdtv")
+		self.assertEqual(cls, SingleEpisode)
+		self.assertEqual((groups['season'], groups['episode'], sanitized_series), ("3", "04", "someshow"))
+
+		# built in patterns still apply
+		self.assertEqual(parser.parse("Lost.S01E02")[0], SingleEpisode)
+
+	def test_invalid_patterns(self):
+		for pattern in ("(", "(?P<foo>\d)"):
+			self.assertRaises(ConfigurationError, TitleParser, EPISODE_CLASSES, [pattern])
+
+class NewzbinFactoryTestCase(unittest.TestCase):
+	""" newzbin report titles must give the same episodes as before """
+
+	def setUp(self):
+		self.factory = NewzbinFactory()
+		self.factory.config = {'tv': {'episode_patterns': [], 'filter': {}}}
+		self.factory.watched_series = {}
+
+	def test_agrees_with_baseline(self):
+		for (title, expected_class, expected) in NEWZBIN_TITLES:
+			episode = self.factory.create_episode(title, quality="high")
+			(cls, params) = baseline_parse(NEWZBIN_CLASSES, title)
+			self.assertEqual(episode.series.name, params['series'], title)
+
+			# series objects are compared by identity
+			params['series'] = episode.series
+			params['quality'] = "high"
+			self.assertEqual(type(episode), expected_class, title)
+			self.assertEqual(episode, cls(**params), title)
+			self.assertEqual(episode.title, params['title'], title)
+
+			for (key, value) in expected.items():
+				if key == 'series':
+					self.assertEqual(Series.sanitize_series_name(series=episode.series), value, title)
+				else:
+					self.assertEqual(getattr(episode, key), value, "%s: %s" % (title, key))
+
+	def test_unknown_title(self):
+		self.assertRaises(InvalidEpisodeString, self.factory.create_episode, "Lost - Pilot", quality="high")
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,209 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import BaseHTTPServer
+import cgi
+import os
+import shutil
+import tempfile
+import unittest
+import urlparse
+
+from mediarover.error import *
+from mediarover.queue.sabnzbd import SabnzbdQueue
+from mediarover.series import Series
+
+import support
+
+SLOTS = (
+	('tv', 'SABnzbd_nzo_1', 'Lost.S01E02.HDTV'),
+	('tv', 'SABnzbd_nzo_2', 'Lost.S01E05E06.HDTV'),
+	('tv', 'SABnzbd_nzo_3', 'The.Daily.Show.2010.03.04.HDTV'),
+	('movies', 'SABnzbd_nzo_4', 'Lost.S01E07.HDTV'),
+)
+
+class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+	""" answers SABnzbd api requests for the jobs listed in slots """
+
+	slots = []
+
+	# queue data returned instead of the slots (if set)
+	queue = None
+
+	# query arguments of every request received
+	requests = []
+
+	def do_GET(self):
+		args = dict(cgi.parse_qsl(urlparse.urlparse(self.path)[4]))
+		self.requests.append(args)
+
+		if args.get('name') == 'delete':
+			self.slots[:] = [slot for slot in self.slots if slot[1] != args['value']]
+			body = "ok\n"
+		elif args.get('name') is not None:
+			body = "ok\n"
+		elif self.queue is not None:
+			body = self.queue
+		elif args.get('output') == 'xml':
+			body = "<queue><slots>%s</slots></queue>" % "".join(["<slot><cat>%s</cat><nzo_id>%s</nzo_id><filename>%s</filename><msgid></msgid><status>Queued</status></slot>" % slot for slot in self.slots])
+		else:
+			body = '{"queue": {"slots": [%s]}}' % ", ".join(['{"cat": "%s", "nzo_id": "%s", "filename": "%s", "msgid": "", "status": "Queued"}' % slot for slot in self.slots])
+
+		self.send_response(200)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def log_message(self, *args):
+		pass
+
+class Item(object):
+	""" minimal source item """
+
+	def type(self):
+		return "tv"
+
+	def priority(self):
+		return "normal"
+
+	def url(self):
+		return "http://example.com/nzb/1"
+
+	def title(self):
+		return self.__title
+
+	def quality(self):
+		return "medium"
+
+	def __init__(self, title):
+		self.__title = title
+
+class SabnzbdQueueTestCase(unittest.TestCase):
+
+	format = 'json'
+
+	# incomplete or malformed queue data
+	invalid_data = (
+		'{"queue": {"slots": [{"cat": "tv", "filename": "Lost.S01E02.HDTV"}]}}',
+		'{"queue": {"slots": ["Lost.S01E02.HDTV"]}}',
+		'{"queue": {}}',
+		'{"queue": {"slots": ',
+		'[]',
+	)
+
+	def setUp(self):
+		self.env = support.environment()
+		self.watched_series = self.env['broker']['watched_series']
+		self.watched_series['lost'] = Series("Lost")
+		self.watched_series['thedailyshow'] = Series("The Daily Show")
+		self.factory = self.env['broker']['episode_factory']
+
+		Handler.slots = list(SLOTS)
+		Handler.queue = None
+		del Handler.requests[:]
+		self.server = support.start_server(Handler)
+
+		self.backup_dir = tempfile.mkdtemp()
+		self.queue = SabnzbdQueue(support.url(self.server, "/sabnzbd"), ['tv'], {
+			'api_key': 'abc',
+			'backup_dir': self.backup_dir,
+			'format': self.format,
+			'__check_version__': False,
+		})
+
+	def tearDown(self):
+		self.server.shutdown()
+		self.server.server_close()
+		shutil.rmtree(self.backup_dir)
+		self.watched_series.clear()
+
+		meta_ds = self.env['broker']['metadata_data_store']
+		meta_ds.delete_in_progress(*[record['title'] for record in meta_ds.list_in_progress()])
+
+	def retrievals(self):
+		""" return number of times the queue was retrieved """
+		return len([args for args in Handler.requests if 'output' in args])
+
+	def test_jobs(self):
+		self.assertEqual([job.title() for job in self.queue.jobs()], ['Lost.S01E02.HDTV', 'Lost.S01E05E06.HDTV', 'The.Daily.Show.2010.03.04.HDTV'])
+		self.assertEqual(self.queue.jobs()[0].id(), 'SABnzbd_nzo_1')
+
+	def test_lookup(self):
+		self.assertEqual(self.queue.get_job_by_download(self.factory.create_episode("Lost.S01E02.720p")).id(), 'SABnzbd_nzo_1')
+		self.assertEqual(self.queue.get_job_by_download(self.factory.create_episode("Lost 1x05-1x06")).id(), 'SABnzbd_nzo_2')
+		self.assertEqual(self.queue.get_job_by_download(self.factory.create_episode("The Daily Show 2010-03-04")).id(), 'SABnzbd_nzo_3')
+
+		self.assertTrue(self.queue.in_queue(self.factory.create_episode("Lost.S01E02")))
+		self.assertFalse(self.queue.in_queue(self.factory.create_episode("Lost.S01E03")))
+		self.assertFalse(self.queue.in_queue(self.factory.create_episode("Lost.S02E02")))
+		self.assertFalse(self.queue.in_queue(self.factory.create_episode("Lost.S01E05E07")))
+		self.assertFalse(self.queue.in_queue(self.factory.create_episode("Other.Show.S01E02")))
+
+		# jobs of unsupported categories are ignored
+		self.assertFalse(self.queue.in_queue(self.factory.create_episode("Lost.S01E07")))
+
+		self.assertEqual(self.retrievals(), 1)
+
+	def test_remove(self):
+		download = self.factory.create_episode("Lost.S01E02")
+		self.queue.remove_from_queue(self.queue.get_job_by_download(download))
+		self.assertFalse(self.queue.in_queue(download))
+		self.assertTrue(self.queue.in_queue(self.factory.create_episode("Lost.S01E05E06")))
+		self.assertEqual(self.retrievals(), 1)
+
+	def test_add_refreshes_queue(self):
+		self.assertFalse(self.queue.in_queue(self.factory.create_episode("Lost.S01E03")))
+
+		Handler.slots.append(('tv', 'SABnzbd_nzo_5', 'Lost.S01E03.HDTV'))
+		self.assertEqual(self.queue.add_all_to_queue([Item("Lost.S01E03.HDTV")])[0][1], None)
+		self.assertTrue(self.queue.in_queue(self.factory.create_episode("Lost.S01E03")))
+		self.assertEqual(self.retrievals(), 2)
+
+	def test_prefetch(self):
+		self.queue.prefetch()
+		self.assertTrue(self.queue.in_queue(self.factory.create_episode("Lost.S01E02")))
+		self.assertEqual(self.retrievals(), 1)
+
+	def test_processed(self):
+		for name in ("Lost.S01E02.HDTV.nzb.gz", "The.Daily.Show.2010.03.04.HDTV.nzb.gz"):
+			open(os.path.join(self.backup_dir, name), "w").close()
+
+		self.assertTrue(self.queue.processed(Item("Lost.S01E02.HDTV")))
+		self.assertTrue(self.queue.processed(Item("The.Daily.Show.2010.03.04.HDTV")))
+		self.assertFalse(self.queue.processed(Item("Lost.S01E03.HDTV")))
+		self.assertFalse(self.queue.processed(Item("Lost.S01E02.HDTV.PROPER")))
+
+	def test_invalid_data(self):
+		for data in self.invalid_data:
+			Handler.queue = data
+			self.assertRaises(InvalidRemoteData, self.queue.jobs)
+
+class SabnzbdXmlQueueTestCase(SabnzbdQueueTestCase):
+
+	format = 'xml'
+
+	invalid_data = (
+		"<queue><slots><slot><cat>tv</cat><filename>Lost.S01E02.HDTV</filename></slot></slots></queue>",
+		"<queue><slots>",
+	)
+
+	def test_optional_elements(self):
+		Handler.queue = "<queue><slots><slot><cat>tv</cat><nzo_id>SABnzbd_nzo_1</nzo_id><filename>Lost.S01E02.HDTV</filename></slot></slots></queue>"
+		self.assertTrue(self.queue.in_queue(self.factory.create_episode("Lost.S01E02")))
+
+
+if __name__ == "__main__":
+	unittest.main()
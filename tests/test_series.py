@@ -0,0 +1,96 @@
+# Copyright 2009 Kieran Elliott <kierse@mediarover.tv>
+#
+# Media Rover is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+# 
+# Media Rover is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import os.path
+import shutil
+import tempfile
+import time
+import unittest
+
+from mediarover.series import Series, MINIMUM_FILE_SIZE
+
+import support
+
+class IndexTestCase(unittest.TestCase):
+	""" directories holding files too small to be episodes are indexed like any other """
+
+	def setUp(self):
+		self.config = support.environment()['broker']['config']
+		self.ignored = list(self.config['tv']['ignored_extensions'])
+		self.dir = tempfile.mkdtemp()
+		self.season = os.path.join(self.dir, "Some Show", "s01")
+		os.makedirs(self.season)
+
+		self.create("Some Show - s01e01.avi", MINIMUM_FILE_SIZE)
+		self.small = self.create("Some Show - s01e02.avi", 1000)
+		self.create("Some Show - s01e03.foo", MINIMUM_FILE_SIZE)
+
+		# the index of recently modified directories isn't trusted
+		self.age(self.season)
+
+	def tearDown(self):
+		self.config['tv']['ignored_extensions'] = self.ignored
+		shutil.rmtree(self.dir)
+
+	def create(self, name, size):
+		path = os.path.join(self.season, name)
+		f = open(path, "w")
+		try:
+			f.truncate(size)
+		finally:
+			f.close()
+		return path
+
+	def age(self, path):
+		past = time.time() - 10
+		os.utime(path, (past, past))
+
+	def scan(self):
+		""" scan series and return the number of files found along with the time the season directory was indexed """
+		series = Series("Some Show", path=[os.path.join(self.dir, "Some Show")])
+		series.scan()
+		return (len(series.files), series.meta_ds.get_indexed_directory(self.season)['indexed'])
+
+	def test_unchanged_directory_is_not_read_again(self):
+		(count, indexed) = self.scan()
+		self.assertEqual(count, 2)
+		self.assertEqual(self.scan(), (2, indexed))
+
+	def test_small_file_growth_is_detected(self):
+		(count, indexed) = self.scan()
+
+		f = open(self.small, "r+")
+		try:
+			f.truncate(MINIMUM_FILE_SIZE)
+		finally:
+			f.close()
+		self.age(self.small)
+		self.age(self.season)
+
+		(count, reindexed) = self.scan()
+		self.assertEqual(count, 3)
+		self.assertNotEqual(reindexed, indexed)
+
+	def test_filter_change_invalidates_index(self):
+		(count, indexed) = self.scan()
+
+		self.config['tv']['ignored_extensions'] = self.ignored + ["foo"]
+		(count, reindexed) = self.scan()
+		self.assertEqual(count, 1)
+		self.assertNotEqual(reindexed, indexed)
+
+if __name__ == "__main__":
+	unittest.main()